@@ -35,7 +35,8 @@ class AZAccount:
 
   Attributes:
     subscription_id (str): The Azure subscription ID to use.
-    credentials (ServicePrincipalCredentials): An Azure credentials object.
+    credentials (CachedTokenCredential): An Azure credentials object, shared
+        with all AZAccount objects using the same identity.
     default_region (str): The default region to create new resources in.
     default_resource_group_name (str): The default resource group in which to
           create new resources in.
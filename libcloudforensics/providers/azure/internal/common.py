@@ -15,12 +15,17 @@
 """Common utilities."""
 
 import binascii
+import hashlib
 import json
 import os
 import re
+import threading
+import time
+from concurrent import futures
 
-from typing import Any, List, Dict, Optional, TYPE_CHECKING, Tuple
+from typing import Any, Callable, List, Dict, Optional, TYPE_CHECKING, Tuple
 
+from azure.core.credentials import AccessToken
 from azure.identity import DefaultAzureCredential
 
 from libcloudforensics import logging_utils
@@ -47,6 +52,105 @@ DEFAULT_DISK_COPY_PREFIX = 'evidence'
 
 UBUNTU_2204_SKU = '22_04-lts'
 
+# Optional callback receiving the name of a long-running operation and the
+# time (in seconds) spent waiting for it to complete.
+_OPERATION_METRICS_HOOK = None  # type: Optional[Callable[[str, float], None]]
+
+# Number of seconds before expiry at which cached access tokens are refreshed.
+TOKEN_REFRESH_MARGIN = 300
+
+
+class CachedTokenCredential:
+  """Azure credential wrapper caching access tokens per scope.
+
+  Azure management clients each hold their own bearer token policy, and some
+  credential types (e.g. Azure CLI credentials) do not cache tokens at all.
+  Sharing a CachedTokenCredential between clients ensures a single token
+  exchange per scope, until the token is about to expire.
+
+  Attributes:
+    credential (DefaultAzureCredential): The wrapped Azure credential.
+  """
+
+  def __init__(self, credential: DefaultAzureCredential) -> None:
+    """Initialize the CachedTokenCredential class.
+
+    Args:
+      credential (DefaultAzureCredential): The Azure credential to wrap.
+    """
+    self.credential = credential
+    self._tokens = {}  # type: Dict[Tuple[Any, ...], AccessToken]
+    self._lock = threading.Lock()
+
+  # The method names are defined by the azure-core TokenCredential protocol.
+  # pylint: disable=invalid-name
+  def get_token(self, *scopes: str, **kwargs: Any) -> AccessToken:
+    """Get an access token for the given scopes, using the cache if possible.
+
+    Args:
+      *scopes (str): The scopes for which the token is requested.
+      **kwargs (Any): Additional arguments for the wrapped credential.
+
+    Returns:
+      AccessToken: An access token for the requested scopes.
+    """
+    if kwargs.get('claims'):
+      # Claims challenges always require a fresh token.
+      return self.credential.get_token(*scopes, **kwargs)
+    key = (scopes, kwargs.get('tenant_id'), kwargs.get('enable_cae'))
+    with self._lock:
+      token = self._tokens.get(key)
+      if token and token.expires_on - TOKEN_REFRESH_MARGIN > time.time():
+        return token
+      logger.debug('Requesting new access token for scopes {0:s}'.format(
+          ', '.join(scopes)))
+      token = self.credential.get_token(*scopes, **kwargs)
+      self._tokens[key] = token
+      return token
+
+  def close(self) -> None:
+    """Close the wrapped credential."""
+    self.credential.close()
+  # pylint: enable=invalid-name
+
+
+# Credentials shared by all AZAccount objects created in the process, keyed
+# by identity (client ID, tenant ID and a hash of the client secret), so that
+# the subscriptions of an identity share their access tokens.
+# pylint: disable=line-too-long
+_CREDENTIALS_CACHE = {}  # type: Dict[Tuple[Optional[str], ...], CachedTokenCredential]
+# pylint: enable=line-too-long
+# Identities resolved from a credentials file profile or from the Azure CLI
+# configuration, keyed by their source, so that they are only read once.
+_IDENTITIES_CACHE = {}  # type: Dict[Tuple[str, str], Dict[str, Any]]
+_CREDENTIALS_CACHE_LOCK = threading.Lock()
+
+
+def _CredentialsFilePath() -> str:
+  """Returns the path of the Azure credentials file.
+
+  Returns:
+    str: The path set in the AZURE_CREDENTIALS_PATH environment variable,
+        or ~/.azure/credentials.json.
+  """
+  path = os.getenv('AZURE_CREDENTIALS_PATH')
+  if not path:
+    path = os.path.expanduser('~/.azure/credentials.json')
+  return path
+
+
+def _AzureConfigDir() -> str:
+  """Returns the Azure CLI configuration directory.
+
+  Returns:
+    str: The directory set in the AZURE_CONFIG_DIR environment variable, or
+        ~/.azure/.
+  """
+  config_dir = os.getenv('AZURE_CONFIG_DIR')
+  if not config_dir:
+    config_dir = os.path.expanduser('~/.azure/')
+  return config_dir
+
 
 def _ParseCredentialsFile(profile_name: str) -> Dict[str, Any]:
   """Parse Azure credentials.json file.
@@ -86,9 +190,7 @@ def _ParseCredentialsFile(profile_name: str) -> Dict[str, Any]:
     FileNotFoundError: If the credentials file is not found.
     InvalidFileFormatError: If the credentials file couldn't be parsed.
   """
-  path = os.getenv('AZURE_CREDENTIALS_PATH')
-  if not path:
-    path = os.path.expanduser('~/.azure/credentials.json')
+  path = _CredentialsFilePath()
 
   if not os.path.exists(path):
     raise FileNotFoundError(
@@ -132,9 +234,7 @@ def _CheckAzureCliCredentials() -> Optional[str]:
   """
   tokens = None
 
-  config_dir = os.getenv('AZURE_CONFIG_DIR')
-  if not config_dir:
-    config_dir = os.path.expanduser('~/.azure/')
+  config_dir = _AzureConfigDir()
 
   tokens_path = os.path.join(config_dir, 'accessTokens.json')
   profile_path = os.path.join(config_dir, 'azureProfile.json')
@@ -163,7 +263,7 @@ def _CheckAzureCliCredentials() -> Optional[str]:
 
 
 def GetCredentials(profile_name: Optional[str] = None
-                   ) -> Tuple[str, DefaultAzureCredential]:
+                   ) -> Tuple[str, CachedTokenCredential]:
   # pylint: disable=line-too-long
   """Get Azure credentials, trying three different methods:
 
@@ -173,13 +273,18 @@ def GetCredentials(profile_name: Optional[str] = None
      https://docs.microsoft.com/en-us/azure/developer/python/azure-sdk-authenticate
   3. Azure CLI credentials.
 
+  Credentials are cached for the lifetime of the process, so that all
+  AZAccount objects using the same identity share their access tokens, even
+  across subscriptions. The identity resolved from a profile or from the
+  Azure CLI configuration is cached too, so that it is only read once.
+
   Args:
     profile_name (str): A name for the Azure account information to retrieve.
         If provided, then the library will look into ~/.azure/credentials.json
         for the account information linked to profile_name.
 
   Returns:
-    Tuple[str, DefaultAzureCredential]: Subscription ID and
+    Tuple[str, CachedTokenCredential]: Subscription ID and
         corresponding Azure credentials.
 
   Raises:
@@ -187,7 +292,13 @@ def GetCredentials(profile_name: Optional[str] = None
   """
   # pylint: enable=line-too-long
   if profile_name:
-    account_info = _ParseCredentialsFile(profile_name)
+    profile_key = (_CredentialsFilePath(), profile_name)
+    with _CREDENTIALS_CACHE_LOCK:
+      account_info = _IDENTITIES_CACHE.get(profile_key)
+    if not account_info:
+      account_info = _ParseCredentialsFile(profile_name)
+      with _CREDENTIALS_CACHE_LOCK:
+        _IDENTITIES_CACHE[profile_key] = account_info
     # Set environment variables for DefaultAzureCredentials.
     os.environ['AZURE_SUBSCRIPTION_ID'] = account_info['subscriptionId']
     os.environ['AZURE_CLIENT_ID'] = account_info['clientId']
@@ -204,7 +315,15 @@ def GetCredentials(profile_name: Optional[str] = None
     logger.info('EnvironmentCredentials unavailable, falling back to '
           'AzureCliCredentials.')
     # Will be automatically picked up by DefaultAzureCredential if configured.
-    subscription_id = _CheckAzureCliCredentials()
+    cli_key = ('', _AzureConfigDir())
+    with _CREDENTIALS_CACHE_LOCK:
+      subscription_id = _IDENTITIES_CACHE.get(cli_key, {}).get(
+          'subscriptionId')
+    if not subscription_id:
+      subscription_id = _CheckAzureCliCredentials()
+      if subscription_id:
+        with _CREDENTIALS_CACHE_LOCK:
+          _IDENTITIES_CACHE[cli_key] = {'subscriptionId': subscription_id}
 
   if not subscription_id:
     raise errors.CredentialsConfigurationError(
@@ -212,7 +331,23 @@ def GetCredentials(profile_name: Optional[str] = None
         'please make sure to define: [AZURE_SUBSCRIPTION_ID, AZURE_CLIENT_ID, '
         'AZURE_CLIENT_SECRET, AZURE_TENANT_ID].', __name__)
 
-  return subscription_id, DefaultAzureCredential()
+  secret_hash = None
+  if secret:
+    # The secret is hashed, so that it is not kept in the cache keys.
+    secret_hash = hashlib.sha256(secret.encode('utf-8')).hexdigest()
+  cache_key = (client_id, tenant, secret_hash)
+  with _CREDENTIALS_CACHE_LOCK:
+    if cache_key not in _CREDENTIALS_CACHE:
+      _CREDENTIALS_CACHE[cache_key] = CachedTokenCredential(
+          DefaultAzureCredential())
+    return subscription_id, _CREDENTIALS_CACHE[cache_key]
+
+
+def ClearCredentialsCache() -> None:
+  """Clear the process-level cache of Azure credentials and tokens."""
+  with _CREDENTIALS_CACHE_LOCK:
+    _CREDENTIALS_CACHE.clear()
+    _IDENTITIES_CACHE.clear()
 
 
 def ExecuteRequest(
@@ -296,3 +431,89 @@ def GenerateDiskName(snapshot: 'compute.AZComputeSnapshot',
         '{1:s}'.format(disk_name, REGEX_DISK_NAME.pattern), __name__)
 
   return disk_name
+
+
+def SetOperationMetricsHook(
+    hook: Optional[Callable[[str, float], None]]) -> None:
+  """Register a callback to report the duration of long-running operations.
+
+  Args:
+    hook (Callable[[str, float], None]): A function called with the name of
+        each completed long-running operation and the time (in seconds) spent
+        waiting for it. Set to None to disable reporting.
+  """
+  global _OPERATION_METRICS_HOOK  # pylint: disable=global-statement
+  _OPERATION_METRICS_HOOK = hook
+
+
+def WaitForOperation(name: str,
+                     poller: Any,
+                     timeout: Optional[float] = None) -> Any:
+  """Wait for an Azure long-running operation to complete.
+
+  Args:
+    name (str): A name identifying the operation, used for logging and
+        metrics reporting.
+    poller (LROPoller): The poller returned by an Azure begin_* method.
+    timeout (float): Optional. Maximum time (in seconds) to wait for the
+        operation. Default waits until the operation completes.
+
+  Returns:
+    Any: The result of the operation.
+
+  Raises:
+    OperationFailedError: If the operation did not complete within timeout.
+  """
+  return WaitForOperations({name: poller}, timeout=timeout)[name]
+
+
+def WaitForOperations(operations: Dict[str, Any],
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+  """Wait for several Azure long-running operations to complete.
+
+  Operations are waited upon concurrently. Each poller polls the service at
+  the interval advertised by the service itself (Retry-After), so the results
+  are returned as soon as the operations complete. If an operation does not
+  complete within the timeout, its continuation token is logged so that it
+  can be resumed by passing it to the corresponding begin_* method.
+
+  Args:
+    operations (Dict[str, LROPoller]): A dictionary mapping operation names
+        to the pollers returned by Azure begin_* methods.
+    timeout (float): Optional. Maximum time (in seconds) to wait for each
+        operation. Default waits until the operations complete.
+
+  Returns:
+    Dict[str, Any]: A dictionary mapping operation names to their results.
+
+  Raises:
+    OperationFailedError: If an operation did not complete within timeout.
+  """
+  if not operations:
+    return {}
+
+  def _Wait(name: str, poller: Any) -> Any:
+    start = time.monotonic()
+    result = poller.result(timeout=timeout)
+    if timeout is not None and not poller.done():
+      try:
+        token = poller.continuation_token()  # type: Optional[str]
+      except Exception:  # pylint: disable=broad-except
+        token = None
+      logger.warning('Operation {0:s} still running, continuation token: '
+                     '{1!s}'.format(name, token))
+      raise errors.OperationFailedError(
+          'Operation {0:s} did not complete within {1:.0f} seconds'.format(
+              name, timeout), __name__)
+    duration = time.monotonic() - start
+    logger.debug('Operation {0:s} completed in {1:.2f} seconds'.format(
+        name, duration))
+    if _OPERATION_METRICS_HOOK:
+      _OPERATION_METRICS_HOOK(name, duration)
+    return result
+
+  with futures.ThreadPoolExecutor(max_workers=len(operations)) as executor:
+    waiting = {
+        name: executor.submit(_Wait, name, poller)
+        for name, poller in operations.items()}
+    return {name: future.result() for name, future in waiting.items()}
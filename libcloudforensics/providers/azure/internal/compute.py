@@ -36,6 +36,8 @@ from libcloudforensics import logging_utils
 from libcloudforensics import errors
 from libcloudforensics.providers.azure.internal import compute_base_resource  # pylint: disable=line-too-long, ungrouped-imports
 from libcloudforensics.providers.azure.internal import common  # pylint: disable=line-too-long, ungrouped-imports
+from libcloudforensics.providers.azure.internal import storage as storage_module  # pylint: disable=line-too-long, ungrouped-imports
+from libcloudforensics.providers.utils import instance_type_utils
 
 from libcloudforensics.scripts import utils
 
@@ -254,9 +256,8 @@ class AZCompute:
           self.az_account.default_resource_group_name,
           disk_name,
           creation_data)
-      while not request.done():
-        sleep(5)  # Wait 5 seconds before checking disk status again
-      disk = request.result()
+      disk = common.WaitForOperation(
+          'create disk {0:s}'.format(disk_name), request)
       logger.info('Disk {0:s} successfully created'.format(disk_name))
     except azure_exceptions.CloudError as exception:
       raise errors.ResourceCreationError(
@@ -373,9 +374,8 @@ class AZCompute:
           self.az_account.default_resource_group_name,
           disk_name,
           creation_data)
-      while not request.done():
-        sleep(5)  # Wait 5 seconds before checking disk status again
-      disk = request.result()
+      disk = common.WaitForOperation(
+          'create disk {0:s}'.format(disk_name), request)
       logger.info('Disk {0:s} successfully created'.format(disk_name))
     except azure_exceptions.CloudError as exception:
       raise errors.ResourceCreationError(
@@ -510,9 +510,8 @@ class AZCompute:
           vm_name,
           creation_data
       )
-      while not request.done():
-        sleep(5)  # Wait 5 seconds before checking disk status again
-      vm = request.result()
+      vm = common.WaitForOperation(
+          'create instance {0:s}'.format(vm_name), request)
     except azure_exceptions.CloudError as exception:
       raise errors.ResourceCreationError(
           'Could not create instance {0:s}: {1!s}'.format(vm_name, exception),
@@ -575,6 +574,32 @@ class AZCompute:
         })
     return vm_sizes
 
+  def GetInstanceTypeCatalog(
+      self,
+      region: Optional[str] = None
+  ) -> instance_type_utils.InstanceTypeCatalog:
+    """Returns the cached catalog of VM sizes for a given region.
+
+    The catalog is shared by all AZCompute objects of the subscription, and
+    refreshed once its TTL expires. See instance_type_utils for details on
+    persisting catalogs across processes.
+
+    Args:
+      region (str): Optional. The region in which to look the instance types.
+          By default, look in the default_region associated to the AZAccount
+          object.
+
+    Returns:
+      InstanceTypeCatalog: The catalog of VM sizes available in the region.
+    """
+    if not region:
+      region = self.az_account.default_region
+    return instance_type_utils.GetInstanceTypeCatalog(
+        'azure',
+        self.az_account.subscription_id,
+        region,
+        lambda: self.ListInstanceTypes(region=region))
+
   def _GetInstanceType(
       self,
       cpu_cores: int,
@@ -600,32 +625,31 @@ class AZCompute:
     """
     if region is None:
       region = self.az_account.default_region
-    vm_sizes = self.ListInstanceTypes(region=region)
+    catalog = self.GetInstanceTypeCatalog(region=region)
     family_quotas = {}
-    for size in vm_sizes:
-      if size['CPU'] == cpu_cores and size['Memory'] == memory_in_mb:
-        if premium_io is True and size['PremiumIO'] is False:
-          continue
-        if size['Family'] not in family_quotas:
-          family_quotas[size['Family']] = False
-          logger.info('Fetching quota for family {0!s}'.format(size['Family']))
-          quota_response = self.quota_client.quota.get(
-              subscription_id=self.az_account.subscription_id,
-              provider_id='Microsoft.Compute',
-              location=region,
-              resource_name=size['Family'])
-          if quota_response.properties is not None and \
-            quota_response.properties.limit is not None and \
-            quota_response.properties.current_value is not None:
-            family_quotas[size['Family']] = (
-                quota_response.properties.limit > 0) and (
-                    quota_response.properties.current_value
-                    < quota_response.properties.limit)
-          if not family_quotas[size['Family']]:
-            continue
-        instance_type = size['Name']  # type: str
-        logger.info('Selected Instance Type: {0!s}'.format(size))
-        return instance_type
+    for size in catalog.FindInstanceTypes(cpu_cores, memory_in_mb):
+      if premium_io is True and size['PremiumIO'] is False:
+        continue
+      if size['Family'] not in family_quotas:
+        family_quotas[size['Family']] = False
+        logger.info('Fetching quota for family {0!s}'.format(size['Family']))
+        quota_response = self.quota_client.quota.get(
+            subscription_id=self.az_account.subscription_id,
+            provider_id='Microsoft.Compute',
+            location=region,
+            resource_name=size['Family'])
+        if quota_response.properties is not None and \
+          quota_response.properties.limit is not None and \
+          quota_response.properties.current_value is not None:
+          family_quotas[size['Family']] = (
+              quota_response.properties.limit > 0) and (
+                  quota_response.properties.current_value
+                  < quota_response.properties.limit)
+      if not family_quotas[size['Family']]:
+        continue
+      instance_type = size['Name']  # type: str
+      logger.info('Selected Instance Type: {0!s}'.format(size))
+      return instance_type
     raise ValueError(
         'No instance type found for the requested configuration: {0:d} CPU '
         'cores, {1:d} MB memory, Premium IO: {2!s}.'.format(
@@ -740,8 +764,8 @@ class AZComputeVirtualMachine(compute_base_resource.AZComputeResource):
     try:
       request = self.compute_client.virtual_machines.begin_update(
           self.resource_group_name, self.name, vm)
-      while not request.done():
-        sleep(5)  # Wait 5 seconds before checking vm status again
+      common.WaitForOperation(
+          'attach disk {0:s} to {1:s}'.format(disk.name, self.name), request)
     except azure_exceptions.CloudError as exception:
       raise RuntimeError(
           'Could not attach disk {0:s} to instance {1:s}: {2:s}'.format(
@@ -818,9 +842,8 @@ class AZComputeDisk(compute_base_resource.AZComputeResource):
           self.resource_group_name,
           snapshot_name,
           creation_data)
-      while not request.done():
-        sleep(5)  # Wait 5 seconds before checking snapshot status again
-      snapshot = request.result()
+      snapshot = common.WaitForOperation(
+          'create snapshot {0:s}'.format(snapshot_name), request)
       logger.info('Snapshot {0:s} successfully created'.format(snapshot_name))
     except azure_exceptions.CloudError as exception:
       raise errors.ResourceCreationError(
@@ -885,26 +908,32 @@ class AZComputeSnapshot(compute_base_resource.AZComputeResource):
       logger.info('Deleting snapshot: {0:s}'.format(self.name))
       request = self.compute_client.snapshots.begin_delete(
           self.resource_group_name, self.name)
-      while not request.done():
-        sleep(5)  # Wait 5 seconds before checking snapshot status again
+      common.WaitForOperation(
+          'delete snapshot {0:s}'.format(self.name), request)
       logger.info('Snapshot {0:s} successfully deleted.'.format(self.name))
     except azure_exceptions.CloudError as exception:
       raise errors.ResourceDeletionError(
           'Could not delete snapshot {0:s}: {1!s}'.format(
               self.resource_id, exception), __name__) from exception
 
-  def GrantAccessAndGetURI(self) -> str:
+  def GrantAccessAndGetURI(self, duration_in_seconds: int = 3600) -> str:
     """Grant access to a snapshot and return its access URI.
 
+    Args:
+      duration_in_seconds (int): Optional. The time (in seconds) during which
+          the access URI is valid. Default is 3600.
+
     Returns:
       str: The access URI for the snapshot.
     """
     logger.info('Generating SAS URI for snapshot: {0:s}'.format(self.name))
     access_grant = models.GrantAccessData(
-        access='Read', duration_in_seconds=3600)
+        access='Read', duration_in_seconds=duration_in_seconds)
     access_request = self.compute_client.snapshots.begin_grant_access(
         self.resource_group_name, self.name, access_grant)
-    snapshot_uri = access_request.result().access_sas  # type: str
+    snapshot_uri = common.WaitForOperation(
+        'grant access to {0:s}'.format(self.name),
+        access_request).access_sas  # type: str
     logger.info('SAS URI generated: {0:s}'.format(snapshot_uri))
     return snapshot_uri
 
@@ -913,5 +942,47 @@ class AZComputeSnapshot(compute_base_resource.AZComputeResource):
     logger.info('Revoking SAS URI for snapshot {0:s}'.format(self.name))
     request = self.compute_client.snapshots.begin_revoke_access(
         self.resource_group_name, self.name)
-    request.wait()
+    common.WaitForOperation(
+        'revoke access to {0:s}'.format(self.name), request)
     logger.info('SAS URI revoked for snapshot {0:s}'.format(self.name))
+
+  def Download(self,
+               output_path: str,
+               chunk_size: int = storage_module.DEFAULT_DOWNLOAD_CHUNK_SIZE,
+               max_workers: int = 16,
+               compute_hashes: bool = True,
+               duration_in_seconds: int = 3600) -> Dict[str, str]:
+    """Download the snapshot to a local raw image.
+
+    Access to the snapshot is granted for the duration of the download, and
+    revoked afterwards. Interrupted downloads are resumed when calling this
+    method again with the same output_path. See
+    storage.DownloadPageBlob() for details.
+
+    Args:
+      output_path (str): The path of the raw image to write.
+      chunk_size (int): Optional. The size (in bytes) of each range request.
+          Default is 8MB.
+      max_workers (int): Optional. The number of concurrent range requests.
+          Default is 16.
+      compute_hashes (bool): Optional. Whether to compute the MD5 and SHA256
+          hashes of the image while downloading. Default is True.
+      duration_in_seconds (int): Optional. The time (in seconds) during which
+          the snapshot access URI is valid. Default is 3600.
+
+    Returns:
+      Dict[str, str]: A dictionary mapping hash algorithms ('md5', 'sha256')
+          to the hex digest of the downloaded image. Empty if compute_hashes
+          is False.
+    """
+    snapshot_uri = self.GrantAccessAndGetURI(
+        duration_in_seconds=duration_in_seconds)
+    try:
+      return storage_module.DownloadPageBlob(
+          snapshot_uri,
+          output_path,
+          chunk_size=chunk_size,
+          max_workers=max_workers,
+          compute_hashes=compute_hashes)
+    finally:
+      self.RevokeAccessURI()
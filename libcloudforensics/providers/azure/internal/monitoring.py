@@ -14,17 +14,32 @@
 # limitations under the License.
 """Azure Monitoring functionality."""
 
-from typing import List, Optional, Dict, TYPE_CHECKING
+from concurrent import futures
+from typing import Any, Callable, List, Optional, Dict, TYPE_CHECKING
 
 from azure.mgmt.monitor import MonitorManagementClient
 from azure.core.exceptions import HttpResponseError
 
+from libcloudforensics import logging_utils
+
 if TYPE_CHECKING:
   # TYPE_CHECKING is always False at runtime, therefore it is safe to ignore
   # the following cyclic import, as it it only used for type hints
   from libcloudforensics.providers.azure.internal import account  # pylint: disable=cyclic-import
   from datetime import datetime
 
+logging_utils.SetUpLogger(__name__)
+logger = logging_utils.GetLogger(__name__)
+
+# Functions that can be used to aggregate metric values with AggregateMetrics.
+AGGREGATION_FUNCTIONS = {
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'mean': lambda values: sum(values) / len(values),
+    'last': lambda values: values[-1]
+}  # type: Dict[str, Callable[[List[float]], float]]
+
 
 class AZMonitoring:
   """Azure Monitoring.
@@ -100,6 +115,125 @@ class AZMonitoring:
       Dict[str, Dict[str, str]]: A dictionary mapping the metric to a dict of
           the metric's values, per timestamp.
 
+    Raises:
+        RuntimeError: If the resource could not be found.
+    """
+    metrics_data = self._ListMetrics(
+        resource_id, metrics, from_date=from_date, to_date=to_date,
+        interval=interval, aggregation=aggregation, qfilter=qfilter)
+    results = {}  # type: Dict[str, Dict[str, str]]
+    for metric in metrics_data.value:
+      values = {}
+      for timeserie in metric.timeseries:
+        for data in timeserie.data:
+          if data.time_stamp and data.total:
+            values[str(data.time_stamp)] = str(data.total)
+      results[metric.name.value] = values
+    return results
+
+  def GetMetricsForResources(
+      self,
+      resource_ids: List[str],
+      metrics: str,
+      from_date: Optional['datetime'] = None,
+      to_date: Optional['datetime'] = None,
+      interval: Optional[str] = None,
+      aggregation: str = 'Total',
+      qfilter: Optional[str] = None,
+      max_workers: int = 10) -> Dict[str, Dict[str, Dict[str, List[Any]]]]:
+    """Retrieve metrics for several resources concurrently.
+
+    Unlike GetMetricsForResource, values are returned in columnar form: for
+    each resource and metric, a list of timestamps and the list of
+    corresponding float values.
+
+    Args:
+      resource_ids (List[str]): The resource IDs for which to lookup the
+          metrics.
+      metrics (str): A comma separated list of metrics to retrieve. E.g.
+          'Percentage CPU,Network In'.
+      from_date (datetime.datetime): Optional. A start date from which to get
+          the metric. If passed, to_date is also required.
+      to_date (datetime.datetime): Optional. An end date until which to get the
+          metric. If passed, from_date is also required.
+      interval (str): An interval for the metrics, e.g. 'PT1H' will output
+          metric's values with one hour granularity.
+      aggregation (str): Optional. The type of aggregation for the metric's
+          values. Default is 'Total'. Possible values: 'Total', 'Average',
+          'Minimum', 'Maximum', 'Count'.
+      qfilter (str): Optional. A filter for the query. See
+          https://docs.microsoft.com/en-us/rest/api/monitor/metrics/list for
+          details about filtering.
+      max_workers (int): Optional. The maximum number of concurrent queries.
+          Default is 10.
+
+    Returns:
+      Dict[str, Dict[str, Dict[str, List[Any]]]]: A dictionary mapping each
+          resource ID to a dictionary mapping each metric to its columns,
+          e.g. {'resource_id': {'Percentage CPU': {
+              'timestamps': [datetime, ...], 'values': [0.5, ...]}}}.
+          Resources for which metrics could not be fetched are omitted.
+    """
+    value_attribute = aggregation.lower()
+
+    def _GetColumns(resource_id: str) -> Dict[str, Dict[str, List[Any]]]:
+      metrics_data = self._ListMetrics(
+          resource_id, metrics, from_date=from_date, to_date=to_date,
+          interval=interval, aggregation=aggregation, qfilter=qfilter)
+      columns = {}  # type: Dict[str, Dict[str, List[Any]]]
+      for metric in metrics_data.value:
+        timestamps = []  # type: List[Any]
+        values = []  # type: List[Any]
+        for timeserie in metric.timeseries:
+          for data in timeserie.data:
+            value = getattr(data, value_attribute, None)
+            if data.time_stamp and value is not None:
+              timestamps.append(data.time_stamp)
+              values.append(float(value))
+        columns[metric.name.value] = {'timestamps': timestamps,
+                                      'values': values}
+      return columns
+
+    results = {}  # type: Dict[str, Dict[str, Dict[str, List[Any]]]]
+    if not resource_ids:
+      return results
+    with futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(resource_ids))) as executor:
+      requests = {resource_id: executor.submit(_GetColumns, resource_id)
+                  for resource_id in resource_ids}
+      for resource_id, request in requests.items():
+        try:
+          results[resource_id] = request.result()
+        except RuntimeError as exception:
+          logger.warning(str(exception))
+    return results
+
+  def _ListMetrics(
+      self,
+      resource_id: str,
+      metrics: str,
+      from_date: Optional['datetime'] = None,
+      to_date: Optional['datetime'] = None,
+      interval: Optional[str] = None,
+      aggregation: str = 'Total',
+      qfilter: Optional[str] = None) -> Any:
+    """Query the Azure metrics API for a given resource.
+
+    Args:
+      resource_id (str): The resource ID for which to lookup the metric.
+      metrics (str): A comma separated list of metrics to retrieve.
+      from_date (datetime.datetime): Optional. A start date from which to get
+          the metric. If passed, to_date is also required.
+      to_date (datetime.datetime): Optional. An end date until which to get the
+          metric. If passed, from_date is also required.
+      interval (str): An interval for the metrics.
+      aggregation (str): Optional. The type of aggregation for the metric's
+          values. Default is 'Total'.
+      qfilter (str): Optional. A filter for the query.
+
+    Returns:
+      Response: The Azure metrics API response.
+
     Raises:
         RuntimeError: If the resource could not be found.
     """
@@ -111,7 +245,7 @@ class AZMonitoring:
     if interval:
       kwargs['interval'] = interval
     try:
-      metrics_data = self.monitoring_client.metrics.list(
+      return self.monitoring_client.metrics.list(
           resource_id, filter=qfilter, **kwargs)
     except HttpResponseError as exception:
       raise RuntimeError(
@@ -119,12 +253,36 @@ class AZMonitoring:
           'sure you specified the full resource ID  url, i.e. /subscriptions/'
           '<>/resourceGroups/<>/providers/<>/<>/yourResourceName'.format(
               metrics, resource_id)) from exception
-    results = {}  # type: Dict[str, Dict[str, str]]
-    for metric in metrics_data.value:
-      values = {}
-      for timeserie in metric.timeseries:
-        for data in timeserie.data:
-          if data.time_stamp and data.total:
-            values[str(data.time_stamp)] = str(data.total)
-      results[metric.name.value] = values
-    return results
+
+
+def AggregateMetrics(
+    metrics_columns: Dict[str, Dict[str, Dict[str, List[Any]]]],
+    function: str = 'mean') -> Dict[str, Dict[str, float]]:
+  """Aggregate columnar metrics returned by GetMetricsForResources.
+
+  Args:
+    metrics_columns (Dict[str, Dict[str, Dict[str, List[Any]]]]): Metrics
+        as returned by AZMonitoring.GetMetricsForResources.
+    function (str): Optional. The aggregation function to apply to each
+        metric's values. One of 'min', 'max', 'sum', 'mean' or 'last'.
+        Default is 'mean'.
+
+  Returns:
+    Dict[str, Dict[str, float]]: A dictionary mapping each resource ID to a
+        dictionary mapping each metric to its aggregated value. Metrics
+        without values are omitted.
+
+  Raises:
+    ValueError: If the aggregation function is not supported.
+  """
+  if function not in AGGREGATION_FUNCTIONS:
+    raise ValueError(
+        'Unsupported aggregation function {0:s}. Supported functions: '
+        '{1:s}'.format(function, ', '.join(AGGREGATION_FUNCTIONS)))
+  aggregate = AGGREGATION_FUNCTIONS[function]
+  results = {}  # type: Dict[str, Dict[str, float]]
+  for resource_id, resource_metrics in metrics_columns.items():
+    results[resource_id] = {
+        metric: float(aggregate(columns['values']))
+        for metric, columns in resource_metrics.items() if columns['values']}
+  return results
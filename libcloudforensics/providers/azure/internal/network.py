@@ -112,13 +112,15 @@ class AZNetwork:
           self.az_account.default_resource_group_name,
           network_interface_name,
           creation_data)
-      request.wait()
+      nic = common.WaitForOperation(
+          'create network interface {0:s}'.format(network_interface_name),
+          request)
     except azure_exceptions.AzureError as exception:
       raise errors.ResourceCreationError(
           'Could not create network interface: {0!s}'.format(exception),
           __name__) from exception
 
-    network_interface_id = request.result().id  # type: str
+    network_interface_id = nic.id  # type: str
     return network_interface_id
 
   def _CreateNetworkInterfaceElements(
@@ -154,30 +156,30 @@ class AZNetwork:
     # Network security group
     nsg_name = '{0:s}-nsg'.format(name_prefix)
 
-    client_to_creation_data = {
-        self.network_client.public_ip_addresses: {
+    name_to_creation_data = {
+        public_ip_name: (self.network_client.public_ip_addresses, {
             'resource_group_name': self.az_account.default_resource_group_name,
             'public_ip_address_name': public_ip_name,
             'parameters': {
                 'location': region,
                 'public_ip_allocation_method': 'Dynamic'
             }
-        },
-        self.network_client.virtual_networks: {
+        }),
+        vnet_name: (self.network_client.virtual_networks, {
             'resource_group_name': self.az_account.default_resource_group_name,
             'virtual_network_name': vnet_name,
             'parameters': {
                 'location': region,
                 'address_space': {'address_prefixes': ['10.0.0.0/16']}
             }
-        },
-        self.network_client.subnets: {
+        }),
+        subnet_name: (self.network_client.subnets, {
             'resource_group_name': self.az_account.default_resource_group_name,
             'virtual_network_name': vnet_name,
             'subnet_name': subnet_name,
             'subnet_parameters': {'address_prefix': '10.0.0.0/24'}
-        },
-        self.network_client.network_security_groups: {
+        }),
+        nsg_name: (self.network_client.network_security_groups, {
             'resource_group_name': self.az_account.default_resource_group_name,
             'network_security_group_name': nsg_name,
             'parameters': {
@@ -195,20 +197,26 @@ class AZNetwork:
                     'priority': 300
                 }]
             }
-        }
-    }  # type: Dict[str, Any]
+        })
+    }  # type: Dict[str, Tuple[Any, Dict[str, Any]]]
 
-    result = []
+    result = {}  # type: Dict[str, Any]
     try:
-      for client, data in client_to_creation_data.items():
-        request = common.ExecuteRequest(
-            client,
-            'begin_create_or_update',
-            data)[0]
-        request.wait()
-        result.append(request.result())
+      # The subnet can only be created once its virtual network exists, the
+      # other elements are created concurrently.
+      for names in ([public_ip_name, vnet_name, nsg_name], [subnet_name]):
+        requests = {}
+        for name in names:
+          client, data = name_to_creation_data[name]
+          requests[name] = common.ExecuteRequest(
+              client,
+              'begin_create_or_update',
+              data)[0]
+        result.update(common.WaitForOperations(requests))
     except azure_exceptions.AzureError as exception:
       raise errors.ResourceCreationError(
           'Could not create network interface elements: {0!s}'.format(
               exception), __name__) from exception
-    return tuple(result)
+    return tuple(
+        result[name] for name in (public_ip_name, vnet_name, subnet_name,
+                                  nsg_name))
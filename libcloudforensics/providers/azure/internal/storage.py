@@ -14,16 +14,19 @@
 # limitations under the License.
 """Azure Storage functionality."""
 
-from typing import TYPE_CHECKING, Optional, Tuple
+import hashlib
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, List
 
 # pylint: disable=import-error
 from azure.mgmt import storage
+from azure.storage import blob
 from msrestazure import azure_exceptions
 # pylint: enable=import-error
 
 from libcloudforensics import logging_utils
 from libcloudforensics import errors
 from libcloudforensics.providers.azure.internal import common
+from libcloudforensics.providers.utils import download_utils
 
 if TYPE_CHECKING:
   # TYPE_CHECKING is always False at runtime, therefore it is safe to ignore
@@ -34,6 +37,9 @@ if TYPE_CHECKING:
 logging_utils.SetUpLogger(__name__)
 logger = logging_utils.GetLogger(__name__)
 
+# Size of the byte ranges fetched by each request when downloading blobs.
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class AZStorage:
   """Azure Storage functionality.
@@ -100,9 +106,10 @@ class AZStorage:
         storage_account_name,
         creation_data
     )
+    storage_account = common.WaitForOperation(
+        'create storage account {0:s}'.format(storage_account_name), request)
     logger.info('Storage account {0:s} successfully created'.format(
         storage_account_name))
-    storage_account = request.result()
     storage_account_keys = self.storage_client.storage_accounts.list_keys(
         self.az_account.default_resource_group_name, storage_account_name)
     storage_account_keys = {key.key_name: key.value
@@ -128,3 +135,86 @@ class AZStorage:
       raise errors.ResourceDeletionError(
           'Could not delete account storage {0:s}: {1:s}'.format(
               storage_account_name, str(exception)), __name__) from exception
+
+
+def DownloadPageBlob(sas_uri: str,
+                     output_path: str,
+                     chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+                     max_workers: int = 16,
+                     compute_hashes: bool = True) -> Dict[str, str]:
+  """Download a page blob (e.g. a snapshot VHD) to a local raw image.
+
+  Only the pages holding data, as reported by the page ranges API, are
+  downloaded: they are fetched with concurrent range requests and written at
+  their offset in a preallocated sparse file. Unallocated pages are left as
+  holes in the output file.
+
+  The download can be resumed: progress is recorded in a sidecar file named
+  after output_path with a .progress suffix, which is removed once the
+  download completes. A download is only resumed if the blob (identified by
+  its URL without the SAS token, and its ETag) did not change. See
+  download_utils.DownloadRanges for details; at most max_workers chunks are
+  held in memory (128MB with the defaults).
+
+  Args:
+    sas_uri (str): A SAS URI granting read access to the page blob, e.g. as
+        returned by AZComputeSnapshot.GrantAccessAndGetURI().
+    output_path (str): The path of the raw image to write.
+    chunk_size (int): Optional. The size (in bytes) of each range request.
+        Must be a multiple of 512. Default is 8MB.
+    max_workers (int): Optional. The number of concurrent range requests.
+        Default is 16.
+    compute_hashes (bool): Optional. Whether to compute the MD5 and SHA256
+        hashes of the image while downloading. Default is True.
+
+  Returns:
+    Dict[str, str]: A dictionary mapping hash algorithms ('md5', 'sha256') to
+        the hex digest of the downloaded image. Empty if compute_hashes is
+        False.
+
+  Raises:
+    ValueError: If chunk_size is not a multiple of 512.
+    ResourceCreationError: If the target drive does not have enough space.
+  """
+  if chunk_size <= 0 or chunk_size % 512:
+    raise ValueError('chunk_size must be a positive multiple of 512, got '
+                     '{0:d}'.format(chunk_size))
+
+  blob_client = blob.BlobClient.from_blob_url(sas_uri)
+  properties = blob_client.get_blob_properties()
+  size = properties.size  # type: int
+
+  chunks = []  # type: List[Tuple[int, int]]
+  for page_range in blob_client.list_page_ranges():
+    if page_range.cleared:
+      continue
+    # Page range ends are inclusive.
+    start, end = page_range.start or 0, (page_range.end or 0) + 1
+    for offset in range(start, end, chunk_size):
+      chunks.append((offset, min(chunk_size, end - offset)))
+  data_size = sum(length for _, length in chunks)
+  logger.info('Downloading {0:d} bytes of data out of {1:d} bytes to '
+              '{2:s}'.format(data_size, size, output_path))
+
+  # The SAS token changes with each grant, it is not part of the identity.
+  source = {'url': sas_uri.split('?', 1)[0], 'etag': properties.etag,
+            'size': size, 'chunk_size': chunk_size}
+
+  def _FetchChunk(offset: int, length: int) -> bytes:
+    data = blob_client.download_blob(
+        offset=offset, length=length).readall()  # type: bytes
+    return data
+
+  hashers = {}  # type: Dict[str, 'hashlib._Hash']
+  if compute_hashes:
+    hashers = {'md5': hashlib.md5(), 'sha256': hashlib.sha256()}
+
+  def _UpdateHashes(data: bytes) -> None:
+    for hasher in hashers.values():
+      hasher.update(data)
+
+  download_utils.DownloadRanges(
+      output_path, size, chunks, _FetchChunk, source, max_workers,
+      update_hash=_UpdateHashes if hashers else None)
+  logger.info('Download of {0:s} complete'.format(output_path))
+  return {name: hasher.hexdigest() for name, hasher in hashers.items()}
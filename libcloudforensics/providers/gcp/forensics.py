@@ -18,7 +18,9 @@ import base64
 import random
 import re
 import subprocess
-from typing import List, Tuple, Optional, Dict, Any, Union, Sequence
+import time
+from concurrent import futures
+from typing import List, Tuple, Optional, Dict, Any, Union, Sequence, Callable
 
 from google.auth.exceptions import DefaultCredentialsError
 from google.auth.exceptions import RefreshError
@@ -30,12 +32,21 @@ from libcloudforensics import prompts
 from libcloudforensics.providers.gcp.internal import common
 from libcloudforensics.providers.gcp.internal import compute
 from libcloudforensics.providers.gcp.internal import gke
+from libcloudforensics.providers.gcp.internal import monitoring
 from libcloudforensics.providers.gcp.internal import project as gcp_project
 from libcloudforensics.providers.kubernetes import mitigation
 
 logging_utils.SetUpLogger(__name__)
 logger = logging_utils.GetLogger(__name__)
 
+# Time (in seconds) after which an SSH connection attempt is abandoned.
+SSH_TIMEOUT = 30
+# Time (in seconds) after which a triage collector is abandoned, and its data
+# left out of the triage report.
+TRIAGE_COLLECTOR_TIMEOUT = 300
+# Number of instances whose data is collected concurrently in a fleet triage.
+DEFAULT_FLEET_TRIAGE_WORKERS = 8
+
 
 def CreateDiskCopy(
     src_proj: str,
@@ -508,7 +519,8 @@ def VMRemoveServiceAccount(
 
 
 def CheckInstanceSSHAuth(project_id: str,
-                         instance_name: str) -> Optional[List[str]]:
+                         instance_name: str,
+                         timeout: int = SSH_TIMEOUT) -> Optional[List[str]]:
   """Check enabled SSH authentication methods for an instance.
 
   Uses SSH with the verbose flag to check enabled SSH authentication methods.
@@ -520,11 +532,31 @@ def CheckInstanceSSHAuth(project_id: str,
   Args:
     project_id (str): the project id for the instance.
     instance_name (str): the instance name to check.
+    timeout (int): Optional. Time (in seconds) after which the SSH
+        connection to an address is abandoned. Default is 30 seconds.
 
   Returns:
     List[str]: The SSH authentication methods supported by the instance or
       None if SSH wasn't accessible.
   """
+  project = gcp_project.GoogleCloudProject(project_id)
+  instance = project.compute.GetInstance(instance_name)
+  return _CheckSSHAuth(instance.GetNatIps(), timeout)
+
+
+def _CheckSSHAuth(
+    external_ips: List[str], timeout: int) -> Optional[List[str]]:
+  """Check enabled SSH authentication methods on a list of addresses.
+
+  Args:
+    external_ips (List[str]): The addresses to connect to, in order.
+    timeout (int): Time (in seconds) after which the SSH connection to an
+        address is abandoned.
+
+  Returns:
+    List[str]: The SSH authentication methods supported on the first address
+      from which they could be read, or None if SSH wasn't accessible.
+  """
   ssh_auth_pattern = re.compile(r'Authentications that can continue: (.*)')
   # Arguments intended to prevent SSH from picking up any configuration from
   # the host environment.
@@ -540,15 +572,16 @@ def CheckInstanceSSHAuth(project_id: str,
               '-oNumberOfPasswordPrompts=0',
               '-oUserKnownHostsFile=/dev/null']
 
-  project = gcp_project.GoogleCloudProject(project_id)
-  instance = project.compute.GetInstance(instance_name)
-  external_ips = instance.GetNatIps()
-
   for ip in external_ips:
     ssh_command = ssh_args + ['root@{0:s}'.format(ip)]  # type: Sequence[str]
-    # pylint: disable=subprocess-run-check
-    ssh_run = subprocess.run(ssh_command, capture_output=True)
-    # pylint: enable=subprocess-run-check
+    try:
+      # pylint: disable=subprocess-run-check
+      ssh_run = subprocess.run(
+          ssh_command, capture_output=True, timeout=timeout)
+      # pylint: enable=subprocess-run-check
+    except subprocess.TimeoutExpired:
+      logger.warning('SSH connection to {0:s} timed out'.format(ip))
+      continue
     ssh_stderr = ssh_run.stderr.decode()
 
     pattern_match = ssh_auth_pattern.search(ssh_stderr)
@@ -583,125 +616,144 @@ def QuarantineGKEWorkload(project_id: str,
   logger.info('Starting GKE quarantining process...')
 
   cluster = gke.GkeCluster(project_id, location, cluster_id)
-  maybe_workload = cluster.FindWorkload(workload_id, namespace)
-  if not maybe_workload:
-    raise errors.ResourceNotFoundError(
-        'Workload not found. Cannot proceed with quarantining process.',
-        __name__)
-  # If we directly assigned to `workload`, mypy would consider it of type
-  # `Optional[K8sWorkload]`, causing type check failures below. Doing it
-  # indirectly after the `if not` check allows mypy to infer that `workload`
-  # is of type `K8sWorkload`.
-  workload = maybe_workload
-  logger.info(
-      'Workload "{0:s}" in namespace "{1:s}"...'.format(workload_id, namespace))
-
-  workload_nodes = workload.GetCoveredNodes()
-  workload_pods = workload.GetCoveredPods()
-
-  def CordonNodes() -> None:
-    """Cordons the compromised nodes."""
-    for node in workload_nodes:
-      logger.info(
-          'Cordoning Kubernetes node {0:s} from {1:s} '
-          'deployment...'.format(node.name, workload.name))
-      node.Cordon()
-
-  def AbandonNodes() -> None:
-    """Abandons the nodes from their respective managed instance groups."""
-    compute_project = compute.GoogleCloudCompute(project_id)
-    groups_by_instance = compute_project.ListMIGSByInstanceName(location)
-    for node in workload_nodes:
-      if node.name in groups_by_instance:
+  # The quarantining process reads the same Kubernetes objects repeatedly,
+  # serve them from a cache kept up to date with watches.
+  cluster.EnableCache()
+  try:
+    maybe_workload = cluster.FindWorkload(workload_id, namespace)
+    if not maybe_workload:
+      raise errors.ResourceNotFoundError(
+          'Workload not found. Cannot proceed with quarantining process.',
+          __name__)
+    # If we directly assigned to `workload`, mypy would consider it of type
+    # `Optional[K8sWorkload]`, causing type check failures below. Doing it
+    # indirectly after the `if not` check allows mypy to infer that
+    # `workload` is of type `K8sWorkload`.
+    workload = maybe_workload
+    logger.info('Workload "{0:s}" in namespace "{1:s}"...'.format(
+        workload_id, namespace))
+
+    workload_nodes = workload.GetCoveredNodes()
+    workload_pods = workload.GetCoveredPods()
+
+    def CordonNodes() -> None:
+      """Cordons the compromised nodes."""
+      for node in workload_nodes:
         logger.info(
-            'Abandoning instance {0:s} from respective managed instance '
-            'group...'.format(node.name))
-        instance = compute_project.GetInstance(node.name)
-        instance.AbandonFromMIG(groups_by_instance[instance.name])
-      else:
-        logger.warning(
-            'Could not abandon {0:s} from respective managed instance '
-            'group, parent managed instance group not found.'.format(node.name))
-
-  def IsolatePods() -> None:
-    """Isolates the pods via Kubernetes NetworkPolicy."""
-    logger.info(
-        'Creating deny-all NetworkPolicy for {0:s} '
-        'workload...'.format(workload_id))
-    mitigation.IsolatePodsWithNetworkPolicy(cluster, workload_pods,
-                                            existing_policies_prompt=True)
-
-  def DrainNodes() -> None:
-    """Drains the workload nodes from other pods."""
-    logger.info('Draining workload nodes from other pods...')
-    mitigation.DrainWorkloadNodesFromOtherPods(workload, cordon=False)
-
-  def OrphanPods() -> None:
-    """Orphans the pods of the workload."""
-    logger.info(
-        'Orphaning Kubernetes workload {0:s}\'s pods...'.format(workload_id))
-    workload.OrphanPods()
-
-  def FirewallNodes() -> None:
-    """Puts each node from the workload into network quarantine."""
-    for node in workload_nodes:
+            'Cordoning Kubernetes node {0:s} from {1:s} '
+            'deployment...'.format(node.name, workload.name))
+        node.Cordon()
+
+    def AbandonNodes() -> None:
+      """Abandons the nodes from their respective managed instance groups."""
+      compute_project = compute.GoogleCloudCompute(project_id)
+      groups_by_instance = compute_project.ListMIGSByInstanceName(location)
+      for node in workload_nodes:
+        if node.name in groups_by_instance:
+          logger.info(
+              'Abandoning instance {0:s} from respective managed instance '
+              'group...'.format(node.name))
+          instance = compute_project.GetInstance(node.name)
+          instance.AbandonFromMIG(groups_by_instance[instance.name])
+        else:
+          logger.warning(
+              'Could not abandon {0:s} from respective managed instance '
+              'group, parent managed instance group not found.'.format(
+                  node.name))
+
+    def IsolatePods() -> None:
+      """Isolates the pods via Kubernetes NetworkPolicy."""
       logger.info(
-          ('Putting instance "{0:s}" from workload "{1:s}" into network'
-           ' quarantine...').format(node.name, workload_id))
-      InstanceNetworkQuarantine(project_id, node.name,
-                                exempted_src_ips=exempted_src_ips)
-
-  # Third prompt options
-  isolate_nodes = prompts.PromptOption('Isolate nodes', FirewallNodes)
-  isolate_pods = prompts.PromptOption('Isolate pods', IsolatePods)
-  isolate_nodes_and_pods = prompts.PromptOption(
-      'Isolate nodes and pods', DrainNodes, FirewallNodes)
-
-  # Second prompt options, defined afterwards so that we can link disables
-  preserve_delete = prompts.PromptOption(
-      'Preserve evidence and delete workload', OrphanPods)
-  preserve_preserve = prompts.PromptOption(
-      'Preserve evidence and preserve workload',
-      # No functions are called when this option is selected, a multi prompt
-      # was favored over a yes/no prompt for clarity
-      disable_options=[
-          (
-              isolate_nodes,
-              'Isolating nodes will cause workload pods to appear elsewhere.'),
-          (
-              isolate_nodes_and_pods,
-              'Isolating nodes will cause workload pods to appear elsewhere.')
-      ])
-
-  prompt_sequence = prompts.PromptSequence(
-      prompts.YesNoPrompt(
-          prompts.PromptOption(
-              'Abandon nodes from managed instance group', AbandonNodes),
-          default_yes=True),
-      prompts.YesNoPrompt(
-          prompts.PromptOption('Cordon nodes', CordonNodes), default_yes=True),
-      prompts.MultiPrompt([
-          preserve_delete,
-          preserve_preserve,
-      ]),
-      prompts.MultiPrompt([isolate_nodes, isolate_pods,
-                           isolate_nodes_and_pods]),
-  )
-
-  # If network policy is disabled, disable the isolate_pods prompt because
-  # it will raise an error
-  if not cluster.IsNetworkPolicyEnabled():
-    isolate_pods.Disable('NetworkPolicy not enabled.')
-
-  prompt_sequence.Run(summarize=True)
-
+          'Creating deny-all NetworkPolicy for {0:s} '
+          'workload...'.format(workload_id))
+      mitigation.IsolatePodsWithNetworkPolicy(cluster, workload_pods,
+                                              existing_policies_prompt=True)
+
+    def DrainNodes() -> None:
+      """Drains the workload nodes from other pods."""
+      logger.info('Draining workload nodes from other pods...')
+      mitigation.DrainWorkloadNodesFromOtherPods(workload, cordon=False)
+
+    def OrphanPods() -> None:
+      """Orphans the pods of the workload."""
+      logger.info(
+          'Orphaning Kubernetes workload {0:s}\'s pods...'.format(workload_id))
+      workload.OrphanPods()
 
-def TriageInstance(project_id: str, instance_name: str) -> Dict[str, Any]:
+    def FirewallNodes() -> None:
+      """Puts each node from the workload into network quarantine."""
+      for node in workload_nodes:
+        logger.info(
+            ('Putting instance "{0:s}" from workload "{1:s}" into network'
+             ' quarantine...').format(node.name, workload_id))
+        InstanceNetworkQuarantine(project_id, node.name,
+                                  exempted_src_ips=exempted_src_ips)
+
+    # Third prompt options
+    isolate_nodes = prompts.PromptOption('Isolate nodes', FirewallNodes)
+    isolate_pods = prompts.PromptOption('Isolate pods', IsolatePods)
+    isolate_nodes_and_pods = prompts.PromptOption(
+        'Isolate nodes and pods', DrainNodes, FirewallNodes)
+
+    # Second prompt options, defined afterwards so that we can link disables
+    preserve_delete = prompts.PromptOption(
+        'Preserve evidence and delete workload', OrphanPods)
+    preserve_preserve = prompts.PromptOption(
+        'Preserve evidence and preserve workload',
+        # No functions are called when this option is selected, a multi prompt
+        # was favored over a yes/no prompt for clarity
+        disable_options=[
+            (
+                isolate_nodes,
+                'Isolating nodes will cause workload pods to appear '
+                'elsewhere.'),
+            (
+                isolate_nodes_and_pods,
+                'Isolating nodes will cause workload pods to appear elsewhere.')
+        ])
+
+    prompt_sequence = prompts.PromptSequence(
+        prompts.YesNoPrompt(
+            prompts.PromptOption(
+                'Abandon nodes from managed instance group', AbandonNodes),
+            default_yes=True),
+        prompts.YesNoPrompt(
+            prompts.PromptOption('Cordon nodes', CordonNodes),
+            default_yes=True),
+        prompts.MultiPrompt([
+            preserve_delete,
+            preserve_preserve,
+        ]),
+        prompts.MultiPrompt([isolate_nodes, isolate_pods,
+                             isolate_nodes_and_pods]),
+    )
+
+    # If network policy is disabled, disable the isolate_pods prompt because
+    # it will raise an error
+    if not cluster.IsNetworkPolicyEnabled():
+      isolate_pods.Disable('NetworkPolicy not enabled.')
+
+    prompt_sequence.Run(summarize=True)
+  finally:
+    cluster.DisableCache()
+
+
+def TriageInstance(
+    project_id: str,
+    instance_name: str,
+    timeout: int = TRIAGE_COLLECTOR_TIMEOUT) -> Dict[str, Any]:
   """Gather triage information for an instance.
 
+  The triage data is gathered by independent collectors, run concurrently.
+  The data of a collector that fails or times out is None, and the other
+  collectors' data is still returned. The status and duration of each
+  collector is reported under 'collectors'.
+
   Args:
     project_id (str): the project id for the instance.
     instance_name (str): the instance name to check.
+    timeout (int): Optional. Time (in seconds) after which a collector is
+        abandoned. Default is 5 minutes.
 
   Returns:
     Dict[str, Any]: The instance triage information.
@@ -710,36 +762,322 @@ def TriageInstance(project_id: str, instance_name: str) -> Dict[str, Any]:
   project = gcp_project.GoogleCloudProject(project_id)
   instance = project.compute.GetInstance(instance_name)
   instance_info = instance.GetOperation()
+  nat_ips = instance.GetNatIps(instance_info)
+
+  results, collectors = _RunTriageCollectors({
+      'ancestry': lambda: _ParseAncestry(project),
+      'firewalls': lambda: instance.GetNormalisedFirewalls(instance_info),
+      'metrics': lambda: _CollectMetrics(project, [instance_info['id']]),
+      'gke_gpu_usage': project.monitoring.GetNodeAccelUsage,
+      'ssh_auth': lambda: _CheckSSHAuth(nat_ips, min(SSH_TIMEOUT, timeout)),
+      'active_services': lambda: _ParseActiveServices(project),
+  }, timeout)
+  _AddInstanceMetrics(
+      instance_info['id'], results.pop('metrics', None),
+      collectors.pop('metrics'), results, collectors)
+
+  return _InstanceTriageReport(
+      instance_info, nat_ips, results, collectors,
+      ('firewalls', 'cpu_usage', 'gce_gpu_usage', 'gke_gpu_usage',
+       'ssh_auth', 'active_services', 'anomalies'))
+
+
+def TriageInstances(
+    project_id: str,
+    instance_names: Optional[List[str]] = None,
+    labels: Optional[Dict[str, str]] = None,
+    timeout: int = TRIAGE_COLLECTOR_TIMEOUT,
+    max_workers: int = DEFAULT_FLEET_TRIAGE_WORKERS) -> Dict[str, Any]:
+  """Gather triage information for many instances of a project.
+
+  Project-level data (ancestry, active services and GKE GPU usage) is
+  collected once. Metrics are queried once for all instances, and the
+  per-instance collectors (firewalls and SSH authentication) run
+  concurrently for all instances. Instances are ranked by how anomalous
+  their metrics are.
+
+  Args:
+    project_id (str): the project id of the instances.
+    instance_names (List[str]): Optional. The names of the instances to
+        triage.
+    labels (Dict[str, str]): Optional. Triage the instances that have all
+        these labels, e.g. {'env': 'prod'}.
+    timeout (int): Optional. Time (in seconds) after which a collector is
+        abandoned. Default is 5 minutes. The deadline is per instance, not
+        for the whole fleet: the per-instance collectors of an instance get
+        the full timeout from the time a worker picks the instance up, so
+        triaging more than max_workers instances may take several times
+        the timeout.
+    max_workers (int): Optional. The number of instances whose
+        per-instance data is collected concurrently. Default is 8.
+
+  Returns:
+    Dict[str, Any]: The triage information, in the format
+      {
+        'project_id': str,
+        'project_data': List[Dict[str, Any]],  # With 'data_type' and 'values'
+        'collectors': Dict[str, Dict[str, Any]],  # Project-level collectors
+        'anomaly_ranking': List[Dict[str, Any]],
+        'instances': List[Dict[str, Any]],  # See TriageInstance
+        'errors': Dict[str, str],  # Instances that could not be triaged
+      }
+
+  Raises:
+    ValueError: If not exactly one of instance_names and labels is given.
+  """
+  if (instance_names is None) == (labels is None):
+    raise ValueError('Exactly one of instance_names and labels must be given.')
+
+  project = gcp_project.GoogleCloudProject(project_id)
+  listed_instances = {}  # type: Dict[str, Tuple[compute.GoogleComputeInstance, Dict[str, Any]]] # pylint: disable=line-too-long
+  if labels is not None:
+    # The listed instance resources are used as their API operation objects.
+    listed_instances = project.compute.ListInstanceByLabelsWithInfo(
+        labels, filter_union=False)
+    requested_names = list(listed_instances)
+  else:
+    requested_names = list(dict.fromkeys(instance_names or []))
+
+  def _LookUp(
+      name: str) -> Tuple[compute.GoogleComputeInstance, Dict[str, Any]]:
+    if name in listed_instances:
+      return listed_instances[name]
+    # The instance is fetched with its API operation object at once.
+    return project.compute.GetInstanceWithInfo(name)
+
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    lookups = {name: executor.submit(_LookUp, name) for name in requested_names}
+    instances = {}  # type: Dict[str, compute.GoogleComputeInstance]
+    instance_infos = {}  # type: Dict[str, Dict[str, Any]]
+    instance_errors = {}  # type: Dict[str, str]
+    for name, lookup in lookups.items():
+      try:
+        instances[name], instance_infos[name] = lookup.result()
+      except Exception as exception:  # pylint: disable=broad-except
+        instance_errors[name] = str(exception)
+    if not instance_infos:
+      # Metrics queried without instance IDs would cover the whole project.
+      logger.warning('No instance to triage in project {0:s}'.format(
+          project_id))
+      return {
+          'project_id': project_id,
+          'project_data': [],
+          'collectors': {},
+          'anomaly_ranking': [],
+          'instances': [],
+          'errors': instance_errors,
+      }
+    instance_ids = [info['id'] for info in instance_infos.values()]
+
+    # Per-instance data is collected in the background, while the project
+    # and metrics data is collected once for all instances.
+    def _TriageInstance(
+        name: str) -> Tuple[List[str], Dict[str, Any], Dict[str, Any]]:
+      instance = instances[name]
+      nat_ips = instance.GetNatIps(instance_infos[name])
+      results, collectors = _RunTriageCollectors({
+          'firewalls': lambda: instance.GetNormalisedFirewalls(
+              instance_infos[name]),
+          'ssh_auth': lambda: _CheckSSHAuth(
+              nat_ips, min(SSH_TIMEOUT, timeout)),
+      }, timeout)
+      return nat_ips, results, collectors
+    instance_triages = {
+        name: executor.submit(_TriageInstance, name)
+        for name in instance_infos
+    }
+
+    project_results, project_collectors = _RunTriageCollectors({
+        'ancestry': lambda: _ParseAncestry(project),
+        'active_services': lambda: _ParseActiveServices(project),
+        'gke_gpu_usage': project.monitoring.GetNodeAccelUsage,
+        'metrics': lambda: _CollectMetrics(project, instance_ids),
+    }, timeout)
+    metrics = project_results.get('metrics')
+
+    instance_reports = []
+    for name, instance_triage in instance_triages.items():
+      instance_id = instance_infos[name]['id']
+      try:
+        nat_ips, results, collectors = instance_triage.result()
+      except Exception as exception:  # pylint: disable=broad-except
+        instance_errors[name] = str(exception)
+        continue
+      results['ancestry'] = project_results.get('ancestry')
+      _AddInstanceMetrics(
+          instance_id, metrics, project_collectors['metrics'], results,
+          collectors)
+      instance_reports.append(_InstanceTriageReport(
+          instance_infos[name], nat_ips, results, collectors,
+          ('firewalls', 'cpu_usage', 'gce_gpu_usage', 'ssh_auth',
+           'anomalies')))
+
+  names = {info['id']: name for name, info in instance_infos.items()}
+  return {
+      'project_id': project_id,
+      'project_data': [{
+          'data_type': data_type, 'values': project_results.get(data_type)
+      } for data_type in ('ancestry', 'active_services', 'gke_gpu_usage')],
+      'collectors': project_collectors,
+      'anomaly_ranking': [{
+          'instance_name': names.get(instance['instance_id']),
+          'instance_id': instance['instance_id'],
+          'score': instance['score'],
+          'flagged': instance['flagged'],
+      } for instance in (metrics or {}).get('anomaly_ranking', [])],
+      'instances': instance_reports,
+      'errors': instance_errors,
+  }
+
+
+def _ParseAncestry(project: 'gcp_project.GoogleCloudProject') -> str:
+  """Describes the ancestry of a project.
 
-  ancestry = project.cloudresourcemanager.ProjectAncestry()
+  Args:
+    project (GoogleCloudProject): The project.
+
+  Returns:
+    str: The ancestors of the project, e.g.
+        'project (projects/1) -> folder (folders/2)'.
+  """
   parsed_ancestry = []
-  for resource in ancestry:
+  for resource in project.cloudresourcemanager.ProjectAncestry():
     name = resource.get('displayName', '')
     resource_id = resource.get('name', '')
     parsed_ancestry.append('{0:s} ({1:s})'.format(name, resource_id))
-  ancestry_string = ' -> '.join(parsed_ancestry)
+  return ' -> '.join(parsed_ancestry)
+
+
+def _ParseActiveServices(
+    project: 'gcp_project.GoogleCloudProject') -> List[Dict[str, Any]]:
+  """Lists the active services of a project, with their number of uses.
+
+  Args:
+    project (GoogleCloudProject): The project.
+
+  Returns:
+    List[Dict[str, Any]]: The 'service' and 'count' of each active service.
+  """
+  return [{'service': service, 'count': count}
+          for service, count in project.monitoring.ActiveServices().items()]
+
+
+def _CollectMetrics(
+    project: 'gcp_project.GoogleCloudProject',
+    instance_ids: List[str]) -> Dict[str, Any]:
+  """Collects the usage metrics of instances, querying each metric once.
+
+  The usage data and the anomaly analysis are derived from the same series.
+
+  Args:
+    project (GoogleCloudProject): The project of the instances.
+    instance_ids (List[str]): The IDs of the instances.
+
+  Returns:
+    Dict[str, Any]: Dictionaries mapping each instance ID to its
+        'cpu_usage', 'gce_gpu_usage' and 'anomalies', and the
+        'anomaly_ranking' of the instances, as returned by
+        GoogleCloudMonitoring.GetInstanceAnomalies.
+  """
+  time_series = project.monitoring.QueryInstanceMetrics(
+      instance_ids=instance_ids, aggregation_minutes=1)
+  gpu_usage = {}  # type: Dict[str, List[Dict[str, Any]]]
+  for usage in monitoring.ParseGPUUsage(time_series['gpu_usage']):
+    gpu_usage.setdefault(usage['instance_id'], []).append(usage)
+  anomaly_ranking = project.monitoring.GetInstanceAnomalies(
+      instance_ids=instance_ids, aggregation_minutes=1,
+      time_series=time_series)
+  return {
+      'cpu_usage': {
+          usage['instance_id']: usage['cpu_usage']
+          for usage in monitoring.ParseCpuUsage(time_series['cpu_usage'])
+      },
+      'gce_gpu_usage': gpu_usage,
+      'anomalies': {
+          instance['instance_id']: instance for instance in anomaly_ranking
+      },
+      'anomaly_ranking': anomaly_ranking,
+  }
+
+
+def _AddInstanceMetrics(
+    instance_id: str,
+    metrics: Optional[Dict[str, Any]],
+    metrics_status: Dict[str, Any],
+    results: Dict[str, Any],
+    collectors: Dict[str, Dict[str, Any]]) -> None:
+  """Adds the metrics of an instance to its triage data.
 
-  active_services = project.monitoring.ActiveServices()
-  parsed_services = []
-  for service, count in active_services.items():
-    parsed_services.append({'service': service, 'count': count})
+  The metrics are collected together, so the status of their collector is
+  reported for each of the metrics data types.
+
+  Args:
+    instance_id (str): The ID of the instance.
+    metrics (Dict[str, Any]): Optional. The metrics returned by
+        _CollectMetrics, or None if their collector did not succeed.
+    metrics_status (Dict[str, Any]): The status of the metrics collector.
+    results (Dict[str, Any]): The data of the collectors of the instance,
+        updated in place.
+    collectors (Dict[str, Dict[str, Any]]): The status of the collectors of
+        the instance, updated in place.
+  """
+  if metrics is not None:
+    results['cpu_usage'] = metrics['cpu_usage'].get(instance_id)
+    results['gce_gpu_usage'] = metrics['gce_gpu_usage'].get(instance_id, [])
+    results['anomalies'] = _ParseAnomalies(
+        metrics['anomalies'].get(instance_id))
+  collectors.update({
+      data_type: metrics_status
+      for data_type in ('cpu_usage', 'gce_gpu_usage', 'anomalies')})
 
-  cpu_usage = project.monitoring.GetCpuUsage(
-      instance_ids=[instance_info['id']], aggregation_minutes=1)
-  parsed_cpu = cpu_usage[0].get('cpu_usage', []) if cpu_usage else None
 
+def _ParseAnomalies(
+    instance_anomalies: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+  """Lists the analysis of each metric of an instance, most anomalous first.
 
-  gce_gpu_usage = project.monitoring.GetInstanceGPUUsage(
-      instance_ids=[instance_info['id']])
+  Args:
+    instance_anomalies (Dict[str, Any]): Optional. The anomalies of the
+        instance, as returned by GoogleCloudMonitoring.GetInstanceAnomalies.
+
+  Returns:
+    List[Dict[str, Any]]: The analysis of each metric, with its name under
+        'metric'.
+  """
+  if not instance_anomalies:
+    return []
+  parsed_anomalies = [
+      dict(analysis, metric=metric)
+      for metric, analysis in instance_anomalies['metrics'].items()
+  ]
+  parsed_anomalies.sort(key=lambda analysis: analysis['score'], reverse=True)
+  return parsed_anomalies
+
+
+def _InstanceTriageReport(
+    instance_info: Dict[str, Any],
+    nat_ips: List[str],
+    results: Dict[str, Any],
+    collectors: Dict[str, Dict[str, Any]],
+    data_types: Sequence[str]) -> Dict[str, Any]:
+  """Formats the triage information of an instance.
 
-  gke_gpu_usage = project.monitoring.GetNodeAccelUsage()
+  Args:
+    instance_info (Dict[str, Any]): The API operation object of the
+        instance.
+    nat_ips (List[str]): The external IPv4 addresses of the instance.
+    results (Dict[str, Any]): The data of each collector that succeeded.
+    collectors (Dict[str, Dict[str, Any]]): The status of each collector.
+    data_types (Sequence[str]): The collectors reported as triage data.
 
-  instance_triage = {
+  Returns:
+    Dict[str, Any]: The instance triage information.
+  """
+  return {
       'instance_info': {
           'instance_name': instance_info['name'],
           'instance_id': instance_info['id'],
-          'ancestry': ancestry_string,
-          'external_ipv4': ', '.join(instance.GetNatIps()),
+          'ancestry': results.get('ancestry'),
+          'external_ipv4': ', '.join(nat_ips),
           'zone': instance_info['zone'].rsplit('/', 1)[1],
           'creation_timestamp': instance_info['creationTimestamp'],
           'laststart_timestamp': instance_info['lastStartTimestamp'],
@@ -747,26 +1085,71 @@ def TriageInstance(project_id: str, instance_name: str) -> Dict[str, Any]:
       'triage_data': [{
           'data_type': 'service_accounts',
           'values': instance_info['serviceAccounts']
-      },
-      {
-          'data_type': 'firewalls',
-          'values': instance.GetNormalisedFirewalls()
-      }, {
-          'data_type': 'cpu_usage', 'values': parsed_cpu
-      }, {
-          'data_type': 'gce_gpu_usage', 'values': gce_gpu_usage
-      }, {
-          'data_type': 'gke_gpu_usage', 'values': gke_gpu_usage
-      }, {
-          'data_type':
-              'ssh_auth',
-          'values':
-              CheckInstanceSSHAuth(
-                  project_id, instance_info['name'])
-      }, {
-          'data_type': 'active_services',
-          'values': parsed_services
-      }]
+      }] + [{
+          'data_type': data_type, 'values': results.get(data_type)
+      } for data_type in data_types],
+      'collectors': collectors
   }
 
-  return instance_triage
+
+def _RunTriageCollectors(
+    collectors: Dict[str, Callable[[], Any]],
+    timeout: int) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+  """Runs triage collectors concurrently.
+
+  Collectors still running after the timeout are abandoned: their thread is
+  left to finish in the background, and their result is discarded.
+
+  Args:
+    collectors (Dict[str, Callable[[], Any]]): Dictionary mapping the name
+        of each collector to the function collecting its data.
+    timeout (int): Time (in seconds) after which a collector is abandoned.
+
+  Returns:
+    Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]: Dictionary mapping the
+        name of each collector that succeeded to its data, and dictionary
+        mapping the name of each collector to its 'status' ('ok', 'error' or
+        'timeout'), its duration in 'seconds' (until it was abandoned, if it
+        timed out) and, if it failed, its 'error'.
+  """
+  results = {}  # type: Dict[str, Any]
+  statuses = {}  # type: Dict[str, Dict[str, Any]]
+  durations = {}  # type: Dict[str, float]
+  start_times = {}  # type: Dict[str, float]
+
+  def _Collect(name: str, collector: Callable[[], Any]) -> Any:
+    start_time = start_times[name] = time.monotonic()
+    try:
+      return collector()
+    finally:
+      durations[name] = round(time.monotonic() - start_time, 3)
+
+  # Each collector gets its own worker, so that they all start at once and
+  # share the same deadline.
+  executor = futures.ThreadPoolExecutor(max_workers=len(collectors))
+  requests = {
+      name: executor.submit(_Collect, name, collector)
+      for name, collector in collectors.items()
+  }
+  submit_time = time.monotonic()
+  deadline = submit_time + timeout
+  for name, request in requests.items():
+    try:
+      results[name] = request.result(
+          timeout=max(0.0, deadline - time.monotonic()))
+      statuses[name] = {'status': 'ok', 'seconds': durations[name]}
+    except futures.TimeoutError:
+      # The time the collector ran for until it was abandoned.
+      statuses[name] = {
+          'status': 'timeout',
+          'seconds': round(
+              time.monotonic() - start_times.get(name, submit_time), 3)}
+      logger.warning('Triage collector {0:s} timed out'.format(name))
+    except Exception as exception:  # pylint: disable=broad-except
+      statuses[name] = {
+          'status': 'error', 'seconds': durations[name],
+          'error': str(exception)}
+      logger.warning('Triage collector {0:s} failed: {1!s}'.format(
+          name, exception))
+  executor.shutdown(wait=False)
+  return results, statuses
@@ -343,3 +343,21 @@ def FormatRFC3339(datetime_instance: datetime.datetime) -> str:
     str: A string formatted as per RFC3339 (e.g 2018-05-11T12:34:56.992Z)
   """
   return datetime_instance.isoformat('T') + 'Z'
+
+
+def ParseRFC3339(timestamp: str) -> datetime.datetime:
+  """Parses a UTC timestamp formatted per RFC 3339.
+
+  Args:
+    timestamp (str): A timestamp formatted as per RFC3339
+        (e.g 2018-05-11T12:34:56.992Z), as returned by GCP APIs.
+
+  Returns:
+    datetime.datetime: The timestamp, as a naive datetime in UTC.
+  """
+  seconds, _, fraction = timestamp.rstrip('Z').partition('.')
+  parsed = datetime.datetime.strptime(seconds, '%Y-%m-%dT%H:%M:%S')
+  if fraction:
+    # APIs return up to nanoseconds, datetime stores up to microseconds
+    parsed = parsed.replace(microsecond=int(fraction[:6].ljust(6, '0')))
+  return parsed
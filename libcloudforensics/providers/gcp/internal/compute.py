@@ -27,6 +27,7 @@ from googleapiclient.errors import HttpError
 from libcloudforensics.providers.gcp.internal import build
 from libcloudforensics.providers.gcp.internal import common
 from libcloudforensics.providers.gcp.internal import compute_base_resource
+from libcloudforensics.providers.utils import instance_type_utils
 from libcloudforensics.scripts import utils
 from libcloudforensics import logging_utils
 from libcloudforensics import errors
@@ -561,6 +562,31 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
     Returns:
       GoogleComputeInstance: A Google Compute Instance object.
 
+    Raises:
+      ResourceNotFoundError: If instance does not exist.
+    """
+    instance, _ = self.GetInstanceWithInfo(instance_name, zone=zone)
+    return instance
+
+  def GetInstanceWithInfo(
+      self,
+      instance_name: str,
+      zone: Optional[str] = None
+  ) -> Tuple['GoogleComputeInstance', Dict[str, Any]]:
+    """Get instance from project, with its API operation object.
+
+    This saves the request of a subsequent GoogleComputeInstance.GetOperation
+    call.
+
+    Args:
+      instance_name: The instance identifier, can be either an instance
+        name or ID.
+      zone: Compute zone.
+
+    Returns:
+      Tuple[GoogleComputeInstance, Dict[str, Any]]: A Google Compute
+          Instance object, and its API operation object.
+
     Raises:
       ResourceNotFoundError: If instance does not exist.
     """
@@ -579,13 +605,14 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
           f'Zone not found for instance {instance_name} in project '
           f'{self.project_id}', __name__) from exception
 
-    return GoogleComputeInstance(
+    instance = GoogleComputeInstance(
         self.project_id,
         instance_zone,
         instance_dict['name'],
         resource_id=instance_dict['id'],
         labels=instance_dict.get('labels'),
         deletion_protection=instance_dict.get('deletionProtection', False))
+    return instance, instance_dict
 
   def GetDisk(
       self,
@@ -706,6 +733,14 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
     """
 
     compute_zone = zone if zone else self.default_zone
+    # Listing all machine types costs more than a single get, the catalog is
+    # only used once it has been loaded (e.g. by GetMachineTypesCatalog).
+    catalog = self.GetMachineTypesCatalog(compute_zone)
+    if catalog.IsCached():
+      cached_machine_type = catalog.GetInstanceType(machine_type)
+      if cached_machine_type:
+        resource = cached_machine_type['Resource']  # type: Dict[str, Any]
+        return resource
     machine_types_client = self.GceApi().machineTypes() # pylint: disable=no-member
     params = {
         'project': self.project_id,
@@ -715,6 +750,51 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
     # Safe to unpack, response is not paged.
     return common.ExecuteRequest(machine_types_client, 'get', params)[0]
 
+  def ListMachineTypes(
+      self, zone: Optional[str] = None) -> List[Dict[str, Any]]:
+    """List the machineTypes API objects available in a zone/project.
+
+    Args:
+      zone: Compute zone to list available machine types.
+
+    Returns:
+      The list of machineTypes API resources:
+      https://cloud.google.com/compute/docs/reference/latest/machineTypes#resource  # pylint: disable=line-too-long
+    """
+    compute_zone = zone if zone else self.default_zone
+    machine_types_client = self.GceApi().machineTypes() # pylint: disable=no-member
+    responses = common.ExecuteRequest(
+        machine_types_client,
+        'list',
+        {'project': self.project_id, 'zone': compute_zone})
+    machine_types = []
+    for response in responses:
+      machine_types.extend(response.get('items', []))
+    return machine_types
+
+  def GetMachineTypesCatalog(
+      self,
+      zone: Optional[str] = None) -> instance_type_utils.InstanceTypeCatalog:
+    """Get the cached catalog of machine types available in a zone/project.
+
+    The catalog is shared by all GoogleCloudCompute objects of the project,
+    and refreshed once its TTL expires.
+
+    Args:
+      zone: Compute zone to list available machine types.
+
+    Returns:
+      The catalog of machine types, indexed by number of CPUs and memory.
+    """
+    compute_zone = zone if zone else self.default_zone
+    return instance_type_utils.GetInstanceTypeCatalog(
+        'gcp', self.project_id, compute_zone, lambda: [
+            {'Name': machine_type['name'],
+             'CPU': machine_type['guestCpus'],
+             'Memory': machine_type['memoryMb'],
+             'Resource': machine_type}
+            for machine_type in self.ListMachineTypes(compute_zone)])
+
   def GetDiskTypes(self, disk_type: str,
                    zone: Optional[str] = None) -> Dict[str, Any]:
     """Get selected diskTypes API object in specified zone/project.
@@ -1076,6 +1156,38 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
     return self._ListByLabel(
         labels_filter, instance_service_object, filter_union)
 
+  def ListInstanceByLabelsWithInfo(
+      self, labels_filter: Dict[str, str],
+      filter_union: bool = True
+  ) -> Dict[str, Tuple['GoogleComputeInstance', Dict[str, Any]]]:
+    """List VMs with one/all of the provided labels, with their API objects.
+
+    The API operation objects are the instance resources returned by the
+    listing, which saves the request of a subsequent
+    GoogleComputeInstance.GetOperation call per instance.
+
+    Args:
+      labels_filter (Dict[str, str]): A Dict of labels to find e.g.
+          {'id': '123'}.
+      filter_union (bool): Optional. A Boolean; True to get the union of all
+          filters, False to get the intersection.
+
+    Returns:
+      Dict[str, Tuple[GoogleComputeInstance, Dict[str, Any]]]: Dictionary
+          mapping instances to their respective GoogleComputeInstance object
+          and API operation object.
+    """
+
+    instance_service_object = self.GceApi().instances() # pylint: disable=no-member
+    resource_infos = {}  # type: Dict[str, Dict[str, Any]]
+    instances = self._ListByLabel(
+        labels_filter, instance_service_object, filter_union,
+        resource_infos=resource_infos)
+    return {
+        name: (instance, resource_infos[name])
+        for name, instance in instances.items()
+    }
+
   def ListDiskByLabels(
       self, labels_filter: Dict[str, str],
       filter_union: bool = True) -> Dict[str, 'GoogleComputeDisk']:
@@ -1144,7 +1256,9 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
       self,
       labels_filter: Dict[str, str],
       service_object: 'googleapiclient.discovery.Resource',
-      filter_union: bool) -> Dict[str, Any]:
+      filter_union: bool,
+      resource_infos: Optional[Dict[str, Dict[str, Any]]] = None
+  ) -> Dict[str, Any]:
     """List Disks/VMs in a project with one/all of the provided labels.
 
     Private method used to select different compute resources by labels.
@@ -1156,6 +1270,9 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
           (Disk | Instance) service object.
       filter_union (bool): A boolean; True to get the union of all filters,
           False to get the intersection.
+      resource_infos (Dict[str, Dict[str, Any]]): Optional. A dictionary
+          filled with the API resource of each listed instance/disk, by
+          name.
 
     Returns:
       Dict[str, GoogleComputeInstance|GoogleComputeDisk]: Dictionary mapping
@@ -1199,11 +1316,15 @@ class GoogleCloudCompute(common.GoogleCloudComputeClient):
             name = resource['name']
             resource_dict[name] = GoogleComputeInstance(
                 self.project_id, zone, name, labels=resource['labels'])
+            if resource_infos is not None:
+              resource_infos[name] = resource
 
           for resource in resource_scoped_list.get('disks', []):
             name = resource['name']
             resource_dict[name] = GoogleComputeDisk(
                 self.project_id, zone, name, labels=resource['labels'])
+            if resource_infos is not None:
+              resource_infos[name] = resource
 
       request = service_object.aggregatedList_next(
           previous_request=request, previous_response=response)
@@ -2036,15 +2157,21 @@ class GoogleComputeInstance(compute_base_resource.GoogleComputeBaseResource):
           'failure: {0:s}'.format(str(exception)),
           __name__)
 
-  def GetEffectiveFirewalls(self) -> List[Dict[str, Any]]:
+  def GetEffectiveFirewalls(
+      self,
+      instance_info: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Get the raw effective firewalls for every interface:
     https://cloud.google.com/compute/docs/reference/rest/v1/instances/getEffectiveFirewalls
 
+    Args:
+      instance_info (Dict[str, Any]): Optional. The API operation object of
+          the instance, if already fetched (see GetOperation).
+
     Returns:
       List[Dict[str, Any]]: The effective firewall rules per interface.
     """
     gce_instance_client = self.GceApi().instances() # pylint: disable=no-member
-    instance_info = self.GetOperation()
+    instance_info = instance_info or self.GetOperation()
     effective_firewalls = []
 
     for interface in instance_info.get('networkInterfaces', []):
@@ -2163,14 +2290,20 @@ class GoogleComputeInstance(compute_base_resource.GoogleComputeBaseResource):
 
     return normalised_rules
 
-  def GetNormalisedFirewalls(self) -> List[Dict[str, Any]]:
+  def GetNormalisedFirewalls(
+      self,
+      instance_info: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
     """Get normalised effective firewalls for every interface with firewall
     policies and normal VPC firewalls collapsed into a single list.
 
+    Args:
+      instance_info (Dict[str, Any]): Optional. The API operation object of
+          the instance, if already fetched (see GetOperation).
+
     Returns:
       List[Dict[str, Any]]: The normalised firewalls per interface.
     """
-    effective_firewalls = self.GetEffectiveFirewalls()
+    effective_firewalls = self.GetEffectiveFirewalls(instance_info)
     normalised_firewalls = []
 
     for interface in effective_firewalls:
@@ -2181,13 +2314,18 @@ class GoogleComputeInstance(compute_base_resource.GoogleComputeBaseResource):
 
     return normalised_firewalls
 
-  def GetNatIps(self) -> List[str]:
+  def GetNatIps(
+      self, instance_info: Optional[Dict[str, Any]] = None) -> List[str]:
     """Get the NAT external IPv4 addresses attached to an instance.
 
+    Args:
+      instance_info (Dict[str, Any]): Optional. The API operation object of
+          the instance, if already fetched (see GetOperation).
+
     Returns:
       List[str]: a list of IP addresses.
     """
-    instance_info = self.GetOperation()
+    instance_info = instance_info or self.GetOperation()
     networks = instance_info.get('networkInterfaces', [])
 
     nat_ips = []
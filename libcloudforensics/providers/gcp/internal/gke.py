@@ -13,8 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Google Kubernetes Engine functionalities."""
-from typing import Optional, TYPE_CHECKING, Any, Dict
+import datetime
+import threading
+from typing import Optional, TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
 
+import google.auth
+import google.auth.credentials
+import google.auth.transport.requests
 from googleapiclient.errors import HttpError
 
 from kubernetes import client
@@ -23,6 +28,7 @@ from kubernetes.config import kube_config
 from libcloudforensics import errors
 from libcloudforensics import logging_utils
 from libcloudforensics.providers.gcp.internal import common
+from libcloudforensics.providers.gcp.internal import log as gcp_log
 from libcloudforensics.providers.kubernetes import base
 from libcloudforensics.providers.kubernetes import cluster
 
@@ -32,6 +38,75 @@ if TYPE_CHECKING:
 logging_utils.SetUpLogger(__name__)
 logger = logging_utils.GetLogger(__name__)
 
+# Maximum number of connections kept open to the API server of a cluster.
+K8S_CONNECTION_POOL_SIZE = 32
+# Access tokens expiring within this delay are refreshed before being used.
+TOKEN_REFRESH_MARGIN = datetime.timedelta(minutes=10)
+# Scopes of the credentials used to authenticate to the clusters, as in
+# `gcloud container clusters get-credentials`.
+K8S_AUTH_SCOPES = [
+    'https://www.googleapis.com/auth/cloud-platform',
+    'https://www.googleapis.com/auth/userinfo.email',
+]
+
+# Kubernetes API clients, by full cluster name.
+_K8S_API_CLIENTS = {}  # type: Dict[str, client.ApiClient]
+_K8S_API_CLIENTS_LOCK = threading.Lock()
+_GOOGLE_CREDENTIALS = None  # type: Optional[google.auth.credentials.Credentials]  # pylint: disable=line-too-long
+_GOOGLE_CREDENTIALS_LOCK = threading.Lock()
+
+
+def _GetGoogleCredentials() -> google.auth.credentials.Credentials:
+  """Returns the credentials used to authenticate to the clusters.
+
+  The application default credentials are shared by the API clients of all
+  clusters, and are refreshed ahead of their expiry.
+
+  Returns:
+    google.auth.credentials.Credentials: Credentials holding a valid token.
+  """
+  global _GOOGLE_CREDENTIALS  # pylint: disable=global-statement
+  with _GOOGLE_CREDENTIALS_LOCK:
+    # pylint: disable=line-too-long
+    if _GOOGLE_CREDENTIALS is None:
+      _GOOGLE_CREDENTIALS, _ = google.auth.default(scopes=K8S_AUTH_SCOPES)  # type: ignore [no-untyped-call]
+    credentials = _GOOGLE_CREDENTIALS
+    # Expiry is a naive UTC datetime in google-auth
+    if (not credentials.token or credentials.expiry is None or
+        credentials.expiry - datetime.datetime.utcnow() < TOKEN_REFRESH_MARGIN):
+      credentials.refresh(google.auth.transport.requests.Request())  # type: ignore [no-untyped-call]
+    # pylint: enable=line-too-long
+    return credentials
+
+
+def ClearK8sApiClients() -> None:
+  """Forgets the cached Kubernetes API clients of GKE clusters.
+
+  The clients are not closed, as existing cluster objects may still use
+  them. They are closed by their owners, or when garbage collected.
+  """
+  with _K8S_API_CLIENTS_LOCK:
+    _K8S_API_CLIENTS.clear()
+
+
+def _LogEntryGroup(entry: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+  """Returns the pod and container a workload log entry belongs to.
+
+  Args:
+    entry (Dict[str, Any]): A k8s_container or k8s_cluster log entry.
+
+  Returns:
+    Tuple[str, Optional[str]]: The pod, as 'namespace/name', and container of
+        a container log entry, or the audited resource and None for an audit
+        log entry.
+  """
+  labels = entry.get('resource', {}).get('labels', {})
+  if 'container_name' in labels:
+    return '{0:s}/{1:s}'.format(
+        labels.get('namespace_name', ''),
+        labels.get('pod_name', '')), labels['container_name']
+  return entry.get('protoPayload', {}).get('resourceName', ''), None
+
 
 class GoogleKubernetesEngine:
   """Base class for calling GKE APIs."""
@@ -48,6 +123,37 @@ class GoogleKubernetesEngine:
     """
     return common.CreateService('container', self.GKE_API_VERSION)
 
+  def ListClusters(
+      self, project_id: str, location: str = '-') -> List[Dict[str, Any]]:
+    """Lists the GKE clusters of a project.
+
+    Args:
+      project_id (str): The GCP project name.
+      location (str): Optional. The region/zone in which to list clusters.
+          Default is '-', which lists clusters in all locations.
+
+    Returns:
+      List[Dict[str, Any]]: GKE API representations of the clusters.
+
+    Raises:
+      ResourceNotFoundError: If the clusters could not be listed.
+    """
+    clusters = self.GkeApi().projects().locations().clusters()  # pylint: disable=no-member
+    request = clusters.list(
+        parent='projects/{0:s}/locations/{1:s}'.format(project_id, location))
+    try:
+      response = request.execute()  # type: Dict[str, Any]
+    except HttpError as exception:
+      raise errors.ResourceNotFoundError(
+          'Could not list clusters of project {0:s}: {1!s}'.format(
+              project_id, exception),
+          __name__) from exception
+    if response.get('missingZones'):
+      logger.warning(
+          'Clusters of project {0:s} could not be listed in zones: '
+          '{1:s}'.format(project_id, ', '.join(response['missingZones'])))
+    return list(response.get('clusters', []))
+
 
 class GkeCluster(cluster.K8sCluster, GoogleKubernetesEngine):
   """Class to call GKE and Kubernetes APIs on a GKE resource.
@@ -88,12 +194,36 @@ class GkeCluster(cluster.K8sCluster, GoogleKubernetesEngine):
     )
 
   def _GetK8sApiClient(self) -> client.ApiClient:
+    """Gets an authenticated Kubernetes API client for this cluster.
+
+    API clients are cached by cluster, so that all GkeCluster objects for a
+    cluster share the connection pool of a single client, and only the first
+    one goes through the cluster lookup and authentication setup.
+
+    Returns:
+      client.ApiClient: An authenticated Kubernetes API client.
+    """
+    with _K8S_API_CLIENTS_LOCK:
+      if self.name in _K8S_API_CLIENTS:
+        return _K8S_API_CLIENTS[self.name]
+    # Clients are built outside of the lock, so that clusters can be set up
+    # concurrently. If two threads raced on the same cluster, the first
+    # client wins and the other one is discarded.
+    api_client = self._BuildK8sApiClient()
+    with _K8S_API_CLIENTS_LOCK:
+      cached_client = _K8S_API_CLIENTS.setdefault(self.name, api_client)
+    if cached_client is not api_client:
+      api_client.close()
+    return cached_client
+
+  def _BuildK8sApiClient(self) -> client.ApiClient:
     """Builds an authenticated Kubernetes API client.
 
     This method builds a kubeconfig file similarly to
     `gcloud container clusters get-credentials CLUSTER_NAME`, and then
     creates a Kubernetes API client from it. This API client can then be
-    used in the Kubernetes classes
+    used in the Kubernetes classes. The client refreshes its token before it
+    expires, from credentials shared with the clients of other clusters.
 
     Returns:
       client.ApiClient: An authenticated Kubernetes API client.
@@ -112,6 +242,7 @@ class GkeCluster(cluster.K8sCluster, GoogleKubernetesEngine):
     ])
     # Build kubeconfig dict and load
     kubeconfig = client.Configuration()
+    kubeconfig.connection_pool_maxsize = K8S_CONNECTION_POOL_SIZE
     loader = kube_config.KubeConfigLoader({
         'apiVersion': self.GKE_API_VERSION,
         'current-context': context,
@@ -134,7 +265,7 @@ class GkeCluster(cluster.K8sCluster, GoogleKubernetesEngine):
                 }
             }
         }]
-    })
+    }, get_google_credentials=_GetGoogleCredentials)
     loader.load_and_set(kubeconfig)
     return client.ApiClient(kubeconfig)
 
@@ -217,6 +348,87 @@ class GkeCluster(cluster.K8sCluster, GoogleKubernetesEngine):
       query += workload.GcpContainerLogsQuerySupplement()
     return query.strip()
 
+  def WorkloadLogsQuery(self, workloads: List[base.K8sWorkload]) -> str:
+    """Creates a query string covering the logs of several workloads.
+
+    The query covers both the k8s_cluster (audit) logs and the k8s_container
+    logs of the workloads, so that both can be fetched with a single query.
+
+    Args:
+      workloads (List[base.K8sWorkload]): The workloads to cover.
+
+    Returns:
+      str: The combined logs query string.
+
+    Raises:
+      ValueError: If no workload is given.
+    """
+    if not workloads:
+      raise ValueError('At least one workload must be given.')
+
+    def Combine(query_type: str, supplements: List[str]) -> str:
+      """Restricts the query of a type to any of the workload supplements."""
+      workloads_query = ' OR '.join(
+          '({0:s})'.format(supplement.strip().replace('\n', ' '))
+          for supplement in supplements)
+      return '({0:s}\n({1:s}))'.format(
+          self._MakeQuery(query_type).strip(), workloads_query)
+
+    return '{0:s}\nOR\n{1:s}'.format(
+        Combine('k8s_cluster', [
+            workload.GcpClusterLogsQuerySupplement()
+            for workload in workloads]),
+        Combine('k8s_container', [
+            workload.GcpContainerLogsQuerySupplement()
+            for workload in workloads]))
+
+  def CollectWorkloadLogs(
+      self,
+      workloads: List[base.K8sWorkload],
+      start_time: datetime.datetime,
+      end_time: datetime.datetime,
+      windows: int = gcp_log.DEFAULT_QUERY_WINDOWS,
+      max_workers: int = gcp_log.DEFAULT_QUERY_WORKERS
+  ) -> Iterator[Tuple[str, Optional[str], List[Dict[str, Any]]]]:
+    """Collects the audit and container logs of workloads.
+
+    The logs are fetched with a single query, split in time windows that are
+    fetched concurrently (see GoogleCloudLog.ExecuteQueryInWindows). The
+    entries of each window are grouped by pod and container, and the groups
+    are yielded as soon as their window is fetched, oldest window first.
+
+    Audit log entries are grouped by the resource they apply to, e.g.
+    'apps/v1/namespaces/default/deployments/web', with no container.
+
+    Args:
+      workloads (List[base.K8sWorkload]): The workloads to collect logs for.
+      start_time (datetime.datetime): The start of the time range (UTC).
+      end_time (datetime.datetime): The end of the time range (UTC),
+          excluded.
+      windows (int): Optional. The number of windows the time range is split
+          into. Default is 8.
+      max_workers (int): Optional. The number of windows queried
+          concurrently. Default is 4.
+
+    Yields:
+      Tuple[str, Optional[str], List[Dict[str, Any]]]: The pod (as
+          'namespace/name') or audited resource, the container name (None
+          for audit logs), and the entries of the group in the window,
+          oldest first.
+    """
+    logs = gcp_log.GoogleCloudLog([self.project_id])
+    for entries in logs.ExecuteQueryInWindows(
+        self.WorkloadLogsQuery(workloads),
+        start_time,
+        end_time,
+        windows=windows,
+        max_workers=max_workers):
+      groups = {}  # type: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]]  # pylint: disable=line-too-long
+      for entry in entries:
+        groups.setdefault(_LogEntryGroup(entry), []).append(entry)
+      for (source, container), group_entries in groups.items():
+        yield source, container, group_entries
+
   def _GetValue(self, *keys: str, default: Any = None) -> Any:
     """Gets a nested value from this cluster's 'GET' using a list of keys.
 
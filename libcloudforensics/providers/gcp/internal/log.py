@@ -13,14 +13,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Google Cloud Logging functionalities."""
+import datetime
+import threading
+import time
+from concurrent import futures
 from typing import Optional
-from typing import TYPE_CHECKING, List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Iterator
 
+from google.auth.exceptions import DefaultCredentialsError
+from google.auth.exceptions import RefreshError
+
+from libcloudforensics import errors
 from libcloudforensics.providers.gcp.internal import common
 
 if TYPE_CHECKING:
   import googleapiclient
 
+# Maximum number of entries returned by a single entries.list request.
+LOG_PAGE_SIZE = 1000
+# Minimum time (in seconds) between the starts of two entries.list requests,
+# shared by concurrent queries. https://cloud.google.com/logging/quotas
+LOG_REQUEST_INTERVAL = 1.0
+# Number of time windows a query is split into.
+DEFAULT_QUERY_WINDOWS = 8
+# Number of time windows queried concurrently.
+DEFAULT_QUERY_WORKERS = 4
+
 
 class GoogleCloudLog:
   """Class representing a Google Cloud Logs interface.
@@ -45,6 +63,8 @@ class GoogleCloudLog:
       project_ids (List[str]): List of project IDs.
     """
     self.project_ids = project_ids
+    self._request_lock = threading.Lock()
+    self._next_request_time = 0.0
 
   def GclApi(self) -> 'googleapiclient.discovery.Resource':
     """Get a Google Compute Logging service object.
@@ -117,3 +137,98 @@ class GoogleCloudLog:
         for entry in response.get('entries', []):
           entries.append(entry)
     return entries
+
+  def ExecuteQueryInWindows(
+      self,
+      qfilter: str,
+      start_time: datetime.datetime,
+      end_time: datetime.datetime,
+      windows: int = DEFAULT_QUERY_WINDOWS,
+      max_workers: int = DEFAULT_QUERY_WORKERS
+  ) -> Iterator[List[Dict[str, Any]]]:
+    """Queries logs in all projects, fetching time windows concurrently.
+
+    The time range is split into windows of equal length, which are queried
+    concurrently. Requests are spaced by LOG_REQUEST_INTERVAL across all
+    windows, to stay within the API quota: the concurrency overlaps the
+    latency of the requests, rather than multiplying their rate.
+
+    Args:
+      qfilter (str): The query filter, without time restrictions.
+      start_time (datetime.datetime): The start of the time range (UTC).
+      end_time (datetime.datetime): The end of the time range (UTC),
+          excluded.
+      windows (int): Optional. The number of windows the time range is
+          split into. Default is 8.
+      max_workers (int): Optional. The number of windows queried
+          concurrently. Default is 4.
+
+    Yields:
+      List[Dict[str, Any]]: The log entries of each window, in chronological
+          order, starting with the oldest window.
+
+    Raises:
+      ValueError: If the time range is empty.
+    """
+    if end_time <= start_time:
+      raise ValueError('The end of the time range must be after its start.')
+    window_length = (end_time - start_time) / windows
+    bounds = [start_time + window_length * i for i in range(windows)]
+    bounds.append(end_time)
+
+    def QueryWindow(window: int) -> List[Dict[str, Any]]:
+      """Returns the log entries of a time window."""
+      window_filter = (
+          '({0:s})\ntimestamp>="{1:s}"\ntimestamp<"{2:s}"'.format(
+              qfilter,
+              common.FormatRFC3339(bounds[window]),
+              common.FormatRFC3339(bounds[window + 1])))
+      return self._ListEntries(window_filter)
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+      yield from executor.map(QueryWindow, range(windows))
+
+  def _ListEntries(self, qfilter: str) -> List[Dict[str, Any]]:
+    """Lists the log entries of all projects matching a filter.
+
+    Args:
+      qfilter (str): The query filter.
+
+    Returns:
+      List[Dict[str, Any]]: The log entries, oldest first.
+
+    Raises:
+      CredentialsConfigurationError: If the request to the API could not
+          complete.
+    """
+    gcl_instance_client = self.GclApi().entries()  # pylint: disable=no-member
+    body = {
+        'resourceNames': [
+            'projects/' + project_id for project_id in self.project_ids],
+        'filter': qfilter,
+        'orderBy': 'timestamp asc',
+        'pageSize': LOG_PAGE_SIZE,
+    }  # type: Dict[str, Any]
+    entries = []  # type: List[Dict[str, Any]]
+    while True:
+      self._WaitForRequestSlot()
+      try:
+        response = gcl_instance_client.list(body=body).execute()
+      except (RefreshError, DefaultCredentialsError) as exception:
+        raise errors.CredentialsConfigurationError(
+            ': {0!s}. Something is wrong with your Application Default '
+            'Credentials. Try running: $ gcloud auth application-default '
+            'login'.format(exception),
+            __name__) from exception
+      entries.extend(response.get('entries', []))
+      if not response.get('nextPageToken'):
+        return entries
+      body['pageToken'] = response['nextPageToken']
+
+  def _WaitForRequestSlot(self) -> None:
+    """Waits until a request can be sent without exceeding the API quota."""
+    with self._request_lock:
+      now = time.monotonic()
+      request_time = max(now, self._next_request_time)
+      self._next_request_time = request_time + LOG_REQUEST_INTERVAL
+    time.sleep(request_time - now)
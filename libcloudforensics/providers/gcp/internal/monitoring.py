@@ -15,13 +15,179 @@
 """Google Cloud Monitoring functionality."""
 
 import datetime
-from typing import TYPE_CHECKING, Dict, List, Optional, Any
+import itertools
+import threading
+from concurrent import futures
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Any
 
 from libcloudforensics.providers.gcp.internal import common
+from libcloudforensics.providers.utils import anomaly_utils
 
 if TYPE_CHECKING:
   import googleapiclient
 
+# Number of time series queries sent concurrently, when a query is split in
+# chunks of resource label values.
+DEFAULT_QUERY_WORKERS = 4
+# Maximum length (in characters) of the filter of a time series query. Longer
+# lists of resource label values are split in chunks, queried separately.
+MAX_FILTER_LENGTH = 2000
+# Minimum standard deviation of the baseline of each instance metric, in the
+# unit of the metric, so that any activity after an idle period is not scored
+# as an infinitely anomalous deviation.
+INSTANCE_METRICS_MIN_STDDEV = {
+    'cpu_usage': 0.01,  # Ratio of the CPU time
+    'network_egress': 1024.0,  # Bytes per second
+    'gpu_usage': 1.0,  # Percentage of the GPU time
+}
+
+
+class Aggregation(NamedTuple):
+  """Aggregation of the time series of a query.
+
+  https://cloud.google.com/monitoring/api/ref_v3/rest/v3/projects.timeSeries/list#aggregation
+
+  Attributes:
+    alignment_period (int): The period (in seconds) of the aligned points.
+    per_series_aligner (str): How the points of each series are aligned,
+        e.g. 'ALIGN_MEAN'.
+    cross_series_reducer (str): Optional. How the aligned series are
+        combined, e.g. 'REDUCE_SUM'.
+    group_by_fields (List[str]): Optional. The fields preserved when
+        combining series, e.g. ['resource.label.instance_id'].
+  """
+  alignment_period: int
+  per_series_aligner: str
+  cross_series_reducer: Optional[str] = None
+  group_by_fields: Optional[List[str]] = None
+
+
+class TimeSeries(NamedTuple):
+  """A time series returned by a query, with its points decoded.
+
+  Attributes:
+    metric_labels (Dict[str, str]): The labels of the metric.
+    resource_labels (Dict[str, str]): The labels of the monitored resource.
+    system_labels (Dict[str, Any]): The system metadata labels of the
+        resource, e.g. the name of an instance.
+    timestamps (List[str]): The start time of each point, in the order
+        returned by the API (most recent first).
+    values (List[Any]): The value of each point. INT64 values are decoded
+        to int, and DOUBLE values to float.
+  """
+  metric_labels: Dict[str, str]
+  resource_labels: Dict[str, str]
+  system_labels: Dict[str, Any]
+  timestamps: List[str]
+  values: List[Any]
+
+
+def _ChunkValues(
+    label: str,
+    values: List[str],
+    max_length: int,
+    max_values: Optional[int] = None) -> List[List[str]]:
+  """Splits the values of a resource label filter in chunks of bounded size.
+
+  Args:
+    label (str): The resource label.
+    values (List[str]): The values to filter on.
+    max_length (int): The maximum length (in characters) of the filter on
+        the values of a chunk. A chunk has at least one value.
+    max_values (int): Optional. The maximum number of values in a chunk.
+
+  Returns:
+    List[List[str]]: The chunks of values.
+  """
+  chunks = []  # type: List[List[str]]
+  chunk = []  # type: List[str]
+  length = len(' AND ()')
+  for value in values:
+    clause_length = len(' OR resource.label.{0:s} = "{1:s}"'.format(
+        label, value))
+    if chunk and (length + clause_length > max_length or
+                  len(chunk) == max_values):
+      chunks.append(chunk)
+      chunk = []
+      length = len(' AND ()')
+    chunk.append(value)
+    length += clause_length
+  if chunk:
+    chunks.append(chunk)
+  return chunks
+
+
+def _DecodeValue(value: Dict[str, Any]) -> Any:
+  """Decodes the typed value of a point.
+
+  Args:
+    value (Dict[str, Any]): The value of a point, as returned by the API.
+
+  Returns:
+    Any: The value. INT64 values (serialized as strings) are converted to
+        int.
+  """
+  if 'int64Value' in value:
+    return int(value['int64Value'])
+  if 'doubleValue' in value:
+    return float(value['doubleValue'])
+  for value_type in ('boolValue', 'stringValue', 'distributionValue'):
+    if value_type in value:
+      return value[value_type]
+  return None
+
+
+def ParseCpuUsage(time_series: List[TimeSeries]) -> List[Dict[str, Any]]:
+  """Formats the CPU utilization series of compute instances.
+
+  Args:
+    time_series (List[TimeSeries]): The series of the
+        compute.googleapis.com/instance/cpu/utilization metric, not reduced
+        across instances.
+
+  Returns:
+    List[Dict[str, Any]]: The CPU usage of each instance, see
+        GoogleCloudMonitoring.GetCpuUsage.
+  """
+  return [{
+      'instance_name': ts.metric_labels['instance_name'],
+      'instance_id': ts.resource_labels['instance_id'],
+      'cpu_usage': [
+          {'timestamp': timestamp, 'cpu_usage': value}
+          for timestamp, value in zip(ts.timestamps, ts.values)]
+  } for ts in time_series]
+
+
+def ParseGPUUsage(time_series: List[TimeSeries]) -> List[Dict[str, Any]]:
+  """Formats the GPU utilization series of compute instances.
+
+  Series without any usage are skipped.
+
+  Args:
+    time_series (List[TimeSeries]): The series of the
+        agent.googleapis.com/gpu/utilization metric, not reduced across
+        instances.
+
+  Returns:
+    List[Dict[str, Any]]: The usage of each GPU, see
+        GoogleCloudMonitoring.GetInstanceGPUUsage.
+  """
+  gpu_usage_instances = []
+  for ts in time_series:
+    if not any(ts.values):
+      continue
+    gpu_name = 'None'
+    if ts.metric_labels:
+      gpu_name = "{0:s} ({1:s})".format(
+          ts.metric_labels['model'], ts.metric_labels['gpu_number'])
+    gpu_usage_instances.append({
+        'gpu_name': gpu_name,
+        'instance_id': ts.resource_labels['instance_id'],
+        'gpu_usage': [
+            {'timestamp': timestamp, 'gpu_usage': value}
+            for timestamp, value in zip(ts.timestamps, ts.values)]})
+  return gpu_usage_instances
+
 
 class GoogleCloudMonitoring:
   """Class to call Google Monitoring APIs.
@@ -52,6 +218,131 @@ class GoogleCloudMonitoring:
     return common.CreateService(
         'monitoring', self.CLOUD_MONITORING_API_VERSION)
 
+  def QueryTimeSeries(
+      self,
+      metric_type: str,
+      resource_type: Optional[str] = None,
+      resource_filters: Optional[Dict[str, List[str]]] = None,
+      aggregation: Optional[Aggregation] = None,
+      days: int = 1,
+      chunk_size: Optional[int] = None,
+      max_workers: int = DEFAULT_QUERY_WORKERS) -> List[TimeSeries]:
+    """Queries the time series of a metric.
+
+    The values of resource labels are split in chunks, so that the filter of
+    each query is shorter than MAX_FILTER_LENGTH and filters on at most
+    chunk_size values per label. The chunks are queried concurrently, and
+    the time series of all chunks are merged. This allows querying the
+    metrics of thousands of instances by ID.
+
+    Args:
+      metric_type (str): The type of the metric, e.g.
+          'compute.googleapis.com/instance/cpu/utilization'.
+      resource_type (str): Optional. The type of the monitored resources,
+          e.g. 'gce_instance'.
+      resource_filters (Dict[str, List[str]]): Optional. Dictionary mapping
+          resource labels to the values to filter on, e.g.
+          {'instance_id': ['123']}. The values of a label are ORed, and the
+          labels are ANDed.
+      aggregation (Aggregation): Optional. How the series are aligned and
+          combined. Default is to return raw points.
+      days (int): Optional. The number of days to query. Default is 1.
+      chunk_size (int): Optional. The maximum number of values of a
+          resource label in a single query. Default is to only bound the
+          length of the filter.
+      max_workers (int): Optional. The number of chunks queried
+          concurrently. Default is 4.
+
+    Returns:
+      List[TimeSeries]: The time series matching the query.
+    """
+    start_time = common.FormatRFC3339(
+        datetime.datetime.utcnow() - datetime.timedelta(days=days))
+    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
+    request = {
+        'name': 'projects/{0:s}'.format(self.project_id),
+        'interval_startTime': start_time,
+        'interval_endTime': end_time
+    }  # type: Dict[str, Any]
+    if aggregation:
+      request['aggregation_alignmentPeriod'] = '{0:d}s'.format(
+          aggregation.alignment_period)
+      request['aggregation_perSeriesAligner'] = aggregation.per_series_aligner
+      if aggregation.cross_series_reducer:
+        request['aggregation_crossSeriesReducer'] = (
+            aggregation.cross_series_reducer)
+      if aggregation.group_by_fields:
+        request['aggregation_groupByFields'] = aggregation.group_by_fields
+
+    # Split the values of each label in chunks, and query every combination
+    # of chunks. The length of the filter left after the metric and resource
+    # types is shared between labels.
+    labels = [label for label, values in (resource_filters or {}).items()
+              if values]
+    max_length = MAX_FILTER_LENGTH - len(
+        self._BuildFilter(metric_type, resource_type))
+    label_chunks = [
+        _ChunkValues(label, (resource_filters or {})[label],
+                     max_length // len(labels), chunk_size)
+        for label in labels
+    ]
+    filters = [
+        self._BuildFilter(metric_type, resource_type, dict(zip(labels, chunks)))
+        for chunks in itertools.product(*label_chunks)
+    ]
+
+    local = threading.local()
+
+    def _Query(qfilter: str) -> List[TimeSeries]:
+      # Service objects are not thread-safe, each worker builds its own
+      if not hasattr(local, 'gcm_timeseries_client'):
+        local.gcm_timeseries_client = self.GcmApi().projects().timeSeries()  # pylint: disable=no-member
+      responses = common.ExecuteRequest(
+          local.gcm_timeseries_client, 'list', dict(request, filter=qfilter))
+      time_series = []
+      for response in responses:
+        for ts in response.get('timeSeries', []):
+          points = ts.get('points', [])
+          time_series.append(TimeSeries(
+              metric_labels=ts.get('metric', {}).get('labels', {}),
+              resource_labels=ts.get('resource', {}).get('labels', {}),
+              system_labels=ts.get('metadata', {}).get('systemLabels', {}),
+              timestamps=[point['interval']['startTime'] for point in points],
+              values=[_DecodeValue(point['value']) for point in points]))
+      return time_series
+
+    if len(filters) == 1:
+      return _Query(filters[0])
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+      return list(itertools.chain.from_iterable(
+          executor.map(_Query, filters)))
+
+  def _BuildFilter(
+      self,
+      metric_type: str,
+      resource_type: Optional[str] = None,
+      resource_filters: Optional[Dict[str, List[str]]] = None) -> str:
+    """Builds a metrics query filter.
+
+    Args:
+      metric_type (str): The type of the metric.
+      resource_type (str): Optional. The type of the monitored resources.
+      resource_filters (Dict[str, List[str]]): Optional. Dictionary mapping
+          resource labels to the values to filter on.
+
+    Returns:
+      str: The filter to use in a metrics query.
+    """
+    query_filter = ['metric.type = "{0:s}"'.format(metric_type)]
+    if resource_type:
+      query_filter.append(' AND resource.type = "{0:s}"'.format(resource_type))
+    for label, values in (resource_filters or {}).items():
+      if values:
+        query_filter.append(' AND ({0:s})'.format(' OR '.join(
+            'resource.label.{0:s} = "{1:s}"'.format(label, value)
+            for value in values)))
+    return ''.join(query_filter)
+
   def ActiveServices(self, timeframe: int = 30) -> Dict[str, int]:
     """List active services in the project (default: last 30 days).
 
@@ -62,36 +353,21 @@ class GoogleCloudMonitoring:
     Returns:
       Dict[str, int]: Dictionary mapping service name to number of uses.
     """
-    start_time = common.FormatRFC3339(
-        datetime.datetime.utcnow() - datetime.timedelta(days=timeframe))
-    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
-    period = timeframe * 24 * 60 * 60
-    service = self.GcmApi()
-    gcm_timeseries_client = service.projects().timeSeries() # pylint: disable=no-member
-    responses = common.ExecuteRequest(gcm_timeseries_client, 'list', {
-        'name': 'projects/{0:s}'.format(self.project_id),
-        'filter':
-            'metric.type="serviceruntime.googleapis.com/api/request_count"',
-        'interval_startTime': start_time,
-        'interval_endTime': end_time,
-        'aggregation_groupByFields': 'resource.labels.service',
-        'aggregation_perSeriesAligner': 'ALIGN_SUM',
-        'aggregation_alignmentPeriod': '{0:d}s'.format(period),
-        'aggregation_crossSeriesReducer': 'REDUCE_SUM',
-    })
+    time_series = self.QueryTimeSeries(
+        'serviceruntime.googleapis.com/api/request_count',
+        aggregation=Aggregation(
+            alignment_period=timeframe * 24 * 60 * 60,
+            per_series_aligner='ALIGN_SUM',
+            cross_series_reducer='REDUCE_SUM',
+            group_by_fields=['resource.labels.service']),
+        days=timeframe)
     ret = {}
-    for response in responses:
-      for ts in response.get('timeSeries', []):
-        service = ts.get('resource', {}).get('labels', {}).get('service', '')
-        if service:
-          points = ts.get('points', [])
-          if points:
-            val = points[0].get('value', {}).get('int64Value', '')
-            if val:
-              ret[service] = int(val)
+    for ts in time_series:
+      service = ts.resource_labels.get('service', '')
+      if service and ts.values and ts.values[0]:
+        ret[service] = int(ts.values[0])
     return ret
 
-
   def GetNetworkData(
       self, instance_ids: Optional[List[str]] = None,
       days: int = 2) -> List[Dict[str, Any]]:
@@ -121,83 +397,22 @@ class GoogleCloudMonitoring:
           },
         ]
     """
-    service = self.GcmApi()
-    gcm_timeseries_client = service.projects().timeSeries() # pylint: disable=no-member
-    start_time = common.FormatRFC3339(
-        datetime.datetime.utcnow() - datetime.timedelta(days=days))
-    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
-
-    network_filter = [
-        'metric.type=',
-        '"compute.googleapis.com/instance/network/sent_bytes_count" ',
-        'resource.type="gce_instance"'
-    ]
-
-    if instance_ids:
-      network_filter.append(
-          ' AND (resource.label.instance_id = "{0:s}"'.format(instance_ids[0]))
-      if len(instance_ids) > 1:
-        for instance_name in instance_ids[1:]:
-          network_filter.append(
-              ' OR resource.label.instance_id = "{0:s}"'.format(instance_name))
-
-    responses = common.ExecuteRequest(
-        gcm_timeseries_client,
-        'list',
-        {
-            'name': 'projects/{0:s}'.format(self.project_id),
-            'filter': ''.join(network_filter),
-            'interval_startTime': start_time,
-            'interval_endTime': end_time,
-            'aggregation_groupByFields': 'metadata.system_labels.name',
-            'aggregation_alignmentPeriod': '60s',
-            'aggregation_perSeriesAligner': 'ALIGN_RATE',
-            'aggregation_crossSeriesReducer': 'REDUCE_SUM'
-        })
-
-    network_data = []
-
-    for response in responses:
-      time_series = response.get('timeSeries', [])
-      for ts in time_series:
-        instance_name = response['timeSeries'][0]['metadata'][
-            'systemLabels']['name']
-        points = ts['points']
-        data = []
-        for point in points:
-          data.append({
-              'timestamp': point['interval']['startTime'],
-              'bytes': point['value']['doubleValue']})
-
-        network_data.append({
-            'instance_name': instance_name,
-            'network_usage': data})
-
-    return network_data
-
-  def _BuildUsageFilter(
-      self, metric_type: str, instance_ids: Optional[List[str]]) -> str:
-    """Builds a metrics query filter based on a list of instance IDs.
-
-    Args:
-      metric_type str: the type of metric to filter on.
-      instance_ids list[str]: a list of instance ids.
-
-    Returns:
-      str: the filter to use in a metrics query.
-    """
-    instances_filter = (
-          ['metric.type = "{0:s}"'.format(metric_type)])
-    if instance_ids:
-      instances_filter.append(
-          ' AND (resource.label.instance_id = "{0:s}"'.format(instance_ids[0]))
-      if len(instance_ids) > 1:
-        for instance_name in instance_ids[1:]:
-          instances_filter.append(
-              ' OR resource.label.instance_id = "{0:s}"'.format(instance_name))
-      instances_filter.append(')')
-
-    return ''.join(instances_filter)
+    time_series = self.QueryTimeSeries(
+        'compute.googleapis.com/instance/network/sent_bytes_count',
+        resource_type='gce_instance',
+        resource_filters={'instance_id': instance_ids or []},
+        aggregation=Aggregation(
+            alignment_period=60,
+            per_series_aligner='ALIGN_RATE',
+            cross_series_reducer='REDUCE_SUM',
+            group_by_fields=['metadata.system_labels.name']),
+        days=days)
+    return [{
+        'instance_name': ts.system_labels.get('name'),
+        'network_usage': [
+            {'timestamp': timestamp, 'bytes': value}
+            for timestamp, value in zip(ts.timestamps, ts.values)]
+    } for ts in time_series]
 
   def GetCpuUsage(self,
     instance_ids: Optional[List[str]] = None,
@@ -232,46 +447,14 @@ class GoogleCloudMonitoring:
           },
         ]
     """
-    service = self.GcmApi()
-    gcm_timeseries_client = service.projects().timeSeries() # pylint: disable=no-member
-
-    start_time = common.FormatRFC3339(
-        datetime.datetime.utcnow() - datetime.timedelta(days=days))
-    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
-    period = aggregation_minutes * 60
-    instance_filter = self._BuildUsageFilter(
-      'compute.googleapis.com/instance/cpu/utilization', instance_ids)
-
-    responses = common.ExecuteRequest(gcm_timeseries_client, 'list', {
-        'name': 'projects/{0:s}'.format(self.project_id),
-        'filter': instance_filter,
-        'interval_startTime': start_time,
-        'interval_endTime': end_time,
-        'view': 'FULL',
-        'aggregation_perSeriesAligner': 'ALIGN_MEAN',
-        'aggregation_alignmentPeriod': '{0:d}s'.format(period),
-    })
-
-    cpu_usage_instances = []
-
-    for response in responses:
-      time_series = response.get('timeSeries', [])
-      for ts in time_series:
-        instance_name = ts['metric']['labels']['instance_name']
-        instance_id = ts['resource']['labels']['instance_id']
-        points = ts['points']
-        cpu_usage = []
-        for point in points:
-          cpu_usage.append({
-              'timestamp': point['interval']['startTime'],
-              'cpu_usage': point['value']['doubleValue']})
-
-        cpu_usage_instances.append({
-            'instance_name': instance_name,
-            'instance_id': instance_id,
-            'cpu_usage': cpu_usage})
-
-    return cpu_usage_instances
+    time_series = self.QueryTimeSeries(
+        'compute.googleapis.com/instance/cpu/utilization',
+        resource_filters={'instance_id': instance_ids or []},
+        aggregation=Aggregation(
+            alignment_period=aggregation_minutes * 60,
+            per_series_aligner='ALIGN_MEAN'),
+        days=days)
+    return ParseCpuUsage(time_series)
 
   def GetInstanceGPUUsage(
       self,
@@ -304,58 +487,12 @@ class GoogleCloudMonitoring:
           },
         ]
     """
-    service = self.GcmApi()
-    gcm_timeseries_client = service.projects().timeSeries() # pylint: disable=no-member
-    start_time = common.FormatRFC3339(
-        datetime.datetime.utcnow() - datetime.timedelta(days=days))
-    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
-
-    instance_filter = self._BuildUsageFilter(
-        'agent.googleapis.com/gpu/utilization" resource.type="gce_instance',
-        instance_ids)
-
-    responses = common.ExecuteRequest(
-        gcm_timeseries_client,
-        'list',
-        {
-            'name':
-                'projects/{0:s}'.format(self.project_id),
-            'filter':
-                instance_filter,
-            'interval_startTime':
-                start_time,
-            'interval_endTime':
-                end_time
-        })
-
-    gpu_usage_instances = []
-
-    for response in responses:
-      time_series = response.get('timeSeries', [])
-      for ts in time_series:
-        gpu_name = 'None'
-        if ts['metric'].get('labels', None):
-          gpu_name = "{0:s} ({1:s})".format(
-              ts['metric']['labels']['model'],
-              ts['metric']['labels']['gpu_number'])
-        instance_id = ts['resource']['labels']['instance_id']
-        points = ts['points']
-        gpu_usage = []
-        all_points_zero = True
-        for point in points:
-          gpu_usage.append({
-              'timestamp': point['interval']['startTime'],
-              'gpu_usage': point['value']['doubleValue']})
-          if point['value']['doubleValue'] != 0:
-            all_points_zero = False
-
-        if not all_points_zero:
-          gpu_usage_instances.append({
-              'gpu_name': gpu_name,
-              'instance_id': instance_id,
-              'gpu_usage': gpu_usage})
-
-    return gpu_usage_instances
+    time_series = self.QueryTimeSeries(
+        'agent.googleapis.com/gpu/utilization',
+        resource_type='gce_instance',
+        resource_filters={'instance_id': instance_ids or []},
+        days=days)
+    return ParseGPUUsage(time_series)
 
   def GetNodeAccelUsage(self, days: int = 7) -> List[Dict[str, Any]]:
     """Returns GPU usage metrics for GKE nodes.
@@ -378,59 +515,151 @@ class GoogleCloudMonitoring:
             [
               {
                 'timestamp': str,
-                'gpu_usage': float
+                'gpu_usage': str
               },
             ]
           },
         ]
     """
-    service = self.GcmApi()
-    gcm_timeseries_client = service.projects().timeSeries() # pylint: disable=no-member
+    time_series = self.QueryTimeSeries(
+        'kubernetes.io/container/accelerator/duty_cycle',
+        resource_type='k8s_container',
+        days=days)
 
-    start_time = common.FormatRFC3339(
-        datetime.datetime.utcnow() - datetime.timedelta(days=days))
-    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
+    gpu_usage_instances = []
+    for ts in time_series:
+      if not any(ts.values):
+        continue
+      gpu_usage_instances.append({
+          'gpu_name': ts.metric_labels['model'],
+          'cluster_name': ts.resource_labels['cluster_name'],
+          'container_name': ts.resource_labels['container_name'],
+          'pod_name': ts.resource_labels['pod_name'],
+          # The duty cycle is returned as serialized by the API
+          'gpu_usage': [
+              {'timestamp': timestamp, 'gpu_usage': str(value)}
+              for timestamp, value in zip(ts.timestamps, ts.values)]})
+    return gpu_usage_instances
 
-    responses = common.ExecuteRequest(
-        gcm_timeseries_client,
-        'list',
-        {
-            'name':
-                'projects/{0:s}'.format(self.project_id),
-            'filter':
-                'metric.type="kubernetes.io/container/accelerator/duty_cycle" '
-                'resource.type="k8s_container"',
-            'interval_startTime':
-                start_time,
-            'interval_endTime':
-                end_time
-        })
+  def QueryInstanceMetrics(
+      self,
+      instance_ids: Optional[List[str]] = None,
+      days: int = 7,
+      aggregation_minutes: int = 5) -> Dict[str, List[TimeSeries]]:
+    """Queries the usage metrics of compute instances.
 
-    gpu_usage_instances = []
+    Args:
+      instance_ids (List[str]): Optional. A list of instance IDs to query.
+          When not provided, all instances in the project are queried.
+      days (int): Optional. The number of days to query. Default is 7.
+      aggregation_minutes (int): Optional. The minutes to aggregate points
+          on. Default is 5.
 
-    for response in responses:
-      time_series = response.get('timeSeries', [])
-      for ts in time_series:
-        gpu_name = ts['metric']['labels']['model']
-        cluster_name = ts['resource']['labels']['cluster_name']
-        container_name = ts['resource']['labels']['container_name']
-        pod_name = ts['resource']['labels']['pod_name']
-        points = ts['points']
-        gpu_usage = []
-        all_points_zero = True
-        for point in points:
-          gpu_usage.append({
-              'timestamp': point['interval']['startTime'],
-              'gpu_usage': point['value']['int64Value']})
-          if point['value']['int64Value'] != 0:
-            all_points_zero = False
-
-        if not all_points_zero:
-          gpu_usage_instances.append({
-              'gpu_name': gpu_name,
-              'cluster_name': cluster_name,
-              'container_name': container_name,
-              'pod_name': pod_name,
-              'gpu_usage': gpu_usage})
+    Returns:
+      Dict[str, List[TimeSeries]]: Dictionary mapping the name of each
+          metric ('cpu_usage', 'network_egress' and 'gpu_usage') to the
+          series of the instances. The CPU and GPU usage series are per
+          instance (and GPU), see ParseCpuUsage and ParseGPUUsage.
+    """
+    period = aggregation_minutes * 60
+    queries = {
+        'cpu_usage': (
+            'compute.googleapis.com/instance/cpu/utilization',
+            Aggregation(period, 'ALIGN_MEAN')),
+        'network_egress': (
+            'compute.googleapis.com/instance/network/sent_bytes_count',
+            Aggregation(period, 'ALIGN_RATE', 'REDUCE_SUM',
+                        ['resource.label.instance_id'])),
+        'gpu_usage': (
+            'agent.googleapis.com/gpu/utilization',
+            Aggregation(period, 'ALIGN_MEAN')),
+    }
+    return {
+        name: self.QueryTimeSeries(
+            metric_type,
+            resource_type='gce_instance',
+            resource_filters={'instance_id': instance_ids or []},
+            aggregation=aggregation,
+            days=days)
+        for name, (metric_type, aggregation) in queries.items()
+    }
+
+  def GetInstanceAnomalies(
+      self,
+      instance_ids: Optional[List[str]] = None,
+      days: int = 7,
+      aggregation_minutes: int = 5,
+      window: int = anomaly_utils.DEFAULT_BASELINE_WINDOW,
+      z_threshold: float = anomaly_utils.DEFAULT_Z_THRESHOLD,
+      top: Optional[int] = None,
+      time_series: Optional[Dict[str, List[TimeSeries]]] = None
+  ) -> List[Dict[str, Any]]:
+    """Ranks compute instances by how anomalous their usage metrics are.
+
+    The CPU usage, network egress and GPU usage series of each instance are
+    compared against a rolling baseline (see anomaly_utils.AnalyzeSeries),
+    and searched for shifts of their mean.
 
-    return gpu_usage_instances
+    Args:
+      instance_ids (List[str]): Optional. A list of instance IDs to analyze.
+          When not provided, all instances in the project are analyzed.
+      days (int): Optional. The number of days to analyze. Default is 7.
+      aggregation_minutes (int): Optional. The minutes to aggregate points
+          on. Default is 5.
+      window (int): Optional. The number of points of the rolling baseline.
+          Default is 60.
+      z_threshold (float): Optional. The absolute z-score from which a point
+          is anomalous. Default is 4.
+      top (int): Optional. Only return the most anomalous instances.
+      time_series (Dict[str, List[TimeSeries]]): Optional. The series
+          already returned by QueryInstanceMetrics, for the same instances,
+          days and aggregation_minutes. When not provided, the metrics are
+          queried.
+
+    Returns:
+      List[Dict[str, Any]]: The instances, most anomalous first, in the
+          format
+        [
+          {
+            'instance_id': str,
+            'score': float,
+            'flagged': bool,
+            'metrics': {
+              # e.g. 'cpu_usage', 'network_egress', 'gpu_usage (0)'
+              str: Dict[str, Any],  # See anomaly_utils.AnalyzeSeries
+            }
+          },
+        ]
+    """
+    if time_series is None:
+      time_series = self.QueryInstanceMetrics(
+          instance_ids=instance_ids, days=days,
+          aggregation_minutes=aggregation_minutes)
+
+    instances = {}  # type: Dict[str, Dict[str, Any]]
+    for name, metric_series in time_series.items():
+      for ts in metric_series:
+        instance_id = ts.resource_labels.get('instance_id')
+        if not instance_id or not ts.values:
+          continue
+        metric_name = name
+        if 'gpu_number' in ts.metric_labels:
+          metric_name = '{0:s} ({1:s})'.format(
+              name, ts.metric_labels['gpu_number'])
+        # Points are returned most recent first
+        analysis = anomaly_utils.AnalyzeSeries(
+            ts.timestamps[::-1], [float(value) for value in ts.values[::-1]],
+            window=window, z_threshold=z_threshold,
+            min_stddev=INSTANCE_METRICS_MIN_STDDEV.get(
+                name, anomaly_utils.DEFAULT_MIN_STDDEV))
+        instance = instances.setdefault(instance_id, {
+            'instance_id': instance_id, 'score': 0.0, 'flagged': False,
+            'metrics': {}})
+        instance['metrics'][metric_name] = analysis
+        instance['score'] = max(instance['score'], analysis['score'])
+        instance['flagged'] = instance['flagged'] or analysis['flagged']
+
+    ranking = sorted(
+        instances.values(), key=lambda instance: instance['score'],
+        reverse=True)
+    return ranking[:top] if top else ranking
@@ -14,12 +14,19 @@
 # limitations under the License.
 """Google Cloud Storage functionalities."""
 
+import base64
 import collections
+import csv
 import datetime
+import hashlib
 import os
+import queue
 import shutil
 import tempfile
-from typing import TYPE_CHECKING, List, Dict, Any, Optional
+import threading
+from concurrent import futures
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple, \
+  Iterator
 
 import googleapiclient.http
 from googleapiclient.errors import HttpError
@@ -30,6 +37,7 @@ from libcloudforensics.providers.gcp.internal import common
 # pylint: disable=line-too-long
 from libcloudforensics.providers.gcp.internal import monitoring as gcp_monitoring
 # pylint: enable=line-too-long
+from libcloudforensics.providers.utils import download_utils
 from libcloudforensics.providers.utils.storage_utils import SplitStoragePath
 
 logging_utils.SetUpLogger(__name__)
@@ -38,6 +46,87 @@ logger = logging_utils.GetLogger(__name__)
 if TYPE_CHECKING:
   import googleapiclient  # pylint: disable=ungrouped-imports
 
+# Size (in bytes) of each range request when downloading objects.
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+# Number of concurrent range requests when downloading objects.
+DEFAULT_DOWNLOAD_WORKERS = 8
+# Maximum number of objects returned by a single objects.list request.
+LISTING_PAGE_SIZE = 1000
+# Number of shards of a bucket listed concurrently in a parallel listing.
+DEFAULT_LISTING_WORKERS = 16
+# Characters following the prefix of a directory at which it is split into
+# shards in a parallel listing, if it has more than one page of objects.
+LISTING_SHARD_BOUNDARIES = (
+    '-./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz')
+# Object metadata fields recorded in a bucket manifest, in column order.
+MANIFEST_FIELDS = ['name', 'size', 'generation', 'md5Hash', 'crc32c']
+# Maximum number of calls in a single batch request to the GCS API.
+DELETE_BATCH_SIZE = 100
+# Number of batch delete requests sent concurrently.
+DEFAULT_DELETE_WORKERS = 8
+# Monitoring metrics reported for each bucket by GetBucketsUsage.
+BUCKET_USAGE_METRICS = {
+    'size': 'storage.googleapis.com/storage/total_bytes',
+    'objects': 'storage.googleapis.com/storage/object_count',
+}
+
+
+class _ObjectHasher:
+  """Computes the hash of a downloaded object, to check it against GCS.
+
+  The MD5 hash is used if the object has one. Composite objects only have a
+  CRC32C checksum, which is checked if the google-crc32c package is
+  installed.
+  """
+
+  def __init__(self, object_metadata: Dict[str, Any]) -> None:
+    """Initializes the hasher for an object.
+
+    Args:
+      object_metadata (Dict[str, Any]): The metadata of the object, as
+          returned by GetObjectMetadata.
+    """
+    self._name = object_metadata.get('name', '')
+    self._expected = None  # type: Optional[str]
+    self._hasher = None  # type: Any
+    if 'md5Hash' in object_metadata:
+      self._expected = object_metadata['md5Hash']
+      self._hasher = hashlib.md5()
+    elif 'crc32c' in object_metadata:
+      try:
+        import google_crc32c  # pylint: disable=import-outside-toplevel
+        self._expected = object_metadata['crc32c']
+        self._hasher = google_crc32c.Checksum()
+      except ImportError:
+        logger.warning(
+            'Object {0:s} only has a CRC32C checksum, install google-crc32c '
+            'to check the download against it'.format(self._name))
+
+  def Update(self, data: bytes) -> None:
+    """Hashes the next bytes of the object.
+
+    Args:
+      data (bytes): The bytes following those already hashed.
+    """
+    if self._hasher is not None:
+      self._hasher.update(data)
+
+  def Verify(self) -> bool:
+    """Checks the hash of the bytes against the one of the object.
+
+    Returns:
+      bool: False if the hashes differ, True otherwise, including when the
+          hash could not be checked.
+    """
+    if self._hasher is None:
+      return True
+    digest = base64.b64encode(self._hasher.digest()).decode('ascii')
+    if digest != self._expected:
+      logger.error('Hash mismatch for {0:s}: expected {1!s}, got {2:s}'.format(
+          self._name, self._expected, digest))
+      return False
+    return True
+
 
 class GoogleCloudStorage:
   """Class to call Google Cloud Storage APIs.
@@ -55,6 +144,8 @@ class GoogleCloudStorage:
     """
 
     self.project_id = project_id
+    # Usage of the buckets of the project, per timeframe
+    self._buckets_usage = {}  # type: Dict[int, Dict[str, Dict[str, Any]]]
 
   def GcsApi(self) -> 'googleapiclient.discovery.Resource':
     """Get a Google Cloud Storage service object.
@@ -138,22 +229,336 @@ class GoogleCloudStorage:
     objects: List[Dict[str, Any]] = request.execute().get('items', [])
     return objects
 
-  def ListBucketObjects(self, bucket: str) -> List[Dict[str, Any]]:
+  def ListBucketObjects(
+      self,
+      bucket: str,
+      prefix: Optional[str] = None,
+      fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """List objects (with metadata) in a Google Cloud Storage bucket.
 
+    For large buckets, prefer StreamBucketObjects, which does not hold the
+    objects in memory.
+
     Args:
       bucket (str):  Name of a bucket in GCS.
+      prefix (str): Optional. Only list objects whose name starts with it.
+      fields (List[str]): Optional. The metadata fields to return for each
+          object, e.g. ['name', 'size']. Default is all fields.
 
     Returns:
       List of Object Dicts (see GetObjectMetadata)
     """
+    return list(self.StreamBucketObjects(bucket, prefix=prefix, fields=fields))
+
+  def StreamBucketObjects(
+      self,
+      bucket: str,
+      prefix: Optional[str] = None,
+      fields: Optional[List[str]] = None,
+      start_offset: Optional[str] = None,
+      end_offset: Optional[str] = None,
+      delimiter: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Streams the objects of a bucket, one page of results at a time.
+
+    https://cloud.google.com/storage/docs/json_api/v1/objects/list
+
+    Args:
+      bucket (str): Name of a bucket in GCS.
+      prefix (str): Optional. Only list objects whose name starts with it.
+      fields (List[str]): Optional. The metadata fields to return for each
+          object, e.g. ['name', 'size']. Default is all fields.
+      start_offset (str): Optional. Only list objects whose name is
+          lexicographically equal to or after it.
+      end_offset (str): Optional. Only list objects whose name is
+          lexicographically before it.
+      delimiter (str): Optional. If set, objects whose name contains the
+          delimiter after the prefix are not listed. See ListBucketPrefixes.
+
+    Yields:
+      Dict[str, Any]: The metadata of each object, in lexicographic order of
+          names.
+    """
+    for page in self._ListObjectPages(
+        bucket, prefix, fields, start_offset, end_offset, delimiter):
+      yield from page.get('items', [])
+
+  def ListBucketPrefixes(
+      self,
+      bucket: str,
+      prefix: Optional[str] = None,
+      delimiter: str = '/') -> List[str]:
+    """Lists the "directories" of a bucket, under a prefix.
+
+    Args:
+      bucket (str): Name of a bucket in GCS.
+      prefix (str): Optional. The prefix under which to list directories.
+      delimiter (str): Optional. The delimiter of directories. Default is
+          '/'.
+
+    Returns:
+      List[str]: The prefixes of the directories, e.g. ['logs/2026/'].
+    """
+    prefixes = []  # type: List[str]
+    for page in self._ListObjectPages(
+        bucket, prefix, ['name'], None, None, delimiter):
+      prefixes.extend(page.get('prefixes', []))
+    return prefixes
+
+  def StreamBucketObjectsParallel(
+      self,
+      bucket: str,
+      prefix: Optional[str] = None,
+      fields: Optional[List[str]] = None,
+      max_workers: int = DEFAULT_LISTING_WORKERS,
+      delimiter: str = '/') -> Iterator[Dict[str, Any]]:
+    """Streams the objects of a bucket, listing shards of it concurrently.
+
+    The bucket is walked as a tree of directories, each listed as a shard
+    with the delimiter: the objects directly in a directory are yielded, and
+    its subdirectories are listed as new shards. If a directory has more
+    than one page of objects, the rest of it is split into shards of names
+    starting with the directory followed by a given character (see
+    LISTING_SHARD_BOUNDARIES), listed with start and end offsets. Pages of
+    results are yielded as they come in, so objects are not in
+    lexicographic order.
+
+    Args:
+      bucket (str): Name of a bucket in GCS.
+      prefix (str): Optional. Only list objects whose name starts with it.
+      fields (List[str]): Optional. The metadata fields to return for each
+          object, e.g. ['name', 'size']. Default is all fields. The name is
+          always returned, as it is needed to split directories.
+      max_workers (int): Optional. The number of shards listed concurrently.
+          Default is 16.
+      delimiter (str): Optional. The delimiter of directories. Default is
+          '/'.
+
+    Yields:
+      Dict[str, Any]: The metadata of each object.
+    """
+    if fields and 'name' not in fields:
+      fields = fields + ['name']
+    # Pages are passed from the workers through a bounded queue, so that
+    # listing is paced by the consumer. None marks the end of a shard.
+    pages = queue.Queue(maxsize=2 * max_workers)  # type: queue.Queue[Any]
+    stop = threading.Event()
+    lock = threading.Lock()
+    # Shards are submitted by the workers as directories are found
+    shard_counts = {'submitted': 0}
+
+    def Put(item: Any) -> None:
+      """Queues an item, unless the consumer stopped."""
+      while not stop.is_set():
+        try:
+          pages.put(item, timeout=0.1)
+          return
+        except queue.Full:
+          continue
+
+    def Submit(
+        directory: str,
+        start_offset: Optional[str] = None,
+        end_offset: Optional[str] = None,
+        skip_name: Optional[str] = None) -> None:
+      """Submits a shard of a directory to be listed."""
+      with lock:
+        shard_counts['submitted'] += 1
+      executor.submit(ListShard, directory, start_offset, end_offset, skip_name)
+
+    def ListShard(
+        directory: str,
+        start_offset: Optional[str],
+        end_offset: Optional[str],
+        skip_name: Optional[str]) -> None:
+      """Lists the objects of a shard into the queue.
+
+      Args:
+        directory (str): The prefix of the directory of the shard.
+        start_offset (str): The first name of the shard, or None to list the
+            whole directory.
+        end_offset (str): The name after the shard, or None.
+        skip_name (str): Optional. A name already listed, at the start of
+            the shard.
+      """
+      try:
+        for page in self._ListObjectPages(
+            bucket, directory, fields, start_offset, end_offset, delimiter):
+          if stop.is_set():
+            return
+          Put([item for item in page.get('items', [])
+               if item['name'] != skip_name])
+          subdirectories = [
+              subdirectory for subdirectory in page.get('prefixes', [])
+              if subdirectory != skip_name]
+          for subdirectory in subdirectories:
+            Submit(subdirectory)
+          names = [item['name'] for item in page.get('items', [])]
+          names.extend(page.get('prefixes', []))
+          if (start_offset is None and end_offset is None and names and
+              page.get('nextPageToken')):
+            # Split the rest of the directory, after the last name listed.
+            # Subdirectories are never split, as each one starts with a
+            # single character after the directory.
+            last_name = max(names)
+            bounds = [last_name] + [
+                directory + character
+                for character in LISTING_SHARD_BOUNDARIES
+                if directory + character > last_name
+            ] + [None]  # type: List[Optional[str]]
+            Submit(directory, bounds[0], bounds[1], skip_name=last_name)
+            for shard_start, shard_end in zip(bounds[1:-1], bounds[2:]):
+              Submit(directory, shard_start, shard_end)
+            return
+      except Exception as exception:  # pylint: disable=broad-except
+        Put(exception)
+      finally:
+        Put(None)
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+      Submit(prefix or '')
+      try:
+        finished = 0
+        while True:
+          page = pages.get()
+          if page is None:
+            finished += 1
+            # Shards are submitted before the end of the one finding them
+            with lock:
+              if finished == shard_counts['submitted']:
+                break
+          elif isinstance(page, Exception):
+            raise page
+          else:
+            yield from page
+      finally:
+        # Let the workers exit if the consumer stopped early
+        stop.set()
+
+  def _ListObjectPages(
+      self,
+      bucket: str,
+      prefix: Optional[str],
+      fields: Optional[List[str]],
+      start_offset: Optional[str],
+      end_offset: Optional[str],
+      delimiter: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """Lists the objects of a bucket, yielding each page of results.
+
+    See StreamBucketObjects for the arguments.
+
+    Yields:
+      Dict[str, Any]: The API response for each page of results.
+    """
     if bucket.startswith('gs://'):
       # Can change to removeprefix() in 3.9
       bucket = bucket[5:]
-    gcs_objects = self.GcsApi().objects() # pylint: disable=no-member
-    request = gcs_objects.list(bucket=bucket)
-    objects: List[Dict[str, Any]] = request.execute().get('items', [])
-    return objects
+    kwargs = {
+        'bucket': bucket, 'maxResults': LISTING_PAGE_SIZE
+    }  # type: Dict[str, Any]
+    if prefix:
+      kwargs['prefix'] = prefix
+    if fields:
+      kwargs['fields'] = 'items({0:s}),prefixes,nextPageToken'.format(
+          ','.join(fields))
+    if start_offset:
+      kwargs['startOffset'] = start_offset
+    if end_offset:
+      kwargs['endOffset'] = end_offset
+    if delimiter:
+      kwargs['delimiter'] = delimiter
+    gcs_objects = self.GcsApi().objects()  # pylint: disable=no-member
+    while True:
+      response = gcs_objects.list(**kwargs).execute()  # type: Dict[str, Any]
+      yield response
+      if not response.get('nextPageToken'):
+        return
+      kwargs['pageToken'] = response['nextPageToken']
+
+  def WriteBucketManifest(
+      self,
+      gcs_path: str,
+      out_file: str,
+      previous_manifest: Optional[str] = None,
+      parallel: bool = False) -> Dict[str, int]:
+    """Writes a CSV manifest of the hashes of the objects in a bucket.
+
+    The manifest has one row per object, with the columns in MANIFEST_FIELDS.
+    Only these fields are requested when listing the bucket. Composite
+    objects have no MD5 hash, and only a CRC32C checksum.
+
+    If a previous manifest is given, each object is compared to it by
+    generation number, which changes whenever an object is overwritten.
+    Objects that changed or were removed since the previous manifest are
+    logged. The previous manifest can be the output file itself, which is
+    only replaced once the new manifest is complete.
+
+    Args:
+      gcs_path (str): Path to the bucket, optionally followed by a prefix
+          of the objects to include, e.g. gs://bucket/evidence/.
+      out_file (str): Path to the local CSV file to write.
+      previous_manifest (str): Optional. Path to a manifest previously
+          written for the same path, to compare the objects against.
+      parallel (bool): Optional. List shards of the bucket concurrently. If
+          True, the rows are not in lexicographic order of names. Default is
+          False.
+
+    Returns:
+      Dict[str, int]: The number of 'objects' in the manifest. If a previous
+          manifest was given, also the number of objects 'added', 'changed',
+          'unchanged' and 'removed' since then.
+    """
+    if not gcs_path.startswith('gs://'):
+      gcs_path = 'gs://' + gcs_path
+    bucket, prefix = SplitStoragePath(gcs_path)
+
+    previous_generations = None  # type: Optional[Dict[str, str]]
+    if previous_manifest:
+      with open(previous_manifest, newline='', encoding='utf-8') as csv_file:
+        previous_generations = {
+            row['name']: row['generation'] for row in csv.DictReader(csv_file)
+        }
+
+    if parallel:
+      objects = self.StreamBucketObjectsParallel(
+          bucket, prefix=prefix, fields=MANIFEST_FIELDS)
+    else:
+      objects = self.StreamBucketObjects(
+          bucket, prefix=prefix, fields=MANIFEST_FIELDS)
+
+    summary = {'objects': 0}
+    if previous_generations is not None:
+      summary.update(added=0, changed=0, unchanged=0, removed=0)
+    temp_file = out_file + '.tmp'
+    with open(temp_file, 'w', newline='', encoding='utf-8') as csv_file:
+      writer = csv.DictWriter(
+          csv_file, fieldnames=MANIFEST_FIELDS, restval='',
+          extrasaction='ignore')
+      writer.writeheader()
+      for obj in objects:
+        writer.writerow(obj)
+        summary['objects'] += 1
+        if previous_generations is None:
+          continue
+        generation = previous_generations.pop(obj['name'], None)
+        if generation is None:
+          summary['added'] += 1
+        elif generation == obj.get('generation'):
+          summary['unchanged'] += 1
+        else:
+          summary['changed'] += 1
+          logger.warning('Object {0:s} changed since the previous manifest, '
+                         'from generation {1:s} to {2:s}'.format(
+                             obj['name'], generation, obj['generation']))
+    os.replace(temp_file, out_file)
+
+    if previous_generations is not None:
+      summary['removed'] = len(previous_generations)
+      for name in sorted(previous_generations):
+        logger.warning(
+            'Object {0:s} was removed since the previous manifest'.format(name))
+    logger.info('Manifest of {0:d} objects written to {1:s}'.format(
+        summary['objects'], out_file))
+    return summary
 
   def DeleteObject(self, gcs_path: str) -> None:
     """Deletes an object in a Google Cloud Storage bucket.
@@ -169,6 +574,146 @@ class GoogleCloudStorage:
     request = gcs_objects.delete(bucket=bucket, object=object_path)
     request.execute()
 
+  def DeleteObjects(
+      self,
+      gcs_paths: Optional[List[str]] = None,
+      prefix: Optional[str] = None,
+      dry_run: bool = False,
+      max_workers: int = DEFAULT_DELETE_WORKERS,
+      allow_whole_bucket: bool = False
+  ) -> Tuple[List[str], Dict[str, str]]:
+    """Deletes objects in Google Cloud Storage, given a list or a prefix.
+
+    Objects are deleted with batch requests of up to DELETE_BATCH_SIZE calls,
+    sent concurrently. When deleting by prefix, the objects are listed along
+    with their generation, and only the listed generation of each object is
+    deleted: an object overwritten in the meantime is reported as a failure.
+
+    Args:
+      gcs_paths (List[str]): Optional. Full paths to the objects to delete
+          (ie: gs://bucket/dir1/dir2/obj).
+      prefix (str): Optional. Path to a bucket, followed by the prefix of
+          the objects to delete (ie: gs://bucket/dir1/).
+      dry_run (bool): Optional. Only list the objects that would be deleted.
+          Default is False.
+      max_workers (int): Optional. The number of concurrent batch requests.
+          Default is 8.
+      allow_whole_bucket (bool): Optional. Whether a prefix without an
+          object part (ie: gs://bucket/), which selects every object of the
+          bucket, is allowed. Default is False.
+
+    Returns:
+      Tuple[List[str], Dict[str, str]]: The paths of the objects that were
+          deleted (or would be, in a dry run), and a dictionary mapping the
+          path of each object that could not be deleted to the error.
+
+    Raises:
+      ValueError: If not exactly one of gcs_paths and prefix is given, or if
+          the prefix selects a whole bucket and allow_whole_bucket is False.
+    """
+    if (gcs_paths is None) == (prefix is None):
+      raise ValueError('Exactly one of gcs_paths and prefix must be given.')
+
+    if prefix is not None:
+      if not prefix.startswith('gs://'):
+        prefix = 'gs://' + prefix
+      bucket, object_prefix = SplitStoragePath(prefix)
+      if not bucket:
+        raise ValueError('No bucket in prefix {0:s}'.format(prefix))
+      if not object_prefix and not allow_whole_bucket:
+        raise ValueError(
+            'Prefix {0:s} selects all the objects of the bucket, which must '
+            'be explicitly allowed.'.format(prefix))
+      objects = (
+          (bucket, obj['name'], obj.get('generation'))
+          for obj in self.StreamBucketObjects(
+              bucket, prefix=object_prefix, fields=['name', 'generation'])
+      )  # type: Iterator[Tuple[str, str, Optional[str]]]
+    else:
+      objects = (
+          SplitStoragePath(path if path.startswith('gs://') else 'gs://' + path)
+          + (None,) for path in gcs_paths or [])
+
+    deleted = []  # type: List[str]
+    failures = {}  # type: Dict[str, str]
+    if dry_run:
+      for bucket, name, _ in objects:
+        deleted.append('gs://{0:s}/{1:s}'.format(bucket, name))
+      logger.info('{0:d} objects would be deleted'.format(len(deleted)))
+      return deleted, failures
+
+    local = threading.local()
+
+    def _DeleteBatch(
+        batch: List[Tuple[str, str, Optional[str]]]) -> Dict[str, str]:
+      """Deletes a batch of objects, returning the errors per path."""
+      paths = ['gs://{0:s}/{1:s}'.format(bucket, name)
+               for bucket, name, _ in batch]
+      batch_failures = {}  # type: Dict[str, str]
+
+      def _Callback(
+          request_id: str, unused_response: Any, exception: Any) -> None:
+        if exception is not None:
+          batch_failures[paths[int(request_id)]] = str(exception)
+
+      try:
+        # Service objects are not thread-safe, each worker builds its own
+        if not hasattr(local, 'gcs_api'):
+          local.gcs_api = self.GcsApi()
+        batch_request = local.gcs_api.new_batch_http_request(
+            callback=_Callback)
+        for index, (bucket, name, generation) in enumerate(batch):
+          kwargs = {'bucket': bucket, 'object': name}  # type: Dict[str, Any]
+          if generation:
+            kwargs['generation'] = generation
+          batch_request.add(
+              local.gcs_api.objects().delete(**kwargs), request_id=str(index))
+        batch_request.execute()
+      except Exception as exception:  # pylint: disable=broad-except
+        # The batch request itself failed, none of its calls are known to
+        # have succeeded
+        return {path: str(exception) for path in paths}
+      return batch_failures
+
+    def _Collect(request: 'futures.Future[Dict[str, str]]',
+                 batch: List[Tuple[str, str, Optional[str]]]) -> None:
+      paths = ['gs://{0:s}/{1:s}'.format(bucket, name)
+               for bucket, name, _ in batch]
+      try:
+        batch_failures = request.result()
+      except Exception as exception:  # pylint: disable=broad-except
+        batch_failures = {path: str(exception) for path in paths}
+      failures.update(batch_failures)
+      for path in paths:
+        if path not in batch_failures:
+          deleted.append(path)
+
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+      # Bounding the number of pending batches bounds memory use when
+      # deleting a large prefix.
+      pending = {}  # type: Dict[futures.Future[Dict[str, str]], List[Tuple[str, str, Optional[str]]]]  # pylint: disable=line-too-long
+      batch = []  # type: List[Tuple[str, str, Optional[str]]]
+      for obj in objects:
+        batch.append(obj)
+        if len(batch) < DELETE_BATCH_SIZE:
+          continue
+        if len(pending) >= 2 * max_workers:
+          done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+          for request in done:
+            _Collect(request, pending.pop(request))
+        pending[executor.submit(_DeleteBatch, batch)] = batch
+        batch = []
+      if batch:
+        pending[executor.submit(_DeleteBatch, batch)] = batch
+      for request in futures.as_completed(pending):
+        _Collect(request, pending[request])
+
+    for path, error in sorted(failures.items()):
+      logger.warning('Could not delete {0:s}: {1:s}'.format(path, error))
+    logger.info('Deleted {0:d} objects, {1:d} failures'.format(
+        len(deleted), len(failures)))
+    return deleted, failures
+
   def GetBucketSize(self,
                     bucket: str,
                     timeframe: int = 1) -> Dict[str, int]:
@@ -231,6 +776,81 @@ class GoogleCloudStorage:
               ret[bucket] = val
     return ret
 
+  def GetBucketsUsage(
+      self,
+      timeframe: int = 7,
+      refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Reports the usage of all the buckets in the project.
+
+    Each metric of BUCKET_USAGE_METRICS is fetched with a single time series
+    query for the whole project, grouped by bucket and summed across storage
+    classes, with one point per day. The report is cached per timeframe.
+
+    Ref: https://cloud.google.com/monitoring/api/metrics_gcp#gcp-storage
+
+    Args:
+      timeframe (int): Optional. The number (in days) for which to measure
+          the usage. Default: 7 days.
+      refresh (bool): Optional. Query the metrics again, even if the usage
+          was already reported for that timeframe. Default is False.
+
+    Returns:
+      Dict[str, Dict[str, Any]]: Dictionary mapping bucket name to its usage:
+          'size' (latest size in bytes), 'objects' (latest number of
+          objects) and 'growth' (average growth of the size in the
+          timeframe, in bytes per day, or None if only one day of data is
+          available).
+    """
+    if timeframe in self._buckets_usage and not refresh:
+      return self._buckets_usage[timeframe]
+
+    start_time = common.FormatRFC3339(
+        datetime.datetime.utcnow() - datetime.timedelta(days=timeframe))
+    end_time = common.FormatRFC3339(datetime.datetime.utcnow())
+    day = datetime.timedelta(days=1)
+
+    assert self.project_id  # Necessary for mypy check
+    gcm = gcp_monitoring.GoogleCloudMonitoring(self.project_id)
+    gcm_timeseries_client = gcm.GcmApi().projects().timeSeries() # pylint: disable=no-member
+
+    usage = {}  # type: Dict[str, Dict[str, Any]]
+    for key, metric_type in BUCKET_USAGE_METRICS.items():
+      responses = common.ExecuteRequest(
+          gcm_timeseries_client,
+          'list',
+          {
+              'name': 'projects/{0:s}'.format(self.project_id),
+              'filter': 'metric.type="{0:s}" resource.type="gcs_bucket"'
+                        .format(metric_type),
+              'interval_startTime': start_time,
+              'interval_endTime': end_time,
+              'aggregation_groupByFields': 'resource.label.bucket_name',
+              'aggregation_perSeriesAligner': 'ALIGN_MAX',
+              'aggregation_alignmentPeriod': '{0:d}s'.format(
+                  int(day.total_seconds())),
+              'aggregation_crossSeriesReducer': 'REDUCE_SUM'
+          })
+      for response in responses:
+        for ts in response.get('timeSeries', []):
+          bucket = ts.get('resource', {}).get('labels', {}).get(
+              'bucket_name', '')
+          points = sorted(
+              (common.ParseRFC3339(point['interval']['endTime']),
+               int(float(point['value'].get('doubleValue') or
+                         point['value'].get('int64Value', 0))))
+              for point in ts.get('points', []))
+          if not bucket or not points:
+            continue
+          bucket_usage = usage.setdefault(
+              bucket, {'size': None, 'objects': None, 'growth': None})
+          bucket_usage[key] = points[-1][1]
+          if key == 'size' and len(points) > 1:
+            days = (points[-1][0] - points[0][0]) / day
+            bucket_usage['growth'] = (points[-1][1] - points[0][1]) / days
+
+    self._buckets_usage[timeframe] = usage
+    return usage
+
   def CreateBucket(
       self,
       bucket: str,
@@ -281,54 +901,131 @@ class GoogleCloudStorage:
 
   def GetObject(self,
                 gcs_path: str,
-                out_file: Optional[str] = None) -> str:
+                out_file: Optional[str] = None,
+                chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE,
+                max_workers: int = DEFAULT_DOWNLOAD_WORKERS) -> str:
     """Gets the contents of an object in a Google Cloud Storage bucket.
 
+    The object is downloaded as byte ranges fetched concurrently, which are
+    written at their offset in a preallocated file. The progress is recorded
+    in a '.progress' file next to the output file, from which an interrupted
+    download of the same object generation is resumed. At most max_workers
+    ranges are held in memory (256MB with the defaults). See
+    download_utils.DownloadRanges for details. If the size of the object is
+    unknown, it is downloaded in a single stream instead.
+
+    The download is checked against the MD5 hash of the object (or its
+    CRC32C checksum for composite objects, if the google-crc32c package is
+    installed), computed in a single pass as the ranges complete.
+
     Args:
       gcs_path (str): Full path to the object (ie: gs://bucket/dir1/dir2/obj)
       out_file (str): Path to the local file that will be written.
         If not provided, will create a temporary file.
+      chunk_size (int): Optional. The size (in bytes) of each range request.
+          Default is 32MB.
+      max_workers (int): Optional. The number of concurrent range requests.
+          Default is 8.
 
     Returns:
       str: The filename of the written object.
 
     Raises:
-      ResourceCreationError: If the file couldn't be downloaded.
+      ResourceCreationError: If the file couldn't be downloaded, or doesn't
+          match the hash of the object.
     """
     if not gcs_path.startswith('gs://'):
       gcs_path = 'gs://' + gcs_path
-    gcs_objects = self.GcsApi().objects() # pylint: disable=no-member
     (bucket, filename) = SplitStoragePath(gcs_path)
-    request = gcs_objects.get_media(bucket=bucket, object=filename)
 
     if not out_file:
       outputdir = tempfile.mkdtemp()
       logger.info('Created temporary directory {0:s}'.format(outputdir))
       out_file = os.path.join(outputdir, os.path.basename(filename))
 
-    stat = shutil.disk_usage(os.path.dirname(outputdir))
     om = self.GetObjectMetadata(gcs_path)
+    generation = om.get('generation')
+    hasher = _ObjectHasher(om)
     if 'size' not in om:
-      logger.warning('Unable to retrieve object metadata before fetching')
+      logger.warning('Unable to retrieve object metadata before fetching, '
+                     'downloading {0:s} in a single stream'.format(gcs_path))
+      self._GetObjectStream(bucket, filename, generation, out_file, hasher)
     else:
-      if int(om['size']) > stat.free:
-        raise errors.ResourceCreationError(
-            'Target drive does not have enough space ({0!s} free vs {1!s} needed)'  # pylint: disable=line-too-long
-            .format(stat.free, om['size']),
-            __name__)
+      size = int(om['size'])
+      local = threading.local()
+
+      def _FetchChunk(offset: int, length: int) -> bytes:
+        # Service objects are not thread-safe, each worker builds its own
+        if not hasattr(local, 'gcs_objects'):
+          local.gcs_objects = self.GcsApi().objects()  # pylint: disable=no-member
+        request = local.gcs_objects.get_media(
+            bucket=bucket, object=filename, generation=generation)
+        request.headers['Range'] = 'bytes={0:d}-{1:d}'.format(
+            offset, offset + length - 1)
+        try:
+          data = request.execute()  # type: bytes
+        except HttpError as exception:
+          raise errors.ResourceCreationError(
+              'Could not download bytes {0:d}-{1:d} of {2:s}: {3!s}'.format(
+                  offset, offset + length - 1, gcs_path, exception),
+              __name__) from exception
+        return data
+
+      source = {'path': gcs_path, 'generation': generation, 'size': size,
+                'chunk_size': chunk_size}
+      download_utils.DownloadRanges(
+          out_file,
+          size,
+          [(offset, min(chunk_size, size - offset))
+           for offset in range(0, size, chunk_size)],
+          _FetchChunk,
+          source,
+          max_workers,
+          update_hash=hasher.Update)
+
+    if not hasher.Verify():
+      raise errors.ResourceCreationError(
+          'Downloaded file {0:s} does not match the hash of {1:s}'.format(
+              out_file, gcs_path),
+          __name__)
+    logger.info('File successfully written to {0:s}'.format(out_file))
+    return out_file
+
+  def _GetObjectStream(self,
+                       bucket: str,
+                       filename: str,
+                       generation: Optional[str],
+                       out_file: str,
+                       hasher: _ObjectHasher) -> None:
+    """Downloads an object of unknown size in a single stream.
 
-    with open(out_file, 'wb') as outputfile:
-      downloader = googleapiclient.http.MediaIoBaseDownload(outputfile, request)
+    Args:
+      bucket (str): The bucket of the object.
+      filename (str): The name of the object in the bucket.
+      generation (str): Optional. The generation of the object.
+      out_file (str): Path to the local file that will be written.
+      hasher (_ObjectHasher): The hasher of the object, updated with the
+          downloaded bytes.
 
+    Raises:
+      ResourceCreationError: If the target drive does not have enough space.
+    """
+    gcs_objects = self.GcsApi().objects()  # pylint: disable=no-member
+    request = gcs_objects.get_media(
+        bucket=bucket, object=filename, generation=generation)
+    stat = shutil.disk_usage(os.path.dirname(os.path.abspath(out_file)))
+    with open(out_file, 'wb') as output_file:
+      downloader = googleapiclient.http.MediaIoBaseDownload(
+          output_file, request, chunksize=DEFAULT_DOWNLOAD_CHUNK_SIZE)
       done = False
       while not done:
         status, done = downloader.next_chunk()
         if status.total_size > stat.free:
           raise errors.ResourceCreationError(
-              'Target drive does not have enough space ({0!s} free vs {1!s} needed)'  # pylint: disable=line-too-long
-              .format(stat.free, status.total_size),
-              __name__)
-        logger.info('Download {}%.'.format(int(status.progress() * 100)))
-      logger.info('File successfully written to {0:s}'.format(out_file))
-
-    return out_file
+              'Target drive does not have enough space ({0!s} free vs {1!s} '
+              'needed)'.format(stat.free, status.total_size), __name__)
+        logger.info('Download {0:d}%.'.format(int(status.progress() * 100)))
+    with open(out_file, 'rb') as output_file:
+      for data in iter(
+          lambda: output_file.read(DEFAULT_DOWNLOAD_CHUNK_SIZE), b''):
+        hasher.Update(data)
@@ -15,7 +15,11 @@
 """Kubernetes core class structure."""
 
 import abc
-from typing import List, TypeVar, Callable, Optional, Dict
+import json
+import time
+from concurrent import futures
+from typing import Any, List, TypeVar, Callable, Optional, Dict, Iterator, \
+  NamedTuple
 
 from kubernetes import client
 
@@ -27,6 +31,70 @@ from libcloudforensics.providers.kubernetes import volume
 logging_utils.SetUpLogger(__name__)
 logger = logging_utils.GetLogger(__name__)
 
+# Number of pods removed concurrently when draining nodes.
+DEFAULT_DRAIN_WORKERS = 10
+# Time (in seconds) during which an eviction refused because of a
+# PodDisruptionBudget is retried.
+DEFAULT_EVICTION_TIMEOUT = 60
+# Time (in seconds) between two attempts at evicting a pod.
+EVICTION_RETRY_INTERVAL = 5
+
+# Outcomes of removing a pod when draining nodes.
+POD_EVICTED = 'Evicted'
+POD_DELETED = 'Deleted'
+POD_EVICTION_BLOCKED = 'EvictionBlocked'
+POD_REMOVAL_FAILED = 'Failed'
+
+# Number of pods labelled concurrently.
+DEFAULT_LABEL_WORKERS = 10
+# Number of times a label patch refused because of a conflicting update, or
+# because of throttling, is retried.
+LABEL_PATCH_RETRIES = 3
+# Time (in seconds) between two attempts at labelling a pod.
+LABEL_RETRY_INTERVAL = 1
+
+# Maximum number of objects returned by a single list request. Larger lists
+# are fetched in chunks, following the continue token of each response.
+DEFAULT_LIST_CHUNK_SIZE = 500
+
+
+class K8sObjectRecord(NamedTuple):
+  """Lightweight record of a Kubernetes object, as returned by list requests.
+
+  Records hold a few fields of the raw API response, and are much cheaper to
+  build and to keep in memory than the OpenAPI model objects.
+
+  Attributes:
+    name (str): The name of the object.
+    namespace (str): The namespace of the object, None if cluster-scoped.
+    labels (Dict[str, str]): The labels of the object.
+    node_name (str): The node a pod is scheduled on, None otherwise.
+    phase (str): The phase of a pod, None otherwise.
+  """
+  name: str
+  namespace: Optional[str]
+  labels: Dict[str, str]
+  node_name: Optional[str]
+  phase: Optional[str]
+
+  @classmethod
+  def FromDict(cls, item: Dict[str, Any]) -> 'K8sObjectRecord':
+    """Builds a record from the JSON representation of an object.
+
+    Args:
+      item (Dict[str, Any]): The object, as returned by the API server.
+
+    Returns:
+      K8sObjectRecord: The record of the object.
+    """
+    metadata = item['metadata']
+    return cls(
+        name=metadata['name'],
+        namespace=metadata.get('namespace'),
+        labels=metadata.get('labels') or {},
+        node_name=(item.get('spec') or {}).get('nodeName'),
+        phase=(item.get('status') or {}).get('phase'))
+
 
 class K8sClient(metaclass=abc.ABCMeta):
   """Abstract class representing objects that use the Kubernetes API."""
@@ -58,6 +126,96 @@ class K8sClient(metaclass=abc.ABCMeta):
     """
     return api_class(self._api_client)
 
+  def _ListPages(
+      self,
+      list_function: Callable[..., Any],
+      *args: Any,
+      limit: int = DEFAULT_LIST_CHUNK_SIZE,
+      **kwargs: Any) -> Iterator[Any]:
+    """Calls an API list function in chunks, following continue tokens.
+
+    Example usage:
+    ```
+    for page in self._ListPages(api.list_namespaced_pod, 'default'):
+      ...
+    ```
+
+    Args:
+      list_function (Callable[..., Any]): The API list function.
+      *args (Any): The positional arguments of the list function.
+      limit (int): Optional. The maximum number of objects per chunk.
+          Default is 500.
+      **kwargs (Any): The keyword arguments of the list function.
+
+    Yields:
+      Any: The response of each list request.
+    """
+    continue_token = None
+    while True:
+      response = list_function(
+          *args, limit=limit, _continue=continue_token, **kwargs)
+      yield response
+      continue_token = response.metadata and response.metadata._continue  # pylint: disable=protected-access
+      if not continue_token:
+        return
+
+  def _ListItems(
+      self,
+      list_function: Callable[..., Any],
+      *args: Any,
+      **kwargs: Any) -> Iterator[Any]:
+    """Lists objects in chunks, yielding the deserialized API objects.
+
+    Args:
+      list_function (Callable[..., Any]): The API list function.
+      *args (Any): The positional arguments of the list function.
+      **kwargs (Any): The keyword arguments of the list function.
+
+    Yields:
+      Any: The API response objects, e.g. client.V1Pod.
+    """
+    for page in self._ListPages(list_function, *args, **kwargs):
+      yield from page.items
+
+  def _ListRecords(
+      self,
+      list_function: Callable[..., Any],
+      *args: Any,
+      limit: int = DEFAULT_LIST_CHUNK_SIZE,
+      **kwargs: Any) -> Iterator[K8sObjectRecord]:
+    """Lists objects in chunks, yielding lightweight records.
+
+    The responses are not deserialized into OpenAPI model objects, but parsed
+    as plain JSON, from which only the fields of the records are kept.
+
+    Args:
+      list_function (Callable[..., Any]): The API list function.
+      *args (Any): The positional arguments of the list function.
+      limit (int): Optional. The maximum number of objects per chunk.
+          Default is 500.
+      **kwargs (Any): The keyword arguments of the list function.
+
+    Yields:
+      K8sObjectRecord: The records of the objects.
+    """
+    continue_token = None
+    while True:
+      response = list_function(
+          *args,
+          limit=limit,
+          _continue=continue_token,
+          _preload_content=False,
+          **kwargs)
+      try:
+        page = json.loads(response.data)
+      finally:
+        response.release_conn()
+      for item in page.get('items') or []:
+        yield K8sObjectRecord.FromDict(item)
+      continue_token = (page.get('metadata') or {}).get('continue')
+      if not continue_token:
+        return
+
 
 class K8sResource(K8sClient, metaclass=abc.ABCMeta):
   """Abstract class representing a Kubernetes resource.
@@ -149,23 +307,50 @@ class K8sNode(K8sResource):
     # Cordon the node with the PATCH verb
     api.patch_node(self.name, body)
 
-  def Drain(self, pod_filter: Callable[['K8sPod'], bool]) -> None:
+  def Drain(
+      self,
+      pod_filter: Callable[['K8sPod'], bool],
+      evict: bool = False,
+      max_workers: int = DEFAULT_DRAIN_WORKERS,
+      eviction_timeout: int = DEFAULT_EVICTION_TIMEOUT) -> Dict[str, str]:
     """Drains all pods from this node that satisfy a filter.
 
     Args:
       pod_filter (Callable[[K8sPod], bool]): A predicate taking a pod as
           argument. Pods that are on this node and satisfy this predicate will
-          be deleted.
-    """
-    for pod in self.ListPods():
-      if pod_filter(pod):
-        pod.Delete()
+          be removed.
+      evict (bool): Optional. If True, pods are removed through the Eviction
+          API, which respects PodDisruptionBudgets and may therefore leave
+          pods in place. If False, pods are deleted. Defaults to False.
+      max_workers (int): Optional. The number of pods removed concurrently.
+          Default is 10.
+      eviction_timeout (int): Optional. Time (in seconds) during which an
+          eviction refused because of a PodDisruptionBudget is retried.
+          Default is 60 seconds.
 
-  def ListPods(self, namespace: Optional[str] = None) -> List['K8sPod']:
+    Returns:
+      Dict[str, str]: The outcome of the removal of each pod (e.g.
+          POD_EVICTED), keyed by 'namespace/name'.
+    """
+    return DrainPods(
+        [pod for pod in self.ListPods() if pod_filter(pod)],
+        evict=evict,
+        max_workers=max_workers,
+        eviction_timeout=eviction_timeout)
+
+  def ListPods(
+      self,
+      namespace: Optional[str] = None,
+      object_filter: Optional[Callable[[client.V1Pod], bool]] = None
+  ) -> List['K8sPod']:
     """Lists the pods on this node, possibly filtering for a namespace.
 
     Args:
       namespace (str): Optional. The namespace in which to list the node's pods.
+      object_filter (Callable[[client.V1Pod], bool]): Optional. A predicate
+          taking the API object of a pod as listed, e.g. to check its labels
+          without reading the pod again. Only the pods satisfying it are
+          returned.
 
     Returns:
       List[K8sPod]: The list of the node's pods for the namespace, or in all
@@ -188,8 +373,10 @@ class K8sNode(K8sResource):
           **running_on_node_selector.ToKeywords())
 
     return [
-        K8sPod(self._api_client, pod.metadata.name, pod.metadata.namespace)
-        for pod in pods.items
+        K8sPod(
+            self._api_client, pod.metadata.name, pod.metadata.namespace,
+            labels=pod.metadata.labels or {})
+        for pod in pods.items if not object_filter or object_filter(pod)
     ]
 
   def ExternalIps(self) -> List[str]:
@@ -293,8 +480,32 @@ class K8sPod(K8sWorkload):
   """Class representing a Kubernetes pod.
 
   https://kubernetes.io/docs/concepts/workloads/pods/
+
+  Attributes:
+    labels (Dict[str, str]): The labels of the pod when it was listed, or
+        None if they are unknown.
   """
 
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      namespace: str,
+      labels: Optional[Dict[str, str]] = None) -> None:
+    """Creates a Kubernetes pod.
+
+    Args:
+      api_client (ApiClient): The authenticated Kubernetes API client to
+          the cluster.
+      name (str): The name of the pod.
+      namespace (str): The Kubernetes namespace of the pod.
+      labels (Dict[str, str]): Optional. The labels of the pod, if known
+          from a list response. They save reading the pod to match it
+          against a workload.
+    """
+    super().__init__(api_client, name, namespace)
+    self.labels = labels
+
   @property
   def gcp_protopayload_methodname(self) -> str:
     """Override of abstract property."""
@@ -346,7 +557,7 @@ class K8sPod(K8sWorkload):
     Returns:
       List[volume.K8sVolume]: The list of volumes on this pod.
     """
-    return list(map(volume.K8sVolume, self.Read().spec.volumes))
+    return list(map(volume.K8sVolume, self.Read().spec.volumes or []))
 
   def GetLabels(self) -> Dict[str, str]:
     """Gets the labels in the metadata field of this pod.
@@ -367,14 +578,179 @@ class K8sPod(K8sWorkload):
     api = self._Api(client.CoreV1Api)
     api.delete_namespaced_pod(self.name, self.namespace)
 
-  def AddLabels(self, labels: Dict[str, str]) -> None:
+  def Evict(self, timeout: int = DEFAULT_EVICTION_TIMEOUT) -> bool:
+    """Evicts this pod through the Eviction API.
+
+    Contrary to deleting the pod, evicting it respects the
+    PodDisruptionBudgets covering the pod. Evictions refused because of a
+    budget are retried until the timeout.
+
+    https://kubernetes.io/docs/concepts/scheduling-eviction/api-eviction/
+
+    Args:
+      timeout (int): Optional. Time (in seconds) during which a refused
+          eviction is retried. Default is 60 seconds.
+
+    Returns:
+      bool: True if the pod was evicted (or no longer exists), False if the
+          eviction was still refused at the timeout.
+
+    Raises:
+      client.ApiException: If the eviction failed for another reason.
+    """
+    api = self._Api(client.CoreV1Api)
+    body = client.V1Eviction(
+        metadata=client.V1ObjectMeta(name=self.name, namespace=self.namespace))
+    deadline = time.time() + timeout
+    while True:
+      try:
+        api.create_namespaced_pod_eviction(self.name, self.namespace, body)
+        return True
+      except client.ApiException as exception:
+        if exception.status == 404:
+          return True
+        # 429 is returned when the eviction would violate a budget
+        if exception.status != 429:
+          raise
+      if time.time() >= deadline:
+        return False
+      logger.debug('Eviction of pod {0:s} refused, retrying'.format(self.name))
+      time.sleep(EVICTION_RETRY_INTERVAL)
+
+  def AddLabels(
+      self, labels: Dict[str, str], retries: int = LABEL_PATCH_RETRIES) -> bool:
     """Adds labels to this pod.
 
+    Patches refused because of a conflicting update of the pod (409), or
+    because of throttling (429), are retried.
+
     Args:
       labels (Dict[str, str]): The labels to be added to this pod.
+      retries (int): Optional. The number of times a refused patch is
+          retried. Default is 3.
+
+    Returns:
+      bool: True if the patched pod carries the labels, as returned by the
+          API server.
+
+    Raises:
+      client.ApiException: If the patch failed for another reason, or was
+          still refused after the retries.
     """
     api = self._Api(client.CoreV1Api)
-    api.patch_namespaced_pod(
-        self.name, self.namespace, body={'metadata': {
-            'labels': labels
-        }})
+    for attempt in range(retries + 1):
+      try:
+        response = api.patch_namespaced_pod(
+            self.name, self.namespace, body={'metadata': {
+                'labels': labels
+            }})
+        break
+      except client.ApiException as exception:
+        if exception.status not in (409, 429) or attempt == retries:
+          raise
+      logger.debug('Labelling of pod {0:s} refused, retrying'.format(
+          self.name))
+      time.sleep(LABEL_RETRY_INTERVAL)
+    pod_labels = response.metadata.labels or {}
+    return all(pod_labels.get(key) == value for key, value in labels.items())
+
+
+def DrainPods(
+    pods: List[K8sPod],
+    evict: bool = False,
+    max_workers: int = DEFAULT_DRAIN_WORKERS,
+    eviction_timeout: int = DEFAULT_EVICTION_TIMEOUT) -> Dict[str, str]:
+  """Removes pods concurrently, reporting the outcome for each pod.
+
+  Args:
+    pods (List[K8sPod]): The pods to remove.
+    evict (bool): Optional. If True, pods are removed through the Eviction
+        API, which respects PodDisruptionBudgets and may therefore leave pods
+        in place. If False, pods are deleted. Defaults to False.
+    max_workers (int): Optional. The number of pods removed concurrently.
+        Default is 10.
+    eviction_timeout (int): Optional. Time (in seconds) during which an
+        eviction refused because of a PodDisruptionBudget is retried. Default
+        is 60 seconds.
+
+  Returns:
+    Dict[str, str]: The outcome of the removal of each pod (one of
+        POD_EVICTED, POD_DELETED, POD_EVICTION_BLOCKED and
+        POD_REMOVAL_FAILED), keyed by 'namespace/name'.
+  """
+
+  def RemovePod(pod: K8sPod) -> str:
+    """Removes a pod, returning the outcome."""
+    if not evict:
+      pod.Delete()
+      return POD_DELETED
+    if pod.Evict(timeout=eviction_timeout):
+      return POD_EVICTED
+    return POD_EVICTION_BLOCKED
+
+  results = {}  # type: Dict[str, str]
+  if not pods:
+    return results
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    pods_by_future = {executor.submit(RemovePod, pod): pod for pod in pods}
+    for future in futures.as_completed(pods_by_future):
+      pod = pods_by_future[future]
+      pod_id = '{0:s}/{1:s}'.format(pod.namespace, pod.name)
+      try:
+        results[pod_id] = future.result()
+      except Exception as exception:  # pylint: disable=broad-except
+        # A single pod failing (e.g. on a connection error) must not abort
+        # the reporting of the other pods, which are being removed anyway.
+        logger.warning('Could not remove pod {0:s}: {1!s}'.format(
+            pod_id, exception))
+        results[pod_id] = POD_REMOVAL_FAILED
+      else:
+        logger.info('Pod {0:s}: {1:s}'.format(pod_id, results[pod_id]))
+  return results
+
+
+def LabelPods(
+    pods: List[K8sPod],
+    labels: Dict[str, str],
+    max_workers: int = DEFAULT_LABEL_WORKERS) -> List[K8sPod]:
+  """Adds labels to pods concurrently, confirming that each pod carries them.
+
+  Pods that no longer exist are not reported, as there is nothing left to
+  label.
+
+  Args:
+    pods (List[K8sPod]): The pods to label.
+    labels (Dict[str, str]): The labels to be added to the pods.
+    max_workers (int): Optional. The number of pods labelled concurrently.
+        Default is 10.
+
+  Returns:
+    List[K8sPod]: The pods that could not be confirmed to carry the labels.
+  """
+  unlabelled = []  # type: List[K8sPod]
+  if not pods:
+    return unlabelled
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    pods_by_future = {
+        executor.submit(pod.AddLabels, labels): pod for pod in pods}
+    for future in futures.as_completed(pods_by_future):
+      pod = pods_by_future[future]
+      pod_id = '{0:s}/{1:s}'.format(pod.namespace, pod.name)
+      try:
+        if not future.result():
+          logger.warning('Pod {0:s} does not carry the labels after being '
+                         'patched'.format(pod_id))
+          unlabelled.append(pod)
+      except client.ApiException as exception:
+        if exception.status == 404:
+          logger.info('Pod {0:s} no longer exists'.format(pod_id))
+          continue
+        logger.warning('Could not label pod {0:s}: {1!s}'.format(
+            pod_id, exception))
+        unlabelled.append(pod)
+      except Exception as exception:  # pylint: disable=broad-except
+        # Connection errors on one pod must not abort labelling the others.
+        logger.warning('Could not label pod {0:s}: {1!s}'.format(
+            pod_id, exception))
+        unlabelled.append(pod)
+  return unlabelled
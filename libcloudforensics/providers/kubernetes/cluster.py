@@ -14,14 +14,16 @@
 # limitations under the License.
 """Kubernetes cluster class, starting point for Kubernetes API calls."""
 import abc
-from typing import Iterable, Optional, List
+from typing import Any, Dict, Iterable, Iterator, Optional, List
 
 from kubernetes import client
 
 from libcloudforensics import logging_utils
 from libcloudforensics.providers.kubernetes import base
+from libcloudforensics.providers.kubernetes import informer
 from libcloudforensics.providers.kubernetes import netpol
 from libcloudforensics.providers.kubernetes import services
+from libcloudforensics.providers.kubernetes import snapshot
 from libcloudforensics.providers.kubernetes import workloads
 
 logging_utils.SetUpLogger(__name__)
@@ -42,8 +44,33 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
       api_client (client.ApiClient): The API client to the Kubernetes cluster.
     """
     super().__init__(api_client)
+    self._cache = None  # type: Optional[informer.K8sClusterInformer]
     self._AuthorizationCheck()
 
+  def EnableCache(
+      self, watch_timeout: int = informer.WATCH_TIMEOUT) -> None:
+    """Enables the informer cache of this cluster.
+
+    Once enabled, the list, find and get methods of this cluster return
+    objects that read from a cache of the cluster, instead of querying the
+    API server on every call. The cache lists the objects of the cluster once,
+    then keeps up to date by watching them.
+
+    Args:
+      watch_timeout (int): Optional. Server-side timeout (in seconds) of a
+          watch request. Default is 5 minutes.
+    """
+    if self._cache is None:
+      self._cache = informer.K8sClusterInformer(
+          self._api_client, watch_timeout=watch_timeout)
+      self._cache.Start()
+
+  def DisableCache(self) -> None:
+    """Disables the informer cache of this cluster, stopping its watches."""
+    if self._cache is not None:
+      self._cache.Stop()
+      self._cache = None
+
   def ListPods(self, namespace: Optional[str] = None) -> List[base.K8sPod]:
     """Lists the pods in this cluster.
 
@@ -54,15 +81,18 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       List[base.K8sPod]: The list of pods.
     """
+    if self._cache:
+      return list(self._cache.ListPods(namespace=namespace))
     api = self._Api(client.CoreV1Api)
     if namespace is not None:
-      pods = api.list_namespaced_pod(namespace)
+      pods = self._ListItems(api.list_namespaced_pod, namespace)
     else:
-      pods = api.list_pod_for_all_namespaces()
+      pods = self._ListItems(api.list_pod_for_all_namespaces)
     return [
         base.K8sPod(
-            self._api_client, pod.metadata.name, pod.metadata.namespace)
-        for pod in pods.items
+            self._api_client, pod.metadata.name, pod.metadata.namespace,
+            labels=pod.metadata.labels or {})
+        for pod in pods
     ]
 
   def ListDeployments(
@@ -76,16 +106,20 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       List[workloads.K8sDeployment]: The list of deployments.
     """
+    if self._cache:
+      return list(self._cache.ListDeployments(namespace=namespace))
     api = self._Api(client.AppsV1Api)
     if namespace is not None:
-      deployments = api.list_namespaced_deployment(namespace)
+      deployments = self._ListItems(
+          api.list_namespaced_deployment, namespace)
     else:
-      deployments = api.list_deployment_for_all_namespaces()
+      deployments = self._ListItems(
+          api.list_deployment_for_all_namespaces)
     return [
         workloads.K8sDeployment(
             self._api_client,
             deployment.metadata.name,
-            deployment.metadata.namespace) for deployment in deployments.items
+            deployment.metadata.namespace) for deployment in deployments
     ]
 
   def ListReplicaSets(
@@ -99,17 +133,21 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       List[workloads.K8sReplicaSet]: The list of replica sets.
     """
+    if self._cache:
+      return list(self._cache.ListReplicaSets(namespace=namespace))
     api = self._Api(client.AppsV1Api)
     if namespace is not None:
-      replica_sets = api.list_namespaced_replica_set(namespace)
+      replica_sets = self._ListItems(
+          api.list_namespaced_replica_set, namespace)
     else:
-      replica_sets = api.list_replica_set_for_all_namespaces()
+      replica_sets = self._ListItems(
+          api.list_replica_set_for_all_namespaces)
     return [
         workloads.K8sReplicaSet(
             self._api_client,
             replica_set.metadata.name,
             replica_set.metadata.namespace)
-        for replica_set in replica_sets.items
+        for replica_set in replica_sets
     ]
 
   def ListNodes(self) -> List[base.K8sNode]:
@@ -118,15 +156,17 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       List[base.K8sNode]: The list of nodes in this cluster.
     """
+    if self._cache:
+      return list(self._cache.ListNodes())
     api = self._Api(client.CoreV1Api)
 
     # Collect pods
-    nodes = api.list_node()
+    nodes = self._ListItems(api.list_node)
 
     # Convert to node objects
     return [
         base.K8sNode(self._api_client, node.metadata.name)
-        for node in nodes.items
+        for node in nodes
     ]
 
   def ListNetworkPolicies(
@@ -141,15 +181,19 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       List[netpol.K8sNetworkPolicy]: The list of network policies.
     """
+    if self._cache:
+      return list(self._cache.ListNetworkPolicies(namespace=namespace))
     api = self._Api(client.NetworkingV1Api)
     if namespace is not None:
-      policies = api.list_namespaced_network_policy(namespace)
+      policies = self._ListItems(
+          api.list_namespaced_network_policy, namespace)
     else:
-      policies = api.list_network_policy_for_all_namespaces()
+      policies = self._ListItems(
+          api.list_network_policy_for_all_namespaces)
     return [
         netpol.K8sNetworkPolicy(
             self._api_client, policy.metadata.name, policy.metadata.namespace)
-        for policy in policies.items
+        for policy in policies
     ]
 
   def ListServices(
@@ -164,17 +208,106 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       The list of services.
     """
+    if self._cache:
+      return list(self._cache.ListServices(namespace=namespace))
     api = self._Api(client.CoreV1Api)
     if namespace is not None:
-      services_ = api.list_namespaced_service(namespace)
+      services_ = self._ListItems(api.list_namespaced_service, namespace)
     else:
-      services_ = api.list_service_for_all_namespaces()
+      services_ = self._ListItems(api.list_service_for_all_namespaces)
     return [
         services.K8sService(
             self._api_client, service.metadata.name, service.metadata.namespace)
-        for service in services_.items
+        for service in services_
     ]
 
+  def ListRecords(
+      self,
+      kind: str,
+      namespace: Optional[str] = None,
+      field_selector: Optional[str] = None,
+      label_selector: Optional[str] = None) -> Iterator[base.K8sObjectRecord]:
+    """Lists objects of this cluster as lightweight records.
+
+    Objects are listed in chunks, filtered server-side by the selectors, and
+    are not deserialized into API model objects. This is much faster, and
+    uses much less memory, than the other list methods on large clusters.
+    The informer cache is not used.
+
+    Example usage:
+    ```
+    running_pods = cluster.ListRecords(
+        snapshot.PODS, field_selector='status.phase=Running')
+    ```
+
+    Args:
+      kind (str): The kind of objects to list, one of the kinds of
+          snapshot.K8sClusterSnapshot, e.g. snapshot.PODS.
+      namespace (str): Optional. The namespace in which to list objects. If
+          unspecified, objects are listed in all namespaces. Ignored for
+          nodes.
+      field_selector (str): Optional. A field selector, e.g.
+          'spec.nodeName=NODE_NAME'.
+      label_selector (str): Optional. A label selector, e.g. 'app=web'.
+
+    Returns:
+      Iterator[base.K8sObjectRecord]: The records of the listed objects.
+
+    Raises:
+      ValueError: If the kind of objects is not supported.
+    """
+    core_api = self._Api(client.CoreV1Api)
+    apps_api = self._Api(client.AppsV1Api)
+    networking_api = self._Api(client.NetworkingV1Api)
+    list_functions = {
+        snapshot.NODES: (core_api.list_node, core_api.list_node),
+        snapshot.PODS: (
+            core_api.list_namespaced_pod,
+            core_api.list_pod_for_all_namespaces),
+        snapshot.DEPLOYMENTS: (
+            apps_api.list_namespaced_deployment,
+            apps_api.list_deployment_for_all_namespaces),
+        snapshot.REPLICA_SETS: (
+            apps_api.list_namespaced_replica_set,
+            apps_api.list_replica_set_for_all_namespaces),
+        snapshot.SERVICES: (
+            core_api.list_namespaced_service,
+            core_api.list_service_for_all_namespaces),
+        snapshot.NETWORK_POLICIES: (
+            networking_api.list_namespaced_network_policy,
+            networking_api.list_network_policy_for_all_namespaces),
+    }
+    if kind not in list_functions:
+      raise ValueError('Unsupported kind of objects: {0:s}'.format(kind))
+    namespaced_list, cluster_list = list_functions[kind]
+
+    selectors = {}  # type: Dict[str, Any]
+    if field_selector:
+      selectors['field_selector'] = field_selector
+    if label_selector:
+      selectors['label_selector'] = label_selector
+    if namespace is not None and kind != snapshot.NODES:
+      return self._ListRecords(namespaced_list, namespace, **selectors)
+    return self._ListRecords(cluster_list, **selectors)
+
+  def Snapshot(self) -> snapshot.K8sClusterSnapshot:
+    """Takes an in-memory snapshot of this cluster.
+
+    The snapshot lists the nodes, pods, deployments, replica sets, services
+    and network policies of the cluster once each. Objects returned by the
+    snapshot resolve their reads against it, which avoids one API call per
+    object when walking the whole cluster.
+
+    If the informer cache of this cluster is enabled, the cache is returned
+    instead, as it is an up to date snapshot of the cluster.
+
+    Returns:
+      snapshot.K8sClusterSnapshot: The snapshot of this cluster.
+    """
+    if self._cache:
+      return self._cache
+    return snapshot.K8sClusterSnapshot(self._api_client)
+
   def _AuthorizationCheck(self) -> None:
     """Checks the authorization of this cluster's API client.
 
@@ -203,6 +336,8 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       The cluster node if a node's name corresponds, None otherwise
     """
+    if self._cache:
+      return self._cache.FindNode(name)
     for node in self.ListNodes():
       if node.name == name:
         return node
@@ -220,6 +355,8 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
       A service in this cluster if its name and namespace corresponds, None
           otherwise.
     """
+    if self._cache:
+      return self._cache.FindService(name, namespace)
     for service in self.ListServices():
       if service.name == name and service.namespace == namespace:
         return service
@@ -257,6 +394,8 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
       base.K8sWorkload: Optional. A workload with the matching name and
           namespace.
     """
+    if self._cache:
+      return self._cache.FindWorkload(name, namespace)
     for workload in self.AllWorkloads(namespace=namespace):
       if workload.name == name and workload.namespace == namespace:
         return workload
@@ -273,6 +412,9 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       workloads.K8sDeployment: The matching Kubernetes deployment.
     """
+    if self._cache:
+      return snapshot.K8sSnapshotDeployment(
+          self._api_client, workload_id, namespace, self._cache)
     return workloads.K8sDeployment(self._api_client, workload_id, namespace)
 
   def GetService(self, service_id: str, namespace: str) -> services.K8sService:
@@ -285,6 +427,9 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       services.K8sService: The matching Kubernetes service.
     """
+    if self._cache:
+      return snapshot.K8sSnapshotService(
+          self._api_client, service_id, namespace, self._cache)
     return services.K8sService(self._api_client, service_id, namespace)
 
   def GetNode(self, node_name: str) -> base.K8sNode:
@@ -296,6 +441,8 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       base.K8sNode: The matching node object.
     """
+    if self._cache:
+      return snapshot.K8sSnapshotNode(self._api_client, node_name, self._cache)
     return base.K8sNode(self._api_client, node_name)
 
   def GetPod(self, pod_name: str, namespace: str) -> base.K8sPod:
@@ -308,6 +455,9 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       base.K8sPod: The matching pod object.
     """
+    if self._cache:
+      return snapshot.K8sSnapshotPod(
+          self._api_client, pod_name, namespace, self._cache)
     return base.K8sPod(self._api_client, pod_name, namespace)
 
   def GetReplicaSet(
@@ -321,6 +471,9 @@ class K8sCluster(base.K8sClient, metaclass=abc.ABCMeta):
     Returns:
       workloads.K8sReplicaSet: The matching replica set object.
     """
+    if self._cache:
+      return snapshot.K8sSnapshotReplicaSet(
+          self._api_client, replica_set_name, namespace, self._cache)
     return workloads.K8sReplicaSet(
         self._api_client, replica_set_name, namespace)
 
@@ -16,16 +16,19 @@
 
 import abc
 import itertools
+import json
 import logging
 from collections import defaultdict
-from typing import Any, Callable, Dict, Generic, Iterable, Optional, Tuple, \
-  TypeVar
+from concurrent import futures
+from typing import Any, Callable, Dict, Generic, IO, Iterable, Iterator, List, \
+  Optional, Tuple, TypeVar
 
 from libcloudforensics import logging_utils
 from libcloudforensics.providers.kubernetes import base
 from libcloudforensics.providers.kubernetes import cluster
 from libcloudforensics.providers.kubernetes import container
 from libcloudforensics.providers.kubernetes import services
+from libcloudforensics.providers.kubernetes import snapshot
 from libcloudforensics.providers.kubernetes import volume
 
 logging_utils.SetUpLogger(__name__)
@@ -33,6 +36,9 @@ logger = logging_utils.GetLogger(__name__)
 
 ObjT = TypeVar('ObjT')
 
+# Number of enumerations populated concurrently when streaming.
+DEFAULT_STREAM_WORKERS = 10
+
 KeyT = TypeVar('KeyT')
 ValT = TypeVar('ValT')
 
@@ -239,6 +245,97 @@ class Enumeration(Generic[ObjT], metaclass=abc.ABCMeta):
     info, warnings = self._GetInformationAndWarnings()
     return _SafeMerge(info, warnings, children_by_keyword)
 
+  def _Evaluate(
+      self, namespace: Optional[str]
+  ) -> Tuple[Dict[str, Any], List['Enumeration[Any]']]:
+    """Populates this enumeration and lists its children.
+
+    Args:
+      namespace (str): Optional. The namespace in which to list children.
+
+    Returns:
+      Tuple[Dict[str, Any], List[Enumeration[Any]]]: The merged information
+          and warnings of this enumeration, and its child enumerations.
+    """
+    info, warnings = self._GetInformationAndWarnings()
+    return _SafeMerge(info, warnings), list(self._Children(namespace=namespace))
+
+  def Stream(
+      self,
+      namespace: Optional[str] = None,
+      max_workers: int = DEFAULT_STREAM_WORKERS) -> Iterator[Dict[str, Any]]:
+    """Enumerates the object and its children, yielding one record per object.
+
+    Enumerations are populated concurrently by a pool of workers, and each
+    record is yielded as soon as it is available, so that the whole tree is
+    never held in memory. Records are flat: instead of nesting children, each
+    record holds its own 'Id' and the 'ParentId' of its parent's record (None
+    for this enumeration), as well as the 'Kind' of object (the keyword).
+
+    The subtree of an object is evaluated before its siblings, which bounds
+    the number of enumerations waiting to be evaluated.
+
+    Args:
+      namespace (str): Optional. The namespace in which to enumerate. If
+          unspecified (None), enumerates in all namespaces.
+      max_workers (int): Optional. The number of enumerations populated
+          concurrently. Default is 10.
+
+    Yields:
+      Dict[str, Any]: The record of each enumerated object, in the order in
+          which they are evaluated.
+    """
+    # Enumerations waiting to be evaluated, as (enumeration, id, parent id)
+    pending = [(self, 0, None)]  # type: List[Tuple[Enumeration[Any], int, Optional[int]]]  # pylint: disable=line-too-long
+    next_id = 1
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+      running = {}  # type: Dict[futures.Future[Any], Tuple[Enumeration[Any], int, Optional[int]]]  # pylint: disable=line-too-long
+      while pending or running:
+        while pending and len(running) < max_workers:
+          enumeration, record_id, parent_id = pending.pop()
+          future = executor.submit(enumeration._Evaluate, namespace)  # pylint: disable=protected-access
+          running[future] = (enumeration, record_id, parent_id)
+        done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+        for future in done:
+          enumeration, record_id, parent_id = running.pop(future)
+          fields, children = future.result()
+          record = {
+              'Id': record_id,
+              'ParentId': parent_id,
+              'Kind': enumeration.keyword,
+          }  # type: Dict[str, Any]
+          yield _SafeMerge(record, fields)
+          # Children are pushed in reverse to be evaluated in order
+          for child in reversed(children):
+            pending.append((child, next_id, record_id))
+            next_id += 1
+
+  def WriteNdjson(
+      self,
+      output: IO[str],
+      namespace: Optional[str] = None,
+      max_workers: int = DEFAULT_STREAM_WORKERS) -> int:
+    """Streams the enumeration to a file as newline-delimited JSON.
+
+    See Stream for the format of the records.
+
+    Args:
+      output (IO[str]): The file to write the records to, e.g. sys.stdout.
+      namespace (str): Optional. The namespace in which to enumerate. If
+          unspecified (None), enumerates in all namespaces.
+      max_workers (int): Optional. The number of enumerations populated
+          concurrently. Default is 10.
+
+    Returns:
+      int: The number of records written.
+    """
+    count = 0
+    for record in self.Stream(namespace=namespace, max_workers=max_workers):
+      output.write(json.dumps(record, default=str) + '\n')
+      output.flush()
+      count += 1
+    return count
+
   def _GetInformationAndWarnings(
       self,
       filter_empty: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
@@ -352,7 +449,25 @@ class NodeEnumeration(Enumeration[base.K8sNode]):
 
 
 class ClusterEnumeration(Enumeration[cluster.K8sCluster]):
-  """Enumeration for a Kubernetes cluster."""
+  """Enumeration for a Kubernetes cluster.
+
+  The cluster is enumerated from a snapshot, taken the first time the
+  children of this enumeration are listed, so that the nodes and pods below
+  it do not each query the API server.
+
+  The children are the nodes (holding the pods), followed by the workloads
+  and services. As their pods are already enumerated under the nodes, the
+  workloads and services only list the names of their pods.
+  """
+
+  def __init__(self, underlying_object: cluster.K8sCluster) -> None:
+    """Builds a ClusterEnumeration object.
+
+    Args:
+      underlying_object (cluster.K8sCluster): The cluster to enumerate.
+    """
+    super().__init__(underlying_object)
+    self._snapshot = None  # type: Optional[snapshot.K8sClusterSnapshot]
 
   @property
   def keyword(self) -> str:
@@ -362,13 +477,39 @@ class ClusterEnumeration(Enumeration[cluster.K8sCluster]):
   def _Children(self,
                 namespace: Optional[str] = None) -> Iterable[Enumeration[Any]]:
     """Method override."""
-    for node in self._object.ListNodes():
+    if self._snapshot is None:
+      self._snapshot = self._object.Snapshot()
+    for node in self._snapshot.ListNodes():
       yield NodeEnumeration(node)
+    for deployment in self._snapshot.ListDeployments(namespace=namespace):
+      yield WorkloadEnumeration(deployment, list_pods=False)
+    for replica_set in self._snapshot.ListReplicaSets(namespace=namespace):
+      # Replica sets managed by a deployment are part of that workload
+      owners = replica_set.Read().metadata.owner_references or []
+      if not any(owner.kind == 'Deployment' for owner in owners):
+        yield WorkloadEnumeration(replica_set, list_pods=False)
+    for service in self._snapshot.ListServices(namespace=namespace):
+      yield ServiceEnumeration(service, list_pods=False)
 
 
 class WorkloadEnumeration(Enumeration[base.K8sWorkload]):
   """Enumeration of a Kubernetes workload."""
 
+  def __init__(
+      self,
+      underlying_object: base.K8sWorkload,
+      list_pods: bool = True) -> None:
+    """Builds a WorkloadEnumeration object.
+
+    Args:
+      underlying_object (base.K8sWorkload): The workload to enumerate.
+      list_pods (bool): Optional. If True, the pods of the workload are
+          enumerated as its children. If False, only their names are
+          listed. Defaults to True.
+    """
+    super().__init__(underlying_object)
+    self._list_pods = list_pods
+
   @property
   def keyword(self) -> str:
     """Override of abstract property."""
@@ -377,6 +518,8 @@ class WorkloadEnumeration(Enumeration[base.K8sWorkload]):
   def _Children(self,
                 namespace: Optional[str] = None) -> Iterable[Enumeration[Any]]:
     """Method override."""
+    if not self._list_pods:
+      return []
     return map(PodsEnumeration, self._object.GetCoveredPods())
 
   def _Populate(self, info: Dict[str, Any], warnings: Dict[str, Any]) -> None:
@@ -385,11 +528,28 @@ class WorkloadEnumeration(Enumeration[base.K8sWorkload]):
         'Name': self._object.name,
         'Namespace': self._object.namespace,
     })
+    if not self._list_pods:
+      info['Pods'] = [pod.name for pod in self._object.GetCoveredPods()]
 
 
 class ServiceEnumeration(Enumeration[services.K8sService]):
   """Enumeration for a Kubernetes service."""
 
+  def __init__(
+      self,
+      underlying_object: services.K8sService,
+      list_pods: bool = True) -> None:
+    """Builds a ServiceEnumeration object.
+
+    Args:
+      underlying_object (services.K8sService): The service to enumerate.
+      list_pods (bool): Optional. If True, the pods of the service are
+          enumerated as its children. If False, only their names are
+          listed. Defaults to True.
+    """
+    super().__init__(underlying_object)
+    self._list_pods = list_pods
+
   @property
   def keyword(self) -> str:
     """Override of abstract property."""
@@ -398,6 +558,8 @@ class ServiceEnumeration(Enumeration[services.K8sService]):
   def _Children(self,
                 namespace: Optional[str] = None) -> Iterable[Enumeration[Any]]:
     """Method override."""
+    if not self._list_pods:
+      return []
     return map(PodsEnumeration, self._object.GetCoveredPods())
 
   def _Populate(self, info: Dict[str, Any], warnings: Dict[str, Any]) -> None:
@@ -406,6 +568,8 @@ class ServiceEnumeration(Enumeration[services.K8sService]):
         'Name': self._object.name,
         'Namespace': self._object.namespace,
     })
+    if not self._list_pods:
+      info['Pods'] = [pod.name for pod in self._object.GetCoveredPods()]
     (warnings if self._object.Type() == 'LoadBalancer' else
      info)['Type'] = self._object.Type()
     info['ExternalIPs'] = self._object.ExternalIps()
@@ -13,11 +13,29 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """GCP Enumeration classes."""
-from typing import Any, Dict, Iterable, Optional
+import queue
+import threading
+import time
+from concurrent import futures
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from libcloudforensics import errors
+from libcloudforensics import logging_utils
 from libcloudforensics.providers.gcp.internal import gke
 from libcloudforensics.providers.kubernetes.enumerations import base
 
+logging_utils.SetUpLogger(__name__)
+logger = logging_utils.GetLogger(__name__)
+
+# Number of clusters enumerated concurrently in a fleet enumeration.
+DEFAULT_FLEET_WORKERS = 8
+# Time (in seconds) after which the enumeration of a cluster is abandoned.
+DEFAULT_CLUSTER_TIMEOUT = 600
+# Maximum number of records of a fleet enumeration waiting to be yielded.
+FLEET_QUEUE_SIZE = 1000
+# Time (in seconds) between checks of the cluster deadlines of a fleet.
+FLEET_POLL_INTERVAL = 1
+
 
 class GkeClusterEnumeration(base.Enumeration[gke.GkeCluster]):
   """Enumeration class for a GKE cluster."""
@@ -45,3 +63,221 @@ class GkeClusterEnumeration(base.Enumeration[gke.GkeCluster]):
       info['LegacyEndpoints'] = 'Disabled'
     else:
       warnings['LegacyEndpoints'] = 'Enabled'
+
+
+class GkeFleetEnumeration:
+  """Enumeration of all the GKE clusters of one or more projects.
+
+  Clusters are discovered through the GKE API, then enumerated concurrently.
+  The records of all clusters are merged into a single stream as they are
+  produced, in which each record is tagged with the 'Project', 'Location'
+  and 'Cluster' it belongs to.
+  See base.Enumeration.Stream for the format of the records of a cluster.
+
+  Attributes:
+    project_ids (List[str]): The GCP projects in which to enumerate clusters.
+    location (str): The region/zone in which to enumerate clusters, or '-'
+        for all locations.
+    max_workers (int): The number of clusters enumerated concurrently.
+    cluster_timeout (int): The time (in seconds) after which the enumeration
+        of a cluster is abandoned.
+  """
+
+  def __init__(
+      self,
+      project_ids: List[str],
+      location: str = '-',
+      max_workers: int = DEFAULT_FLEET_WORKERS,
+      cluster_timeout: int = DEFAULT_CLUSTER_TIMEOUT) -> None:
+    """Builds a GkeFleetEnumeration.
+
+    Args:
+      project_ids (List[str]): The GCP projects in which to enumerate
+          clusters.
+      location (str): Optional. The region/zone in which to enumerate
+          clusters. Default is '-', which enumerates all locations.
+      max_workers (int): Optional. The number of clusters enumerated
+          concurrently. Default is 8.
+      cluster_timeout (int): Optional. The time (in seconds) after which the
+          enumeration of a cluster is abandoned. Default is 10 minutes.
+    """
+    self.project_ids = project_ids
+    self.location = location
+    self.max_workers = max_workers
+    self.cluster_timeout = cluster_timeout
+
+  def ListClusters(self) -> List[Tuple[str, str, str]]:
+    """Lists the clusters of the fleet.
+
+    Projects in which clusters cannot be listed are logged and skipped.
+
+    Returns:
+      List[Tuple[str, str, str]]: The project, location and name of each
+          cluster.
+    """
+    engine = gke.GoogleKubernetesEngine()
+    clusters = []  # type: List[Tuple[str, str, str]]
+    for project_id in self.project_ids:
+      try:
+        project_clusters = engine.ListClusters(project_id, self.location)
+      except errors.ResourceNotFoundError as exception:
+        logger.warning(str(exception))
+        continue
+      clusters.extend(
+          (project_id, cluster['location'], cluster['name'])
+          for cluster in project_clusters)
+    return clusters
+
+  def _EnumerateCluster(
+      self,
+      cluster_key: Tuple[str, str, str],
+      namespace: Optional[str],
+      records: 'queue.Queue[Tuple[Tuple[str, str, str], Optional[Dict[str, Any]]]]',  # pylint: disable=line-too-long
+      abandoned: Set[Tuple[str, str, str]],
+      stop: threading.Event) -> None:
+    """Enumerates one cluster of the fleet, putting its records in a queue.
+
+    Clusters that fail end with an 'Error' record, so that the result set
+    tells which clusters are incomplete. The cluster's records are followed
+    by None, which marks the end of the cluster.
+
+    Args:
+      cluster_key (Tuple[str, str, str]): The project, location and name of
+          the cluster.
+      namespace (str): Optional. The namespace in which to enumerate.
+      records (queue.Queue): The queue of the records of the fleet, as
+          (cluster_key, record) pairs.
+      abandoned (Set[Tuple[str, str, str]]): The clusters whose enumeration
+          timed out. Their remaining records are not enumerated.
+      stop (threading.Event): Set when the stream of the fleet is closed.
+    """
+
+    def Put(record: Optional[Dict[str, Any]]) -> bool:
+      """Queues a record, returning False if the cluster is abandoned."""
+      while not stop.is_set() and cluster_key not in abandoned:
+        try:
+          records.put((cluster_key, record), timeout=FLEET_POLL_INTERVAL)
+          return True
+        except queue.Full:
+          continue
+      return False
+
+    project_id, location, cluster_id = cluster_key
+    tags = {'Project': project_id, 'Location': location, 'Cluster': cluster_id}
+    try:
+      cluster = gke.GkeCluster(project_id, location, cluster_id)
+      # Returning out of the loop releases the stream, which closes it and
+      # stops its workers
+      for record in GkeClusterEnumeration(cluster).Stream(namespace=namespace):
+        if not Put(dict(record, **tags)):
+          return
+    except Exception as exception:  # pylint: disable=broad-except
+      # A failing cluster must not prevent enumerating the rest of the fleet
+      logger.warning('Could not enumerate cluster {0:s}: {1!s}'.format(
+          cluster_id, exception))
+      Put(self._ErrorRecord(cluster_key, str(exception)))
+    Put(None)
+
+  @staticmethod
+  def _ErrorRecord(
+      cluster_key: Tuple[str, str, str], error: str) -> Dict[str, Any]:
+    """Builds the record ending the enumeration of a cluster in error.
+
+    Args:
+      cluster_key (Tuple[str, str, str]): The project, location and name of
+          the cluster.
+      error (str): The error that stopped the enumeration.
+
+    Returns:
+      Dict[str, Any]: The tagged error record.
+    """
+    project_id, location, cluster_id = cluster_key
+    return {
+        'Project': project_id, 'Location': location, 'Cluster': cluster_id,
+        'Id': None, 'ParentId': None, 'Kind': 'Error', 'Error': error}
+
+  def Stream(self, namespace: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Enumerates the clusters of the fleet, yielding one record per object.
+
+    Records are yielded as soon as they are produced, interleaving the
+    records of the clusters enumerated concurrently. Record ids are only
+    unique within a cluster.
+
+    The enumeration of a cluster is abandoned once it runs for longer than
+    cluster_timeout, even if it is blocked on an API call: an 'Error' record
+    is yielded for it, and the rest of the fleet is enumerated meanwhile.
+
+    Args:
+      namespace (str): Optional. The namespace in which to enumerate. If
+          unspecified (None), enumerates in all namespaces.
+
+    Yields:
+      Dict[str, Any]: The tagged record of each enumerated object.
+    """
+    clusters = self.ListClusters()
+    logger.info('Enumerating {0:d} clusters'.format(len(clusters)))
+    records = queue.Queue(maxsize=FLEET_QUEUE_SIZE)  # type: queue.Queue[Tuple[Tuple[str, str, str], Optional[Dict[str, Any]]]]  # pylint: disable=line-too-long
+    abandoned = set()  # type: Set[Tuple[str, str, str]]
+    stop = threading.Event()
+    started = {}  # type: Dict[Tuple[str, str, str], float]
+
+    def EnumerateCluster(cluster_key: Tuple[str, str, str]) -> None:
+      started[cluster_key] = time.monotonic()
+      self._EnumerateCluster(
+          cluster_key, namespace, records, abandoned, stop)
+
+    unfinished = set(clusters)
+    executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+    try:
+      for cluster_key in clusters:
+        executor.submit(EnumerateCluster, cluster_key)
+      while unfinished:
+        try:
+          cluster_key, record = records.get(timeout=FLEET_POLL_INTERVAL)
+        except queue.Empty:
+          pass
+        else:
+          if cluster_key in unfinished:
+            if record is None:
+              unfinished.discard(cluster_key)
+            else:
+              yield record
+        now = time.monotonic()
+        for cluster_key in list(unfinished):
+          if now - started.get(cluster_key, now) > self.cluster_timeout:
+            logger.warning('Enumeration of cluster {0:s} timed out'.format(
+                cluster_key[2]))
+            abandoned.add(cluster_key)
+            unfinished.discard(cluster_key)
+            yield self._ErrorRecord(
+                cluster_key, 'Enumeration timed out after {0:d}s'.format(
+                    self.cluster_timeout))
+    finally:
+      # Workers blocked on an API call are not waited for
+      stop.set()
+      executor.shutdown(wait=False, cancel_futures=True)
+
+  def Search(
+      self,
+      kind: Optional[str] = None,
+      name: Optional[str] = None,
+      namespace: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Enumerates the fleet, yielding the records matching the criteria.
+
+    Error records are always yielded, since the object searched for may be
+    in one of the clusters that could not be enumerated.
+
+    Args:
+      kind (str): Optional. The kind of objects to search for, e.g. 'Pod'.
+      name (str): Optional. The name of the objects to search for.
+      namespace (str): Optional. The namespace in which to search. If
+          unspecified (None), searches in all namespaces.
+
+    Yields:
+      Dict[str, Any]: The tagged records of the matching objects.
+    """
+    for record in self.Stream(namespace=namespace):
+      if record['Kind'] == 'Error' or (
+          (kind is None or record['Kind'] == kind) and
+          (name is None or record.get('Name') == name)):
+        yield record
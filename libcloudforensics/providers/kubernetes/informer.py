@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Informer-style cache of a Kubernetes cluster, kept up to date by watches."""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from kubernetes import client
+from kubernetes import watch
+
+from libcloudforensics import logging_utils
+from libcloudforensics.providers.kubernetes import snapshot
+
+logging_utils.SetUpLogger(__name__)
+logger = logging_utils.GetLogger(__name__)
+
+# Server-side timeout (in seconds) of a single watch request. Watches are
+# restarted from the last seen resource version when they time out.
+WATCH_TIMEOUT = 300
+# Time (in seconds) to wait before restarting a watch that failed.
+WATCH_RETRY_DELAY = 5
+# HTTP status returned when a watched resource version is too old.
+HTTP_STATUS_GONE = 410
+
+
+class K8sClusterInformer(snapshot.K8sClusterSnapshot):
+  """Snapshot of a cluster that is kept up to date by watching the API.
+
+  The objects are listed once, then one watch per kind of object is started
+  from the resource version of the list. Added, modified and deleted objects
+  are applied to the snapshot as the events come in. If the resource version
+  expired, the objects of that kind are listed again.
+
+  Attributes:
+    watch_timeout (int): Server-side timeout (in seconds) of a watch request.
+  """
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      watch_timeout: int = WATCH_TIMEOUT) -> None:
+    """Creates an informer, listing the objects of the cluster.
+
+    The watches are only started when calling Start.
+
+    Args:
+      api_client (client.ApiClient): The API client to the Kubernetes cluster.
+      watch_timeout (int): Optional. Server-side timeout (in seconds) of a
+          watch request. Default is 5 minutes.
+    """
+    self.watch_timeout = watch_timeout
+    self._resource_versions = {}  # type: Dict[str, str]
+    self._stop_event = threading.Event()
+    self._watches = {}  # type: Dict[str, watch.Watch]
+    self._threads = []  # type: List[threading.Thread]
+    super().__init__(api_client)
+
+  def _List(self, kind: str, list_function: Callable[..., Any]) -> str:
+    """Override of K8sClusterSnapshot._List, recording the resource version."""
+    resource_version = super()._List(kind, list_function)
+    self._resource_versions[kind] = resource_version
+    return resource_version
+
+  def Start(self) -> None:
+    """Starts watching the objects of the cluster in background threads."""
+    if self._threads:
+      return
+    # Each start gets its own stop event: threads of a previous start that
+    # are still blocked in a watch request exit without applying events,
+    # rather than running next to the new ones.
+    self._stop_event = threading.Event()
+    for kind, list_function in self._ListFunctions().items():
+      thread = threading.Thread(
+          target=self._Watch,
+          args=(kind, list_function, self._stop_event),
+          name='informer-{0:s}'.format(kind),
+          daemon=True)
+      thread.start()
+      self._threads.append(thread)
+
+  def Stop(self) -> None:
+    """Stops watching the objects of the cluster.
+
+    The watch threads exit after their current request returns, at the latest
+    after watch_timeout seconds, and apply no event in the meantime. They are
+    daemon threads, so they do not keep the process alive.
+    """
+    self._stop_event.set()
+    with self._lock:
+      for kind_watch in self._watches.values():
+        kind_watch.stop()
+    self._threads = []
+
+  def _Watch(
+      self,
+      kind: str,
+      list_function: Callable[..., Any],
+      stop_event: Optional[threading.Event] = None) -> None:
+    """Watches the objects of a kind until the informer is stopped.
+
+    Args:
+      kind (str): The kind of the objects.
+      list_function (Callable[..., Any]): The API function listing the
+          objects of that kind in all namespaces.
+      stop_event (threading.Event): Optional. The event stopping the watch.
+          Default is the stop event of the informer.
+    """
+    stop_event = stop_event or self._stop_event
+    while not stop_event.is_set():
+      kind_watch = watch.Watch()
+      with self._lock:
+        if stop_event.is_set():
+          break
+        self._watches[kind] = kind_watch
+      try:
+        for event in kind_watch.stream(
+            list_function,
+            resource_version=self._resource_versions[kind],
+            timeout_seconds=self.watch_timeout,
+            allow_watch_bookmarks=True):
+          if stop_event.is_set():
+            kind_watch.stop()
+            break
+          self._ApplyEvent(kind, event)
+      except client.ApiException as exception:
+        if exception.status != HTTP_STATUS_GONE:
+          logger.warning('Watch on {0:s} failed, retrying: {1!s}'.format(
+              kind, exception))
+          stop_event.wait(WATCH_RETRY_DELAY)
+          continue
+        logger.debug('Resource version of {0:s} expired, listing them '
+                     'again'.format(kind))
+        try:
+          self._List(kind, list_function)
+        except client.ApiException as list_exception:
+          logger.warning('Listing {0:s} failed, retrying: {1!s}'.format(
+              kind, list_exception))
+          stop_event.wait(WATCH_RETRY_DELAY)
+      except Exception as exception:  # pylint: disable=broad-except
+        # Connection errors (e.g. the watch being reset by the server) must
+        # not end the thread, or the cache would silently become stale.
+        logger.warning('Watch on {0:s} failed, retrying: {1!s}'.format(
+            kind, exception))
+        stop_event.wait(WATCH_RETRY_DELAY)
+
+  def _ApplyEvent(self, kind: str, event: Dict[str, Any]) -> None:
+    """Applies a watch event to the snapshot.
+
+    Args:
+      kind (str): The kind of the watched objects.
+      event (Dict[str, Any]): The watch event, as returned by
+          watch.Watch.stream.
+    """
+    if event['type'] == 'BOOKMARK':
+      # Bookmarks are not deserialized, and only carry a resource version
+      self._resource_versions[kind] = str(
+          event['raw_object']['metadata']['resourceVersion'])
+      return
+
+    item = event['object']
+    with self._lock:
+      if event['type'] == 'DELETED':
+        self._Remove(kind, (item.metadata.namespace, item.metadata.name))
+      else:
+        self._Put(kind, item)
+      self._resource_versions[kind] = str(item.metadata.resource_version)
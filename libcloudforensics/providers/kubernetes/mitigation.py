@@ -13,7 +13,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Mitigation functions to be used in end-to-end functionality."""
-from typing import List, Optional
+from concurrent import futures
+from typing import Callable, Dict, List, Optional
+
+from kubernetes import client
 
 from libcloudforensics import errors
 from libcloudforensics import logging_utils
@@ -21,37 +24,106 @@ from libcloudforensics import prompts
 from libcloudforensics.providers.kubernetes import base
 from libcloudforensics.providers.kubernetes import cluster as k8s
 from libcloudforensics.providers.kubernetes import netpol
+from libcloudforensics.providers.kubernetes import selector
+from libcloudforensics.providers.kubernetes import workloads
 
 logging_utils.SetUpLogger(__name__)
 logger = logging_utils.GetLogger(__name__)
 
 
 def DrainWorkloadNodesFromOtherPods(
-    workload: base.K8sWorkload, cordon: bool = True) -> None:
+    workload: base.K8sWorkload,
+    cordon: bool = True,
+    evict: bool = True,
+    max_workers: int = base.DEFAULT_DRAIN_WORKERS) -> Dict[str, str]:
   """Drains a workload's nodes from non-workload pods.
 
+  The nodes are cordoned and listed concurrently, then the pods of all nodes
+  are removed through a single pool of workers. Whether a listed pod belongs
+  to the workload is decided from the labels it had when listed, so that
+  pods created by the workload in the meantime are not removed.
+
   Args:
     workload (base.K8sWorkload): The workload for which nodes
         must be drained from pods that are not covered by the workload.
     cordon (bool): Optional. Whether or not to cordon the nodes before draining,
         to prevent pods from appearing on the nodes again as it will be marked
         as unschedulable. Defaults to True.
+    evict (bool): Optional. If True, pods are removed through the Eviction
+        API, which respects PodDisruptionBudgets. If False, pods are deleted,
+        as K8sNode.Drain does by default. Defaults to True: pods whose
+        eviction stays blocked by a budget are reported as
+        base.POD_EVICTION_BLOCKED instead of being deleted.
+    max_workers (int): Optional. The number of nodes and pods handled
+        concurrently. Default is 10.
+
+  Returns:
+    Dict[str, str]: The outcome of the removal of each pod (e.g.
+        base.POD_EVICTED), keyed by 'namespace/name'.
   """
   nodes = workload.GetCoveredNodes()
-  if cordon:
-    for node in nodes:
-      node.Cordon()
-  for node in nodes:
-    node.Drain(lambda pod: not workload.IsCoveringPod(pod))
+  if not nodes:
+    return {}
+
+  with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    if cordon:
+      list(executor.map(lambda node: node.Cordon(), nodes))
+    is_covered = _CoveredPodPredicate(workload)
+    pods_by_node = list(executor.map(
+        lambda node: node.ListPods(
+            object_filter=lambda pod: not is_covered(pod)),
+        nodes))
+
+  results = base.DrainPods(
+      [pod for pods in pods_by_node for pod in pods],
+      evict=evict,
+      max_workers=max_workers)
+  not_removed = [
+      pod_id for pod_id, result in results.items()
+      if result not in (base.POD_EVICTED, base.POD_DELETED)
+  ]
+  if not_removed:
+    logger.warning('Pods not removed from the workload nodes: {0:s}'.format(
+        ', '.join(sorted(not_removed))))
+  return results
+
+
+def _CoveredPodPredicate(
+    workload: base.K8sWorkload) -> Callable[[client.V1Pod], bool]:
+  """Builds a predicate telling whether a pod object belongs to a workload.
+
+  The label selector of the workload is read once, rather than checking each
+  pod against the workload through the API.
+
+  Args:
+    workload (base.K8sWorkload): The workload.
+
+  Returns:
+    Callable[[client.V1Pod], bool]: A predicate returning True for the pods
+        of the workload.
+  """
+  if not isinstance(workload, workloads.K8sControlledWorkload):
+    # A pod only covers itself.
+    return lambda pod: (
+        (pod.metadata.namespace, pod.metadata.name) ==
+        (workload.namespace, workload.name))
+  label_selector = workload.PodLabelSelector()
+  return lambda pod: (
+      pod.metadata.namespace == workload.namespace and
+      selector.MatchesLabelSelector(label_selector, pod.metadata.labels))
 
 
 def IsolatePodsWithNetworkPolicy(
     cluster: k8s.K8sCluster,
     pods: List[base.K8sPod],
-    existing_policies_prompt: bool = False
+    existing_policies_prompt: bool = False,
+    max_workers: int = base.DEFAULT_LABEL_WORKERS
 ) -> Optional[netpol.K8sTargetedDenyAllNetworkPolicy]:
   """Isolates pods via a deny-all NetworkPolicy.
 
+  The pods are labelled concurrently with the selecting label of the policy,
+  which is only created once all pods carry the label.
+
   Args:
     cluster (k8s.K8sCluster): The cluster in which to create the deny-all
         policy.
@@ -60,6 +132,8 @@ def IsolatePodsWithNetworkPolicy(
     existing_policies_prompt (bool): Optional. If True, the user will be
         prompted with options to patch, delete or leave the existing network
         policies. Defaults to False.
+    max_workers (int): Optional. The number of pods labelled concurrently.
+        Default is 10.
 
   Returns:
     netpol.K8sTargetedDenyAllNetworkPolicy: Optional. The deny-all network
@@ -68,7 +142,8 @@ def IsolatePodsWithNetworkPolicy(
 
   Raises:
     ValueError: If the pods are not in the same namespace.
-    errors.OperationFailedError: If NetworkPolicy is not enabled in the cluster.
+    errors.OperationFailedError: If NetworkPolicy is not enabled in the
+        cluster, or if some pods could not be labelled.
   """
   if not pods:
     return None
@@ -116,9 +191,15 @@ def IsolatePodsWithNetworkPolicy(
     prompt_sequence.Run()
 
   # Tag the pods covered by the workload with the selecting label of the
-  # deny-all NetworkPolicy
-  for pod in pods:
-    pod.AddLabels(deny_all_policy.labels)
+  # deny-all NetworkPolicy. The policy is only created once every pod is
+  # confirmed to carry the label, so that no pod is silently left out.
+  unlabelled_pods = base.LabelPods(
+      pods, deny_all_policy.labels, max_workers=max_workers)
+  if unlabelled_pods:
+    raise errors.OperationFailedError(
+        'Could not label pods {0:s}, the deny-all NetworkPolicy was not '
+        'created.'.format(', '.join(pod.name for pod in unlabelled_pods)),
+        __name__)
 
   deny_all_policy.Create()
 
@@ -16,7 +16,12 @@
 
 import abc
 from collections import defaultdict
-from typing import Dict
+from typing import Dict, Generic, Iterable, List, Optional, Set, Tuple, \
+  TypeVar
+
+from kubernetes import client
+
+KeyT = TypeVar('KeyT')
 
 
 class K8sSelector:
@@ -86,6 +91,30 @@ class K8sSelector:
     def ToString(self) -> str:
       return '{0:s}={1:s}'.format(self._key, self._value)
 
+  class Expression(LabelComponent):
+    """Selector component for a label selector requirement (matchExpressions).
+
+    https://kubernetes.io/docs/concepts/overview/working-with-objects/labels/#set-based-requirement  # pylint: disable=line-too-long
+    """
+
+    def __init__(
+        self, key: str, operator: str, values: Optional[List[str]]) -> None:
+      self._key = key
+      self._operator = operator
+      self._values = values or []
+
+    def ToString(self) -> str:
+      if self._operator == 'In':
+        return '{0:s} in ({1:s})'.format(self._key, ','.join(self._values))
+      if self._operator == 'NotIn':
+        return '{0:s} notin ({1:s})'.format(self._key, ','.join(self._values))
+      if self._operator == 'Exists':
+        return self._key
+      if self._operator == 'DoesNotExist':
+        return '!{0:s}'.format(self._key)
+      raise ValueError(
+          'Unknown label selector operator: {0:s}'.format(self._operator))
+
   def __init__(self, *selectors: Component) -> None:
     self._selectors = selectors
 
@@ -113,3 +142,158 @@ class K8sSelector:
     """
     args = map(lambda k: K8sSelector.Label(k, labels[k]), labels)
     return cls(*args)
+
+  @classmethod
+  def FromLabelSelector(
+      cls, label_selector: client.V1LabelSelector) -> 'K8sSelector':
+    """Builds a selector from a label selector, including matchExpressions.
+
+    Args:
+      label_selector (client.V1LabelSelector): The label selector, e.g. the
+          spec.selector field of a workload.
+
+    Returns:
+      K8sSelector: The resulting selector object.
+    """
+    components = [
+        K8sSelector.Label(key, value)
+        for key, value in (label_selector.match_labels or {}).items()
+    ]  # type: List[K8sSelector.Component]
+    components.extend(
+        K8sSelector.Expression(
+            requirement.key, requirement.operator, requirement.values)
+        for requirement in label_selector.match_expressions or [])
+    return cls(*components)
+
+
+def MatchesLabelSelector(
+    label_selector: client.V1LabelSelector,
+    labels: Optional[Dict[str, str]]) -> bool:
+  """Determines whether labels are matched by a label selector.
+
+  Args:
+    label_selector (client.V1LabelSelector): The label selector.
+    labels (Dict[str, str]): Optional. The labels of an object, e.g. a pod.
+
+  Returns:
+    bool: True if all matchLabels and matchExpressions of the selector are
+        satisfied by the labels, False otherwise.
+
+  Raises:
+    ValueError: If an operator of the selector is unknown.
+  """
+  labels = labels or {}
+  if not (label_selector.match_labels or {}).items() <= labels.items():
+    return False
+  for requirement in label_selector.match_expressions or []:
+    values = requirement.values or []
+    if requirement.operator == 'In':
+      matches = labels.get(requirement.key) in values
+    elif requirement.operator == 'NotIn':
+      matches = labels.get(requirement.key) not in values
+    elif requirement.operator == 'Exists':
+      matches = requirement.key in labels
+    elif requirement.operator == 'DoesNotExist':
+      matches = requirement.key not in labels
+    else:
+      raise ValueError('Unknown label selector operator: {0:s}'.format(
+          requirement.operator))
+    if not matches:
+      return False
+  return True
+
+
+class LabelIndex(Generic[KeyT]):
+  """Inverted index of objects by label, to resolve label selectors.
+
+  Objects are indexed by each of their label key-value pairs and by each of
+  their label keys, so that a label selector is resolved with set operations
+  instead of checking the labels of every object.
+  """
+
+  def __init__(self) -> None:
+    """Creates an empty label index."""
+    self._by_label = defaultdict(set)  # type: Dict[Tuple[str, str], Set[KeyT]]
+    self._by_key = defaultdict(set)  # type: Dict[str, Set[KeyT]]
+    self._all = set()  # type: Set[KeyT]
+
+  def Add(self, key: KeyT, labels: Optional[Dict[str, str]]) -> None:
+    """Adds an object to the index.
+
+    Args:
+      key (KeyT): The key identifying the object.
+      labels (Dict[str, str]): Optional. The labels of the object.
+    """
+    self._all.add(key)
+    for label in (labels or {}).items():
+      self._by_label[label].add(key)
+      self._by_key[label[0]].add(key)
+
+  def Remove(self, key: KeyT, labels: Optional[Dict[str, str]]) -> None:
+    """Removes an object from the index.
+
+    Args:
+      key (KeyT): The key identifying the object.
+      labels (Dict[str, str]): Optional. The labels the object was added with.
+    """
+    self._all.discard(key)
+    for label in (labels or {}).items():
+      self._by_label[label].discard(key)
+      self._by_key[label[0]].discard(key)
+
+  def Clear(self) -> None:
+    """Removes all objects from the index."""
+    self._by_label.clear()
+    self._by_key.clear()
+    self._all.clear()
+
+  def _WithAnyValue(self, label_key: str, values: Iterable[str]) -> Set[KeyT]:
+    """Returns the objects having a label key with one of the given values.
+
+    Args:
+      label_key (str): The label key.
+      values (Iterable[str]): The label values.
+
+    Returns:
+      Set[KeyT]: The keys of the matching objects.
+    """
+    matching = set()  # type: Set[KeyT]
+    for value in values:
+      matching |= self._by_label.get((label_key, value), set())
+    return matching
+
+  def Select(
+      self,
+      label_selector: client.V1LabelSelector,
+      candidates: Optional[Set[KeyT]] = None) -> Set[KeyT]:
+    """Resolves a label selector against the index.
+
+    Args:
+      label_selector (client.V1LabelSelector): The label selector, including
+          matchLabels and matchExpressions.
+      candidates (Set[KeyT]): Optional. If specified, only select among these
+          objects. Defaults to all objects of the index.
+
+    Returns:
+      Set[KeyT]: The keys of the objects matched by the label selector.
+
+    Raises:
+      ValueError: If an operator of the selector is unknown.
+    """
+    selected = set(self._all if candidates is None else candidates)
+    for label in (label_selector.match_labels or {}).items():
+      selected &= self._by_label.get(label, set())
+    for requirement in label_selector.match_expressions or []:
+      values = requirement.values or []
+      if requirement.operator == 'In':
+        selected &= self._WithAnyValue(requirement.key, values)
+      elif requirement.operator == 'NotIn':
+        selected -= self._WithAnyValue(requirement.key, values)
+      elif requirement.operator == 'Exists':
+        selected &= self._by_key.get(requirement.key, set())
+      elif requirement.operator == 'DoesNotExist':
+        selected -= self._by_key.get(requirement.key, set())
+      else:
+        raise ValueError('Unknown label selector operator: {0:s}'.format(
+            requirement.operator))
+    return selected
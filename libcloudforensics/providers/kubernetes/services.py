@@ -63,7 +63,8 @@ class K8sService(base.K8sNamespacedResource):
         **selector.K8sSelector.FromLabelsDict(self.Labels()).ToKeywords())
     return [
         base.K8sPod(
-            self._api_client, pod.metadata.name, pod.metadata.namespace)
+            self._api_client, pod.metadata.name, pod.metadata.namespace,
+            labels=pod.metadata.labels or {})
         for pod in pods.items
     ]
 
@@ -0,0 +1,617 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""In-memory snapshot of a Kubernetes cluster.
+
+A snapshot lists the nodes, pods, deployments, replica sets, services and
+network policies of a cluster once each. The wrappers returned by a snapshot
+resolve their reads, and the relations between them (pods on a node, pods
+covered by a workload), against the snapshot instead of the API server.
+"""
+
+import itertools
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from kubernetes import client
+
+from libcloudforensics import errors
+from libcloudforensics import logging_utils
+from libcloudforensics.providers.kubernetes import base
+from libcloudforensics.providers.kubernetes import netpol
+from libcloudforensics.providers.kubernetes import selector
+from libcloudforensics.providers.kubernetes import services
+from libcloudforensics.providers.kubernetes import workloads
+
+logging_utils.SetUpLogger(__name__)
+logger = logging_utils.GetLogger(__name__)
+
+NODES = 'nodes'
+PODS = 'pods'
+DEPLOYMENTS = 'deployments'
+REPLICA_SETS = 'replicasets'
+SERVICES = 'services'
+NETWORK_POLICIES = 'networkpolicies'
+
+# Pod phases of pods that are no longer running, see the Running selector.
+TERMINATED_POD_PHASES = frozenset(['Failed', 'Succeeded'])
+
+ObjectKey = Tuple[Optional[str], str]
+
+
+class K8sClusterSnapshot(base.K8sClient):
+  """In-memory snapshot of the objects of a Kubernetes cluster.
+
+  Objects are indexed by kind, namespace and name. Pods are additionally
+  indexed by node and by label, so that listing the pods of a node or of a
+  workload does not require any API call.
+  """
+
+  def __init__(self, api_client: client.ApiClient) -> None:
+    """Creates a snapshot of the cluster the API client points to.
+
+    Args:
+      api_client (client.ApiClient): The API client to the Kubernetes cluster.
+    """
+    super().__init__(api_client)
+    self._objects = defaultdict(dict)  # type: Dict[str, Dict[ObjectKey, Any]]
+    self._pods_by_node = defaultdict(set)  # type: Dict[str, Set[ObjectKey]]
+    self._pods_by_namespace = defaultdict(set)  # type: Dict[Optional[str], Set[ObjectKey]]  # pylint: disable=line-too-long
+    self._pod_label_index = selector.LabelIndex()  # type: selector.LabelIndex[ObjectKey]  # pylint: disable=line-too-long
+    self._pod_positions = {}  # type: Dict[ObjectKey, int]
+    self._pod_counter = itertools.count()
+    self._lock = threading.RLock()
+    self.Refresh()
+
+  def _ListFunctions(self) -> Dict[str, Callable[..., Any]]:
+    """Returns the API list function for each kind of object.
+
+    Returns:
+      Dict[str, Callable[..., Any]]: The list functions, by kind of object.
+    """
+    core_api = self._Api(client.CoreV1Api)
+    apps_api = self._Api(client.AppsV1Api)
+    networking_api = self._Api(client.NetworkingV1Api)
+    return {
+        NODES: core_api.list_node,
+        PODS: core_api.list_pod_for_all_namespaces,
+        DEPLOYMENTS: apps_api.list_deployment_for_all_namespaces,
+        REPLICA_SETS: apps_api.list_replica_set_for_all_namespaces,
+        SERVICES: core_api.list_service_for_all_namespaces,
+        NETWORK_POLICIES: networking_api.list_network_policy_for_all_namespaces,
+    }
+
+  def Refresh(self) -> None:
+    """Lists all objects of the snapshot again and rebuilds the indexes."""
+    for kind, list_function in self._ListFunctions().items():
+      self._List(kind, list_function)
+    logger.debug('Snapshot of cluster taken: {0:s}'.format(', '.join(
+        '{0:d} {1:s}'.format(len(items), kind)
+        for kind, items in self._objects.items())))
+
+  def _List(self, kind: str, list_function: Callable[..., Any]) -> str:
+    """Lists all objects of a kind, replacing those held in the snapshot.
+
+    Args:
+      kind (str): The kind of the objects.
+      list_function (Callable[..., Any]): The API function listing the
+          objects of that kind in all namespaces.
+
+    Returns:
+      str: The resource version of the list, from which changes to the
+          objects can be watched. Empty if the API did not return one.
+    """
+    items = []  # type: List[Any]
+    resource_version = ''
+    # All chunks of a list are served at the resource version of the first
+    for page in self._ListPages(list_function):
+      items.extend(page.items)
+      if page.metadata and page.metadata.resource_version:
+        resource_version = str(page.metadata.resource_version)
+    with self._lock:
+      for key in list(self._objects[kind]):
+        self._Remove(kind, key)
+      for item in items:
+        self._Put(kind, item)
+    return resource_version
+
+  def _Put(self, kind: str, item: Any) -> None:
+    """Adds or replaces an object in the snapshot, updating the pod indexes.
+
+    Must be called with the snapshot's lock held.
+
+    Args:
+      kind (str): The kind of the object.
+      item (Any): The API response object.
+    """
+    key = (item.metadata.namespace, item.metadata.name)
+    if kind == PODS:
+      if key in self._objects[kind]:
+        self._Remove(kind, key)
+      self._pod_positions[key] = next(self._pod_counter)
+      if item.spec and item.spec.node_name:
+        self._pods_by_node[item.spec.node_name].add(key)
+      self._pods_by_namespace[key[0]].add(key)
+      self._pod_label_index.Add(key, item.metadata.labels)
+    self._objects[kind][key] = item
+
+  def _Remove(self, kind: str, key: ObjectKey) -> None:
+    """Removes an object from the snapshot, updating the pod indexes.
+
+    Must be called with the snapshot's lock held.
+
+    Args:
+      kind (str): The kind of the object.
+      key (ObjectKey): The (namespace, name) key of the object.
+    """
+    item = self._objects[kind].pop(key, None)
+    if kind != PODS or item is None:
+      return
+    self._pod_positions.pop(key, None)
+    if item.spec and item.spec.node_name:
+      self._pods_by_node[item.spec.node_name].discard(key)
+    self._pods_by_namespace[key[0]].discard(key)
+    self._pod_label_index.Remove(key, item.metadata.labels)
+
+  def Get(self, kind: str, name: str, namespace: Optional[str] = None) -> Any:
+    """Gets an object of the snapshot.
+
+    Args:
+      kind (str): The kind of the object, e.g. snapshot.PODS.
+      name (str): The name of the object.
+      namespace (str): Optional. The namespace of the object. Must be None
+          for cluster-scoped objects such as nodes.
+
+    Returns:
+      Any: The API response object, or None if it is not in the snapshot.
+    """
+    with self._lock:
+      return self._objects[kind].get((namespace, name))
+
+  def _Keys(self, kind: str, namespace: Optional[str]) -> Iterable[ObjectKey]:
+    """Returns the keys of the objects of a kind, possibly in a namespace.
+
+    Args:
+      kind (str): The kind of the objects.
+      namespace (str): Optional. The namespace of the objects. If None, keys
+          in all namespaces are returned.
+
+    Returns:
+      Iterable[ObjectKey]: The (namespace, name) keys of the objects.
+    """
+    with self._lock:
+      return [
+          key for key in self._objects[kind]
+          if namespace is None or key[0] == namespace
+      ]
+
+  def ListNodes(self) -> List['K8sSnapshotNode']:
+    """Lists the nodes of the snapshot.
+
+    Returns:
+      List[K8sSnapshotNode]: The nodes of the cluster.
+    """
+    return [
+        K8sSnapshotNode(self._api_client, name, self)
+        for _, name in self._Keys(NODES, None)
+    ]
+
+  def ListPods(
+      self,
+      namespace: Optional[str] = None,
+      node_name: Optional[str] = None,
+      labels: Optional[Dict[str, str]] = None,
+      label_selector: Optional[client.V1LabelSelector] = None,
+      running: bool = False) -> List['K8sSnapshotPod']:
+    """Lists the pods of the snapshot, using the node and label indexes.
+
+    Args:
+      namespace (str): Optional. The namespace of the pods. If not specified,
+          pods in all namespaces are listed.
+      node_name (str): Optional. Only list the pods on this node.
+      labels (Dict[str, str]): Optional. Only list the pods having all of
+          these labels.
+      label_selector (client.V1LabelSelector): Optional. Only list the pods
+          matched by this label selector, including its matchExpressions.
+      running (bool): Optional. Only list the pods that have not terminated.
+          Defaults to False.
+
+    Returns:
+      List[K8sSnapshotPod]: The matching pods, in the order they were listed
+          by the API server.
+    """
+    with self._lock:
+      if node_name is not None:
+        keys = set(self._pods_by_node.get(node_name, set()))
+        if namespace is not None:
+          keys &= self._pods_by_namespace.get(namespace, set())
+      elif namespace is not None:
+        keys = set(self._pods_by_namespace.get(namespace, set()))
+      else:
+        keys = set(self._objects[PODS])
+      if labels:
+        keys = self._pod_label_index.Select(
+            client.V1LabelSelector(match_labels=labels), candidates=keys)
+      if label_selector:
+        keys = self._pod_label_index.Select(label_selector, candidates=keys)
+      if running:
+        keys = {
+            key for key in keys
+            if not (self._objects[PODS][key].status and
+                    self._objects[PODS][key].status.phase in
+                    TERMINATED_POD_PHASES)
+        }
+      ordered_keys = sorted(keys, key=self._pod_positions.__getitem__)
+    return [
+        K8sSnapshotPod(self._api_client, name, str(pod_namespace), self)
+        for pod_namespace, name in ordered_keys
+    ]
+
+  def ListDeployments(
+      self, namespace: Optional[str] = None) -> List['K8sSnapshotDeployment']:
+    """Lists the deployments of the snapshot.
+
+    Args:
+      namespace (str): Optional. The namespace of the deployments. If not
+          specified, deployments in all namespaces are listed.
+
+    Returns:
+      List[K8sSnapshotDeployment]: The deployments.
+    """
+    return [
+        K8sSnapshotDeployment(self._api_client, name, str(key_namespace), self)
+        for key_namespace, name in self._Keys(DEPLOYMENTS, namespace)
+    ]
+
+  def ListReplicaSets(
+      self, namespace: Optional[str] = None) -> List['K8sSnapshotReplicaSet']:
+    """Lists the replica sets of the snapshot.
+
+    Args:
+      namespace (str): Optional. The namespace of the replica sets. If not
+          specified, replica sets in all namespaces are listed.
+
+    Returns:
+      List[K8sSnapshotReplicaSet]: The replica sets.
+    """
+    return [
+        K8sSnapshotReplicaSet(self._api_client, name, str(key_namespace), self)
+        for key_namespace, name in self._Keys(REPLICA_SETS, namespace)
+    ]
+
+  def ListServices(
+      self, namespace: Optional[str] = None) -> List['K8sSnapshotService']:
+    """Lists the services of the snapshot.
+
+    Args:
+      namespace (str): Optional. The namespace of the services. If not
+          specified, services in all namespaces are listed.
+
+    Returns:
+      List[K8sSnapshotService]: The services.
+    """
+    return [
+        K8sSnapshotService(self._api_client, name, str(key_namespace), self)
+        for key_namespace, name in self._Keys(SERVICES, namespace)
+    ]
+
+  def ListNetworkPolicies(
+      self,
+      namespace: Optional[str] = None) -> List['K8sSnapshotNetworkPolicy']:
+    """Lists the network policies of the snapshot.
+
+    Args:
+      namespace (str): Optional. The namespace of the network policies. If not
+          specified, network policies in all namespaces are listed.
+
+    Returns:
+      List[K8sSnapshotNetworkPolicy]: The network policies.
+    """
+    return [
+        K8sSnapshotNetworkPolicy(
+            self._api_client, name, str(key_namespace), self)
+        for key_namespace, name in self._Keys(NETWORK_POLICIES, namespace)
+    ]
+
+  def FindNode(self, name: str) -> Optional['K8sSnapshotNode']:
+    """Finds a node of the snapshot by its name.
+
+    Args:
+      name (str): The node name.
+
+    Returns:
+      K8sSnapshotNode: Optional. The node, or None if it is not in the
+          snapshot.
+    """
+    if self.Get(NODES, name) is None:
+      return None
+    return K8sSnapshotNode(self._api_client, name, self)
+
+  def FindService(
+      self, name: str, namespace: str) -> Optional['K8sSnapshotService']:
+    """Finds a service of the snapshot by its name and namespace.
+
+    Args:
+      name (str): The service name.
+      namespace (str): The service namespace.
+
+    Returns:
+      K8sSnapshotService: Optional. The service, or None if it is not in the
+          snapshot.
+    """
+    if self.Get(SERVICES, name, namespace) is None:
+      return None
+    return K8sSnapshotService(self._api_client, name, namespace, self)
+
+  def FindWorkload(
+      self, name: str, namespace: str) -> Optional[base.K8sWorkload]:
+    """Finds a workload of the snapshot by its name and namespace.
+
+    As in K8sCluster.FindWorkload, deployments are looked up first, then
+    replica sets and pods.
+
+    Args:
+      name (str): The name of the workload.
+      namespace (str): The namespace of the workload.
+
+    Returns:
+      base.K8sWorkload: Optional. The workload, or None if it is not in the
+          snapshot.
+    """
+    if self.Get(DEPLOYMENTS, name, namespace) is not None:
+      return K8sSnapshotDeployment(self._api_client, name, namespace, self)
+    if self.Get(REPLICA_SETS, name, namespace) is not None:
+      return K8sSnapshotReplicaSet(self._api_client, name, namespace, self)
+    if self.Get(PODS, name, namespace) is not None:
+      return K8sSnapshotPod(self._api_client, name, namespace, self)
+    return None
+
+
+def _NodesOfPods(pods: List[base.K8sPod]) -> List[base.K8sNode]:
+  """Returns the distinct nodes on which the given pods are running.
+
+  Args:
+    pods (List[base.K8sPod]): The pods.
+
+  Returns:
+    List[base.K8sNode]: The nodes of the pods, in the order of the pods.
+  """
+  nodes_by_name = {}  # type: Dict[str, base.K8sNode]
+  for pod in pods:
+    node = pod.GetNode()
+    if node.name:
+      nodes_by_name.setdefault(node.name, node)
+  return list(nodes_by_name.values())
+
+
+class K8sSnapshotNode(base.K8sNode):
+  """Kubernetes node resolved against a cluster snapshot."""
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      snapshot: K8sClusterSnapshot) -> None:
+    """Creates a node backed by a cluster snapshot.
+
+    Args:
+      api_client (client.ApiClient): The Kubernetes API client to the cluster.
+      name (str): The name of the node.
+      snapshot (K8sClusterSnapshot): The snapshot holding the node.
+    """
+    super().__init__(api_client, name)
+    self._snapshot = snapshot
+
+  def Read(self) -> client.V1Node:
+    """Override of abstract method, reading from the snapshot."""
+    return self._snapshot.Get(NODES, self.name) or super().Read()
+
+  def ListPods(
+      self,
+      namespace: Optional[str] = None,
+      object_filter: Optional[Callable[[client.V1Pod], bool]] = None
+  ) -> List[base.K8sPod]:
+    """Override of K8sNode.ListPods, using the snapshot's node index."""
+    pods = self._snapshot.ListPods(
+        namespace=namespace, node_name=self.name, running=True)
+    return [
+        pod for pod in pods if not object_filter or
+        object_filter(self._snapshot.Get(PODS, pod.name, pod.namespace))
+    ]
+
+
+class K8sSnapshotPod(base.K8sPod):
+  """Kubernetes pod resolved against a cluster snapshot."""
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      namespace: str,
+      snapshot: K8sClusterSnapshot) -> None:
+    """Creates a pod backed by a cluster snapshot.
+
+    Args:
+      api_client (client.ApiClient): The Kubernetes API client to the cluster.
+      name (str): The name of the pod.
+      namespace (str): The namespace of the pod.
+      snapshot (K8sClusterSnapshot): The snapshot holding the pod.
+    """
+    super().__init__(api_client, name, namespace)
+    self._snapshot = snapshot
+
+  def Read(self) -> client.V1Pod:
+    """Override of abstract method, reading from the snapshot."""
+    return self._snapshot.Get(PODS, self.name, self.namespace) or super().Read()
+
+  def GetNode(self) -> base.K8sNode:
+    """Override of K8sPod.GetNode, returning a snapshot node."""
+    return K8sSnapshotNode(
+        self._api_client, self.Read().spec.node_name, self._snapshot)
+
+
+class K8sSnapshotDeployment(workloads.K8sDeployment):
+  """Kubernetes deployment resolved against a cluster snapshot."""
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      namespace: str,
+      snapshot: K8sClusterSnapshot) -> None:
+    """Creates a deployment backed by a cluster snapshot.
+
+    Args:
+      api_client (client.ApiClient): The Kubernetes API client to the cluster.
+      name (str): The name of the deployment.
+      namespace (str): The namespace of the deployment.
+      snapshot (K8sClusterSnapshot): The snapshot holding the deployment.
+    """
+    super().__init__(api_client, name, namespace)
+    self._snapshot = snapshot
+
+  def Read(self) -> client.V1Deployment:
+    """Override of abstract method, reading from the snapshot."""
+    return (self._snapshot.Get(DEPLOYMENTS, self.name, self.namespace) or
+            super().Read())
+
+  def _ReplicaSet(self) -> workloads.K8sReplicaSet:
+    """Override of K8sDeployment._ReplicaSet, searching the snapshot.
+
+    Returns:
+      workloads.K8sReplicaSet: The matching ReplicaSet of this deployment.
+
+    Raises:
+      errors.ResourceNotFoundError: If the matching ReplicaSet was not found.
+    """
+    read = self.Read()
+    this_template_spec = read.spec.template
+    for replica_set in self._snapshot.ListReplicaSets(self.namespace):
+      rs_template_spec = replica_set.Read().spec.template
+      rs_labels = dict(rs_template_spec.metadata.labels or {})
+      if not selector.MatchesLabelSelector(read.spec.selector, rs_labels):
+        continue
+      # Compare the templates without the hash appended to the labels of the
+      # replica set. The snapshot's objects are shared, so they are not
+      # modified in place.
+      rs_labels.pop('pod-template-hash', None)
+      if (rs_labels == (this_template_spec.metadata.labels or {}) and
+          rs_template_spec.spec == this_template_spec.spec):
+        return replica_set
+
+    raise errors.ResourceNotFoundError(
+        'Matching ReplicaSet for deployment {0:s} not found.'.format(self.name),
+        __name__)
+
+  def GetCoveredPods(self) -> List[base.K8sPod]:
+    """Override of abstract method, using the snapshot's label index."""
+    return list(self._snapshot.ListPods(
+        namespace=self.namespace, label_selector=self.PodLabelSelector()))
+
+  def GetCoveredNodes(self) -> List[base.K8sNode]:
+    """Override of K8sWorkload.GetCoveredNodes, using the snapshot."""
+    return _NodesOfPods(self.GetCoveredPods())
+
+
+class K8sSnapshotReplicaSet(workloads.K8sReplicaSet):
+  """Kubernetes replica set resolved against a cluster snapshot."""
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      namespace: str,
+      snapshot: K8sClusterSnapshot) -> None:
+    """Creates a replica set backed by a cluster snapshot.
+
+    Args:
+      api_client (client.ApiClient): The Kubernetes API client to the cluster.
+      name (str): The name of the replica set.
+      namespace (str): The namespace of the replica set.
+      snapshot (K8sClusterSnapshot): The snapshot holding the replica set.
+    """
+    super().__init__(api_client, name, namespace)
+    self._snapshot = snapshot
+
+  def Read(self) -> client.V1ReplicaSet:
+    """Override of abstract method, reading from the snapshot."""
+    return (self._snapshot.Get(REPLICA_SETS, self.name, self.namespace) or
+            super().Read())
+
+  def GetCoveredPods(self) -> List[base.K8sPod]:
+    """Override of abstract method, using the snapshot's label index."""
+    return list(self._snapshot.ListPods(
+        namespace=self.namespace, label_selector=self.PodLabelSelector()))
+
+  def GetCoveredNodes(self) -> List[base.K8sNode]:
+    """Override of K8sWorkload.GetCoveredNodes, using the snapshot."""
+    return _NodesOfPods(self.GetCoveredPods())
+
+
+class K8sSnapshotService(services.K8sService):
+  """Kubernetes service resolved against a cluster snapshot."""
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      namespace: str,
+      snapshot: K8sClusterSnapshot) -> None:
+    """Creates a service backed by a cluster snapshot.
+
+    Args:
+      api_client (client.ApiClient): The Kubernetes API client to the cluster.
+      name (str): The name of the service.
+      namespace (str): The namespace of the service.
+      snapshot (K8sClusterSnapshot): The snapshot holding the service.
+    """
+    super().__init__(api_client, name, namespace)
+    self._snapshot = snapshot
+
+  def Read(self) -> client.V1Service:
+    """Override of abstract method, reading from the snapshot."""
+    return (self._snapshot.Get(SERVICES, self.name, self.namespace) or
+            super().Read())
+
+  def GetCoveredPods(self) -> List[base.K8sPod]:
+    """Override of K8sService.GetCoveredPods, using the label index."""
+    return list(self._snapshot.ListPods(
+        namespace=self.namespace, labels=self.Labels()))
+
+
+class K8sSnapshotNetworkPolicy(netpol.K8sNetworkPolicy):
+  """Kubernetes network policy resolved against a cluster snapshot."""
+
+  def __init__(
+      self,
+      api_client: client.ApiClient,
+      name: str,
+      namespace: str,
+      snapshot: K8sClusterSnapshot) -> None:
+    """Creates a network policy backed by a cluster snapshot.
+
+    Args:
+      api_client (client.ApiClient): The Kubernetes API client to the cluster.
+      name (str): The name of the network policy.
+      namespace (str): The namespace of the network policy.
+      snapshot (K8sClusterSnapshot): The snapshot holding the network policy.
+    """
+    super().__init__(api_client, name, namespace)
+    self._snapshot = snapshot
+
+  def Read(self) -> client.V1NetworkPolicy:
+    """Override of abstract method, reading from the snapshot."""
+    return (self._snapshot.Get(NETWORK_POLICIES, self.name, self.namespace) or
+            super().Read())
@@ -15,7 +15,7 @@
 """Kubernetes workload classes extending the base hierarchy."""
 
 import abc
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 
 from kubernetes import client
 
@@ -30,6 +30,19 @@ class K8sControlledWorkload(base.K8sWorkload):
   Examples: ReplicaSet, Deployment, StatefulSet.
   """
 
+  def __init__(
+      self, api_client: client.ApiClient, name: str, namespace: str) -> None:
+    """Creates a Kubernetes workload in the given namespace.
+
+    Args:
+      api_client (ApiClient): The authenticated Kubernetes API client to
+          the cluster.
+      name (str): The name of the workload.
+      namespace (str): The Kubernetes namespace of the workload.
+    """
+    super().__init__(api_client, name, namespace)
+    self._pod_label_selector = None  # type: Optional[client.V1LabelSelector]
+
   def GcpContainerLogsQuerySupplement(self) -> str:
     """Override of abstract method."""
     queries = [
@@ -73,29 +86,67 @@ class K8sControlledWorkload(base.K8sWorkload):
     match_labels = read.spec.selector.match_labels  # type: Dict[str, str]
     return match_labels
 
-  def GetCoveredPods(self) -> List[base.K8sPod]:
-    """Override of abstract method."""
+  def PodLabelSelector(self) -> client.V1LabelSelector:
+    """Gets the label selector matching the pods belonging to this workload.
+
+    Unlike the match labels, the label selector may hold matchExpressions.
+    Defaults to a selector on the pod match labels of this workload.
+
+    Returns:
+      client.V1LabelSelector: The label selector of this workload's pods.
+    """
+    return client.V1LabelSelector(match_labels=self._PodMatchLabels())
+
+  def _ListCoveredPods(self) -> List[client.V1Pod]:
+    """Lists the pod objects covered by this workload, in one API call.
+
+    Returns:
+      List[client.V1Pod]: The API response objects of the covered pods.
+    """
     api = self._Api(client.CoreV1Api)
 
-    labels_selector = selector.K8sSelector.FromLabelsDict(
-        self._PodMatchLabels())
+    labels_selector = selector.K8sSelector.FromLabelSelector(
+        self.PodLabelSelector())
 
     pods = api.list_namespaced_pod(
         self.namespace, **labels_selector.ToKeywords())
+    items = pods.items  # type: List[client.V1Pod]
+    return items
 
+  def GetCoveredPods(self) -> List[base.K8sPod]:
+    """Override of abstract method."""
     return [
         base.K8sPod(
-            self._api_client, pod.metadata.name, pod.metadata.namespace)
-        for pod in pods.items
+            self._api_client, pod.metadata.name, pod.metadata.namespace,
+            labels=pod.metadata.labels or {})
+        for pod in self._ListCoveredPods()
     ]
 
+  def GetCoveredNodes(self) -> List[base.K8sNode]:
+    """Override of K8sWorkload.GetCoveredNodes.
+
+    The nodes are read from the listed pods, instead of reading each pod.
+    """
+    node_names = {
+        pod.spec.node_name: None
+        for pod in self._ListCoveredPods()
+        if pod.spec.node_name
+    }
+    return [base.K8sNode(self._api_client, name) for name in node_names]
+
   def IsCoveringPod(self, pod: base.K8sPod) -> bool:
-    """Override of abstract method."""
-    # Since labels are type Dict[str, str], we can use set-like operations
-    # on the items of the dict
-    return (
-        self.namespace == pod.namespace and
-        self._PodMatchLabels().items() <= pod.GetLabels().items())
+    """Override of abstract method.
+
+    The pod label selector of this workload is resolved on the first call
+    only, as it cannot change. The pod is only read if it was not listed
+    with its labels.
+    """
+    if self.namespace != pod.namespace:
+      return False
+    if self._pod_label_selector is None:
+      self._pod_label_selector = self.PodLabelSelector()
+    labels = pod.labels if pod.labels is not None else pod.GetLabels()
+    return selector.MatchesLabelSelector(self._pod_label_selector, labels)
 
 
 class K8sDeployment(K8sControlledWorkload):
@@ -142,13 +193,14 @@ class K8sDeployment(K8sControlledWorkload):
 
     # The matching ReplicaSet will have labels corresponding to this
     # deployment's matchLabels.
-    replica_sets_selector = selector.K8sSelector.FromLabelsDict(
-        self.MatchLabels())
+    read = self.Read()
+    replica_sets_selector = selector.K8sSelector.FromLabelSelector(
+        read.spec.selector)
 
     replica_sets = self._Api(client.AppsV1Api).list_namespaced_replica_set(
         self.namespace, **replica_sets_selector.ToKeywords()).items
 
-    this_template_spec = self.Read().spec.template
+    this_template_spec = read.spec.template
     for replica_set in replica_sets:
       rs_template_spec = replica_set.spec.template
       # Delete the hash appended to the labels of this replicaset, so that
@@ -170,6 +222,14 @@ class K8sDeployment(K8sControlledWorkload):
     """Override of abstract method."""
     return self._ReplicaSet().MatchLabels()
 
+  def PodLabelSelector(self) -> client.V1LabelSelector:
+    """Override of K8sControlledWorkload.PodLabelSelector.
+
+    The selector of the matching ReplicaSet is used, as it also selects on
+    the pod template hash of the current pods.
+    """
+    return self._ReplicaSet().PodLabelSelector()
+
 
 class K8sReplicaSet(K8sControlledWorkload):
   """Class representing a Kubernetes deployment."""
@@ -196,6 +256,11 @@ class K8sReplicaSet(K8sControlledWorkload):
     """Override of abstract method."""
     return self.MatchLabels()
 
+  def PodLabelSelector(self) -> client.V1LabelSelector:
+    """Override of K8sControlledWorkload.PodLabelSelector."""
+    label_selector = self.Read().spec.selector  # type: client.V1LabelSelector
+    return label_selector
+
   def Read(self) -> client.V1Deployment:
     """Override of abstract method."""
     api = self._Api(client.AppsV1Api)
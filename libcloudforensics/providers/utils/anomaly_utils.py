@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Anomaly detection over metric time series."""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Number of preceding points forming the rolling baseline of a point.
+DEFAULT_BASELINE_WINDOW = 60
+# Absolute z-score from which a point is anomalous.
+DEFAULT_Z_THRESHOLD = 4.0
+# Minimum number of points on each side of a change point.
+DEFAULT_MIN_SEGMENT = 30
+# Minimum shift of the mean at a change point, in pooled standard deviations.
+DEFAULT_CHANGE_THRESHOLD = 2.0
+# Absolute z-scores are capped, as a flat baseline has no deviation.
+MAX_Z_SCORE = 100.0
+# Minimum standard deviation of a baseline, relative to its mean. This keeps
+# small fluctuations around a steady value from being anomalous.
+MIN_RELATIVE_STDDEV = 0.01
+# Minimum standard deviation of a baseline, in the unit of the series. It is
+# disabled by default, as a sensible floor depends on the metric.
+DEFAULT_MIN_STDDEV = 0.0
+
+
+def _ZScore(
+    deviation: float,
+    variance: float,
+    level: float,
+    min_stddev: float = DEFAULT_MIN_STDDEV) -> float:
+  """Computes a z-score, capped to MAX_Z_SCORE.
+
+  Args:
+    deviation (float): The deviation of the value from the baseline mean.
+    variance (float): The variance of the baseline.
+    level (float): The mean of the baseline, which bounds its standard
+        deviation from below (see MIN_RELATIVE_STDDEV).
+    min_stddev (float): Optional. The absolute lower bound of the standard
+        deviation of the baseline. Without it, any deviation from a flat
+        baseline (e.g. all zeros) gets the maximum score. Default is 0.
+
+  Returns:
+    float: The z-score of the value.
+  """
+  stddev = max(math.sqrt(max(variance, 0.0)),
+               MIN_RELATIVE_STDDEV * abs(level), min_stddev)
+  if stddev == 0:
+    return math.copysign(MAX_Z_SCORE, deviation) if deviation else 0.0
+  return max(-MAX_Z_SCORE, min(MAX_Z_SCORE, deviation / stddev))
+
+
+def RollingZScores(
+    values: List[float],
+    window: int = DEFAULT_BASELINE_WINDOW,
+    min_stddev: float = DEFAULT_MIN_STDDEV) -> List[Optional[float]]:
+  """Computes the z-score of each point against a rolling baseline.
+
+  The baseline of a point is the mean and standard deviation of the window
+  of points preceding it, maintained with running sums in a single pass.
+
+  Args:
+    values (List[float]): The values of the series, oldest first.
+    window (int): Optional. The number of points of the baseline. Default
+        is 60.
+    min_stddev (float): Optional. The minimum standard deviation of the
+        baseline, in the unit of the values. Default is 0.
+
+  Returns:
+    List[Optional[float]]: The z-score of each point, or None for the points
+        without a full baseline.
+  """
+  if not values:
+    return []
+  # Values are shifted by the first one, which limits the loss of precision
+  # of the running sum of squares on large values (e.g. bytes).
+  shift = values[0]
+  total = 0.0
+  total_squares = 0.0
+  z_scores = []  # type: List[Optional[float]]
+  for i, value in enumerate(values):
+    if i < window:
+      z_scores.append(None)
+    else:
+      mean = total / window
+      z_scores.append(_ZScore(
+          value - shift - mean, total_squares / window - mean * mean,
+          mean + shift, min_stddev))
+      total -= values[i - window] - shift
+      total_squares -= (values[i - window] - shift) ** 2
+    total += value - shift
+    total_squares += (value - shift) ** 2
+  return z_scores
+
+
+def ChangePoints(
+    values: List[float],
+    min_segment: int = DEFAULT_MIN_SEGMENT,
+    threshold: float = DEFAULT_CHANGE_THRESHOLD,
+    min_stddev: float = DEFAULT_MIN_STDDEV) -> List[int]:
+  """Finds the points at which the mean of a series shifts.
+
+  The series is split recursively (binary segmentation) at the point that
+  maximizes the shift between the means of both sides, as long as the
+  shift is at least threshold pooled standard deviations. Each split is
+  evaluated in a single pass with prefix sums.
+
+  Args:
+    values (List[float]): The values of the series, oldest first.
+    min_segment (int): Optional. The minimum number of points on each side
+        of a change point. Default is 30.
+    threshold (float): Optional. The minimum shift of the mean, in pooled
+        standard deviations. Default is 2.
+    min_stddev (float): Optional. The minimum pooled standard deviation, in
+        the unit of the values. Default is 0.
+
+  Returns:
+    List[int]: The indexes of the first point after each change, in order.
+  """
+  if not values:
+    return []
+  shift = values[0]
+  sums = [0.0]
+  sums_squares = [0.0]
+  for value in values:
+    sums.append(sums[-1] + value - shift)
+    sums_squares.append(sums_squares[-1] + (value - shift) ** 2)
+
+  def _Moments(start: int, end: int) -> Tuple[float, float]:
+    """Returns the mean and the sum of squared deviations of a segment."""
+    count = end - start
+    mean = (sums[end] - sums[start]) / count
+    return mean, (sums_squares[end] - sums_squares[start]) - count * mean ** 2
+
+  change_points = []  # type: List[int]
+  segments = [(0, len(values))]
+  while segments:
+    start, end = segments.pop()
+    best_index, best_shift = None, threshold
+    for index in range(start + min_segment, end - min_segment + 1):
+      left_mean, left_deviation = _Moments(start, index)
+      right_mean, right_deviation = _Moments(index, end)
+      pooled_variance = max(
+          left_deviation + right_deviation, 0.0) / (end - start)
+      mean_shift = _ZScore(
+          right_mean - left_mean, pooled_variance, left_mean + shift,
+          min_stddev)
+      if abs(mean_shift) >= best_shift:
+        best_index, best_shift = index, abs(mean_shift)
+    if best_index is not None:
+      change_points.append(best_index)
+      segments.extend([(start, best_index), (best_index, end)])
+  return sorted(change_points)
+
+
+def AnalyzeSeries(
+    timestamps: List[str],
+    values: List[float],
+    window: int = DEFAULT_BASELINE_WINDOW,
+    z_threshold: float = DEFAULT_Z_THRESHOLD,
+    min_stddev: float = DEFAULT_MIN_STDDEV) -> Dict[str, Any]:
+  """Summarizes how anomalous a series is.
+
+  Args:
+    timestamps (List[str]): The timestamp of each point, oldest first.
+    values (List[float]): The value of each point.
+    window (int): Optional. The number of points of the rolling baseline.
+        Default is 60.
+    z_threshold (float): Optional. The absolute z-score from which a point
+        is anomalous. Default is 4.
+    min_stddev (float): Optional. The minimum standard deviation of the
+        baselines, in the unit of the values. Default is 0.
+
+  Returns:
+    Dict[str, Any]: The analysis of the series, in the format
+        {
+          'score': float,  # The maximum absolute z-score
+          'flagged': bool,  # Whether the score reaches z_threshold
+          'anomalous_points': int,
+          'max_z_timestamp': Optional[str],
+          'change_points': List[str],  # Timestamps of mean shifts
+        }
+  """
+  z_scores = RollingZScores(values, window, min_stddev)
+  score, max_z_timestamp = 0.0, None
+  anomalous_points = 0
+  for timestamp, z_score in zip(timestamps, z_scores):
+    if z_score is None:
+      continue
+    if abs(z_score) >= z_threshold:
+      anomalous_points += 1
+    if abs(z_score) > score:
+      score, max_z_timestamp = abs(z_score), timestamp
+  return {
+      'score': score,
+      'flagged': score >= z_threshold,
+      'anomalous_points': anomalous_points,
+      'max_z_timestamp': max_z_timestamp,
+      'change_points': [
+          timestamps[i] for i in ChangePoints(values, min_stddev=min_stddev)],
+  }
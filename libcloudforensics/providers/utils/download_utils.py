@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Resumable downloads of remote objects to local files."""
+
+import collections
+import json
+import os
+import shutil
+from concurrent import futures
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from libcloudforensics import errors
+from libcloudforensics import logging_utils
+
+logging_utils.SetUpLogger(__name__)
+logger = logging_utils.GetLogger(__name__)
+
+# Suffix of the file recording the progress of a download.
+PROGRESS_SUFFIX = '.progress'
+# Size of the blocks in which local data is read and hashed.
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+# Number of times a range is fetched again when fewer bytes than requested
+# are returned.
+SHORT_READ_RETRIES = 2
+
+
+def ReadProgress(output_path: str, source: Dict[str, Any]) -> int:
+  """Reads the progress of an interrupted download.
+
+  Args:
+    output_path (str): The path of the file being downloaded.
+    source (Dict[str, Any]): The identity of the downloaded object (e.g. its
+        URL, version and size) and the download parameters. The progress is
+        only used if it was recorded for the same source.
+
+  Returns:
+    int: The number of bytes already downloaded, or 0 if the download has
+        to start over.
+  """
+  progress_path = output_path + PROGRESS_SUFFIX
+  if not (os.path.exists(progress_path) and os.path.exists(output_path)):
+    return 0
+  try:
+    with open(progress_path, encoding='utf-8') as progress_file:
+      progress = json.load(progress_file)
+    completed = int(progress['completed'])
+    recorded_source = progress['source']
+  except (OSError, ValueError, TypeError, KeyError) as exception:
+    logger.warning('Ignoring unreadable progress file {0:s}: {1!s}'.format(
+        progress_path, exception))
+    return 0
+  if recorded_source != source:
+    logger.info('Source of {0:s} changed, restarting download'.format(
+        output_path))
+    return 0
+  logger.info('Resuming download of {0:s} from offset {1:d}'.format(
+      output_path, completed))
+  return completed
+
+
+def WriteProgress(output_path: str,
+                  source: Dict[str, Any],
+                  completed: int) -> None:
+  """Records the progress of a download.
+
+  The progress file is replaced atomically, so that an interruption never
+  leaves it truncated.
+
+  Args:
+    output_path (str): The path of the file being downloaded.
+    source (Dict[str, Any]): The identity of the downloaded object and the
+        download parameters, see ReadProgress.
+    completed (int): The number of bytes downloaded from the start of the
+        object.
+  """
+  progress_path = output_path + PROGRESS_SUFFIX
+  temporary_path = progress_path + '.tmp'
+  with open(temporary_path, 'w', encoding='utf-8') as progress_file:
+    json.dump({'source': source, 'completed': completed}, progress_file)
+  os.replace(temporary_path, progress_path)
+
+
+def ClearProgress(output_path: str) -> None:
+  """Removes the progress file of a completed download.
+
+  Args:
+    output_path (str): The path of the downloaded file.
+  """
+  progress_path = output_path + PROGRESS_SUFFIX
+  if os.path.exists(progress_path):
+    os.remove(progress_path)
+
+
+def DownloadRanges(
+    output_path: str,
+    size: int,
+    ranges: List[Tuple[int, int]],
+    fetch: Callable[[int, int], bytes],
+    source: Dict[str, Any],
+    max_workers: int,
+    update_hash: Optional[Callable[[bytes], None]] = None) -> None:
+  """Downloads byte ranges of a remote object concurrently to a local file.
+
+  The ranges are fetched by a pool of workers and written at their offset in
+  a file preallocated to the size of the object, so that bytes outside of
+  the ranges (e.g. unallocated pages) are left as holes of a sparse file.
+
+  Ranges are completed in order, which allows hashing the object in a single
+  pass and resuming an interrupted download from the last completed range
+  (see ReadProgress). At most max_workers ranges are pending at any time, so
+  the memory used is bounded by max_workers times the size of a range.
+
+  Args:
+    output_path (str): The path of the file to write.
+    size (int): The size (in bytes) of the object.
+    ranges (List[Tuple[int, int]]): The (offset, length) of the ranges to
+        download, sorted by offset and not overlapping.
+    fetch (Callable[[int, int], bytes]): A function fetching the bytes of the
+        range at the given offset and of the given length. Called from
+        worker threads.
+    source (Dict[str, Any]): The identity of the object and the download
+        parameters, recorded with the progress of the download.
+    max_workers (int): The number of ranges fetched concurrently.
+    update_hash (Callable[[bytes], None]): Optional. A function called with
+        all the bytes of the object, in order, including the zeros outside
+        of the ranges.
+
+  Raises:
+    ResourceCreationError: If the target drive does not have enough space,
+        or if a range keeps being returned with fewer bytes than requested.
+  """
+  completed = ReadProgress(output_path, source)
+  remaining = [chunk for chunk in ranges if chunk[0] >= completed]
+  needed = sum(length for _, length in remaining)
+  free = shutil.disk_usage(os.path.dirname(os.path.abspath(output_path))).free
+  if needed > free:
+    raise errors.ResourceCreationError(
+        'Target drive does not have enough space ({0!s} free vs {1!s} '
+        'needed)'.format(free, needed), __name__)
+
+  hashed = 0
+  zero_block = bytes(HASH_BLOCK_SIZE if update_hash else 0)
+
+  def _HashZeros(until: int) -> None:
+    nonlocal hashed
+    while update_hash and hashed < until:
+      length = min(len(zero_block), until - hashed)
+      update_hash(zero_block[:length])
+      hashed += length
+
+  data_size = sum(length for _, length in ranges)
+  downloaded = data_size - needed
+  mode = 'r+b' if completed else 'wb'
+  with open(output_path, mode) as output_file:
+    # Extending the file without writing creates a sparse file.
+    output_file.truncate(size)
+    if completed and update_hash:
+      # Hash the part of the object downloaded before resuming.
+      output_file.seek(0)
+      while hashed < completed:
+        data = output_file.read(min(HASH_BLOCK_SIZE, completed - hashed))
+        update_hash(data)
+        hashed += len(data)
+    fd = output_file.fileno()
+
+    def _DownloadRange(offset: int, length: int) -> Optional[bytes]:
+      data = fetch(offset, length)
+      retries = 0
+      while len(data) != length:
+        if retries == SHORT_READ_RETRIES:
+          raise errors.ResourceCreationError(
+              'Got {0:d} bytes instead of {1:d} at offset {2:d} of '
+              '{3:s}'.format(len(data), length, offset, output_path),
+              __name__)
+        logger.warning(
+            'Short read of {0:d} bytes instead of {1:d} at offset {2:d}, '
+            'retrying'.format(len(data), length, offset))
+        retries += 1
+        data = fetch(offset, length)
+      os.pwrite(fd, data, offset)
+      # The data is only kept in memory until it is hashed.
+      return data if update_hash else None
+
+    next_log = 0.1
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+      pending = collections.deque()  # type: Deque[Tuple[int, int, futures.Future[Optional[bytes]]]]  # pylint: disable=line-too-long
+      range_iterator = iter(remaining)
+      while True:
+        while len(pending) < max_workers:
+          chunk = next(range_iterator, None)
+          if not chunk:
+            break
+          pending.append(
+              (chunk[0], chunk[1], executor.submit(_DownloadRange, *chunk)))
+        if not pending:
+          break
+        offset, length, request = pending.popleft()
+        data = request.result()
+        if data is not None and update_hash:
+          _HashZeros(offset)
+          update_hash(data)
+          hashed = offset + length
+        downloaded += length
+        WriteProgress(output_path, source, offset + length)
+        if data_size and downloaded / data_size >= next_log:
+          logger.info('Downloaded {0:.0%} of {1:s}'.format(
+              downloaded / data_size, output_path))
+          next_log += 0.1
+
+  _HashZeros(size)
+  ClearProgress(output_path)
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Cross-provider catalog of instance types, indexed by size."""
+
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from libcloudforensics import logging_utils
+
+logging_utils.SetUpLogger(__name__)
+logger = logging_utils.GetLogger(__name__)
+
+# Time (in seconds) after which a catalog is fetched again from the provider.
+DEFAULT_CATALOG_TTL = 24 * 3600
+# Environment variable pointing to a directory in which to persist catalogs.
+# If unset, catalogs are only cached for the lifetime of the process.
+CACHE_DIR_ENV_VAR = 'LIBCLOUDFORENSICS_CACHE_DIR'
+
+_CATALOGS = {}  # type: Dict[Tuple[str, str, str], InstanceTypeCatalog]
+_CATALOGS_LOCK = threading.Lock()
+
+
+class InstanceTypeCatalog:
+  """Catalog of the instance types available in a region.
+
+  Instance types are dictionaries holding at least a 'Name', a 'CPU' (number
+  of cores) and a 'Memory' (in MB) entry. They are sorted by number of cores
+  and memory, so that matching instance types are found with a binary search.
+
+  Attributes:
+    provider (str): The cloud provider of the catalog, e.g. 'azure'.
+    scope (str): The account scope of the catalog, e.g. a subscription ID.
+    region (str): The region or zone of the catalog.
+    ttl (int): Time (in seconds) after which the catalog is refreshed.
+    persistent (bool): Whether the catalog is persisted in the cache
+        directory, if one is configured.
+  """
+
+  def __init__(self,
+               provider: str,
+               scope: str,
+               region: str,
+               list_function: Callable[[], List[Dict[str, Any]]],
+               ttl: int = DEFAULT_CATALOG_TTL,
+               persistent: bool = True) -> None:
+    """Initialize the InstanceTypeCatalog class.
+
+    Args:
+      provider (str): The cloud provider of the catalog, e.g. 'azure'.
+      scope (str): The account scope of the catalog, e.g. a subscription ID.
+      region (str): The region or zone of the catalog.
+      list_function (Callable[[], List[Dict[str, Any]]]): A function listing
+          the instance types available in the region.
+      ttl (int): Optional. Time (in seconds) after which the catalog is
+          refreshed. Default is 24 hours.
+      persistent (bool): Optional. Whether to persist the catalog in the
+          cache directory, if one is configured. Default is True.
+    """
+    self.provider = provider
+    self.scope = scope
+    self.region = region
+    self.ttl = ttl
+    self.persistent = persistent
+    self._list_function = list_function
+    self._instance_types = []  # type: List[Dict[str, Any]]
+    self._keys = []  # type: List[Tuple[int, int]]
+    self._names = {}  # type: Dict[str, Dict[str, Any]]
+    self._timestamp = 0.0
+    self._lock = threading.Lock()
+
+  @property
+  def cache_path(self) -> Optional[str]:
+    """Path of the file in which the catalog is persisted, if any.
+
+    Returns:
+      str: The path of the catalog file, or None if catalogs are not
+          persisted.
+    """
+    cache_dir = os.getenv(CACHE_DIR_ENV_VAR)
+    if not cache_dir or not self.persistent:
+      return None
+    file_name = re.sub(r'[^\w.-]', '_', '{0:s}_{1:s}_{2:s}.json'.format(
+        self.provider, self.scope, self.region))
+    return os.path.join(cache_dir, file_name)
+
+  def ListInstanceTypes(self) -> List[Dict[str, Any]]:
+    """List the instance types of the catalog, sorted by CPU and memory.
+
+    Returns:
+      List[Dict[str, Any]]: The instance types available in the region.
+    """
+    with self._lock:
+      if time.time() - self._timestamp > self.ttl:
+        self._Load()
+      return list(self._instance_types)
+
+  def GetInstanceType(self, name: str) -> Optional[Dict[str, Any]]:
+    """Get an instance type by name.
+
+    Args:
+      name (str): The name of the instance type.
+
+    Returns:
+      Dict[str, Any]: The instance type, or None if it is not in the catalog.
+    """
+    self.ListInstanceTypes()
+    return self._names.get(name)
+
+  def FindInstanceTypes(
+      self,
+      cpu_cores: int,
+      memory_in_mb: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Find the instance types with the given number of cores and memory.
+
+    Args:
+      cpu_cores (int): The number of CPU cores.
+      memory_in_mb (int): Optional. The amount of memory (in MB). If not
+          provided, instance types with any amount of memory match.
+
+    Returns:
+      List[Dict[str, Any]]: The matching instance types, sorted by memory.
+    """
+    if memory_in_mb is None:
+      low, high = (cpu_cores, -1), (cpu_cores + 1, -1)
+    else:
+      low, high = (cpu_cores, memory_in_mb), (cpu_cores, memory_in_mb + 1)
+    with self._lock:
+      if time.time() - self._timestamp > self.ttl:
+        self._Load()
+      return self._instance_types[
+          bisect.bisect_left(self._keys, low):
+          bisect.bisect_left(self._keys, high)]
+
+  def IsCached(self) -> bool:
+    """Whether the catalog can be read without listing the instance types.
+
+    A catalog is cached if it was loaded within its TTL, or if its cache
+    file is still fresh, in which case the catalog is loaded from it.
+
+    Returns:
+      bool: True if the catalog is cached, False if reading it would list
+          the instance types from the provider.
+    """
+    with self._lock:
+      if time.time() - self._timestamp <= self.ttl:
+        return True
+      return self._LoadCache()
+
+  def _LoadCache(self) -> bool:
+    """Load the catalog from its cache file, if it is fresh.
+
+    Returns:
+      bool: True if the catalog was loaded, False otherwise.
+    """
+    cache_path = self.cache_path
+    if not cache_path or not os.path.exists(cache_path):
+      return False
+    try:
+      with open(cache_path, encoding='utf-8') as cache_file:
+        cached = json.load(cache_file)
+      if time.time() - cached['timestamp'] > self.ttl:
+        return False
+      self._Index(cached['instance_types'])
+      self._timestamp = cached['timestamp']
+    except (ValueError, KeyError, OSError) as exception:
+      logger.warning('Ignoring invalid instance types cache {0:s}: '
+                     '{1!s}'.format(cache_path, exception))
+      return False
+    return True
+
+  def _Load(self) -> None:
+    """Load the catalog from its cache file, or from the provider."""
+    if self._LoadCache():
+      return
+    logger.info('Fetching {0:s} instance types for region {1:s}'.format(
+        self.provider, self.region))
+    instance_types = self._list_function()
+    self._Index(instance_types)
+    self._timestamp = time.time()
+    cache_path = self.cache_path
+    if cache_path:
+      os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+      with open(cache_path, 'w', encoding='utf-8') as cache_file:
+        json.dump({'timestamp': self._timestamp,
+                   'instance_types': instance_types}, cache_file)
+
+  def _Index(self, instance_types: List[Dict[str, Any]]) -> None:
+    """Sort and index instance types.
+
+    Args:
+      instance_types (List[Dict[str, Any]]): The instance types of the
+          catalog.
+    """
+    self._instance_types = sorted(
+        instance_types,
+        key=lambda instance_type: (
+            instance_type['CPU'], instance_type['Memory'] or 0,
+            instance_type['Name']))
+    self._keys = [(instance_type['CPU'], instance_type['Memory'] or 0)
+                  for instance_type in self._instance_types]
+    self._names = {instance_type['Name']: instance_type
+                   for instance_type in self._instance_types}
+
+
+def GetInstanceTypeCatalog(
+    provider: str,
+    scope: str,
+    region: str,
+    list_function: Callable[[], List[Dict[str, Any]]],
+    ttl: int = DEFAULT_CATALOG_TTL,
+    persistent: bool = True) -> InstanceTypeCatalog:
+  """Get the process-wide instance type catalog for a region.
+
+  Args:
+    provider (str): The cloud provider of the catalog, e.g. 'azure'.
+    scope (str): The account scope of the catalog, e.g. a subscription ID.
+    region (str): The region or zone of the catalog.
+    list_function (Callable[[], List[Dict[str, Any]]]): A function listing
+        the instance types available in the region, used when the catalog
+        is not cached or has expired.
+    ttl (int): Optional. Time (in seconds) after which the catalog is
+        refreshed. Default is 24 hours.
+    persistent (bool): Optional. Whether to persist the catalog in the cache
+        directory, if one is configured. Default is True.
+
+  Returns:
+    InstanceTypeCatalog: The instance type catalog for the region.
+  """
+  key = (provider, scope, region)
+  with _CATALOGS_LOCK:
+    if key not in _CATALOGS:
+      _CATALOGS[key] = InstanceTypeCatalog(
+          provider, scope, region, list_function, ttl=ttl,
+          persistent=persistent)
+    return _CATALOGS[key]
+
+
+def ClearInstanceTypeCatalogs() -> None:
+  """Clear the process-wide instance type catalogs."""
+  with _CATALOGS_LOCK:
+    _CATALOGS.clear()
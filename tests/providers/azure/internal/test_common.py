@@ -15,10 +15,13 @@
 """Tests for the azure module - common.py"""
 
 import os
+import time
 import typing
 import unittest
 import mock
 
+from azure.core.credentials import AccessToken
+
 from libcloudforensics import errors
 from libcloudforensics.providers.azure.internal import common
 from tests.providers.azure import azure_mocks
@@ -36,6 +39,7 @@ class AZCommonTest(unittest.TestCase):
             os.path.realpath(__file__)))))
     os.environ['AZURE_CONFIG_DIR'] = os.path.join(
         tests_dir, azure_mocks.EMPTY_AZURE_CONFIG_DIR)
+    common.ClearCredentialsCache()
 
   @typing.no_type_check
   def testGenerateDiskName(self):
@@ -179,3 +183,94 @@ class AZCommonTest(unittest.TestCase):
     subscription_id, _ = common.GetCredentials()
 
     self.assertEqual('12345678-1234-5678-1234-567812345678', subscription_id)
+
+  @typing.no_type_check
+  def testWaitForOperations(self):
+    """Test that long-running operations are waited upon and reported."""
+    disk_poller = mock.Mock()
+    disk_poller.result.return_value = 'fake-disk'
+    snapshot_poller = mock.Mock()
+    snapshot_poller.result.return_value = 'fake-snapshot'
+    metrics_hook = mock.Mock()
+    common.SetOperationMetricsHook(metrics_hook)
+    try:
+      results = common.WaitForOperations(
+          {'disk': disk_poller, 'snapshot': snapshot_poller})
+    finally:
+      common.SetOperationMetricsHook(None)
+    self.assertEqual(
+        {'disk': 'fake-disk', 'snapshot': 'fake-snapshot'}, results)
+    disk_poller.result.assert_called_once_with(timeout=None)
+    self.assertEqual(
+        ['disk', 'snapshot'],
+        sorted(call.args[0] for call in metrics_hook.call_args_list))
+
+    # Operations still running after the timeout should raise an error
+    disk_poller.done.return_value = False
+    disk_poller.continuation_token.return_value = 'fake-token'
+    with self.assertRaises(errors.OperationFailedError):
+      common.WaitForOperation('disk', disk_poller, timeout=1)
+
+  @mock.patch('azure.identity._credentials.default.DefaultAzureCredential.__init__')
+  @typing.no_type_check
+  def testGetCredentialsCached(self, mock_azure_credentials):
+    """Test that credentials are shared for the same identity."""
+    mock_azure_credentials.return_value = None
+    os.environ['AZURE_SUBSCRIPTION_ID'] = 'fake-subscription-id'
+    os.environ["AZURE_CLIENT_ID"] = 'fake-client-id'
+    os.environ["AZURE_CLIENT_SECRET"] = 'fake-client-secret'
+    os.environ["AZURE_TENANT_ID"] = 'fake-tenant-id'
+
+    _, credentials = common.GetCredentials()
+    _, other_credentials = common.GetCredentials()
+    self.assertIs(credentials, other_credentials)
+    mock_azure_credentials.assert_called_once()
+
+    # The subscriptions of an identity share its credentials
+    os.environ['AZURE_SUBSCRIPTION_ID'] = 'other-fake-subscription-id'
+    subscription_id, other_credentials = common.GetCredentials()
+    self.assertEqual('other-fake-subscription-id', subscription_id)
+    self.assertIs(credentials, other_credentials)
+    mock_azure_credentials.assert_called_once()
+
+    os.environ["AZURE_CLIENT_ID"] = 'other-fake-client-id'
+    _, other_credentials = common.GetCredentials()
+    self.assertIsNot(credentials, other_credentials)
+    self.assertEqual(2, mock_azure_credentials.call_count)
+
+  @mock.patch('azure.identity._credentials.default.DefaultAzureCredential.__init__')
+  @typing.no_type_check
+  def testGetCredentialsProfileCached(self, mock_azure_credentials):
+    """Test that a profile is only read once from the credentials file."""
+    mock_azure_credentials.return_value = None
+    os.environ['AZURE_CREDENTIALS_PATH'] = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.realpath(__file__))))), azure_mocks.JSON_FILE)
+
+    with mock.patch.object(
+        common, '_ParseCredentialsFile',
+        wraps=common._ParseCredentialsFile) as mock_parse:  # pylint: disable=protected-access
+      for _ in range(2):
+        subscription_id, _ = common.GetCredentials(
+            profile_name='test_profile_name')
+    self.assertEqual(
+        'fake-subscription-id-from-credential-file', subscription_id)
+    mock_parse.assert_called_once_with('test_profile_name')
+
+  @typing.no_type_check
+  def testCachedTokenCredential(self):
+    """Test that access tokens are cached until they are about to expire."""
+    mock_credential = mock.Mock()
+    mock_credential.get_token.side_effect = [
+        AccessToken('fake-token', int(time.time()) + 3600),
+        AccessToken('fake-refreshed-token', int(time.time()) + 3600)]
+    credential = common.CachedTokenCredential(mock_credential)
+
+    token = credential.get_token('fake-scope')
+    self.assertEqual('fake-token', credential.get_token('fake-scope').token)
+    mock_credential.get_token.assert_called_once_with('fake-scope')
+
+    credential._tokens[(('fake-scope',), None, None)] = AccessToken(  # pylint: disable=protected-access
+        token.token, int(time.time()) + 60)
+    self.assertEqual(
+        'fake-refreshed-token', credential.get_token('fake-scope').token)
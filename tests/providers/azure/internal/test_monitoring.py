@@ -18,6 +18,7 @@ import typing
 import unittest
 import mock
 
+from libcloudforensics.providers.azure.internal import monitoring
 from tests.providers.azure import azure_mocks
 
 
@@ -45,3 +46,28 @@ class AZMonitoringTest(unittest.TestCase):
     self.assertIn('fake-metric', metrics)
     self.assertEqual(1, len(metrics['fake-metric']))
     self.assertEqual('fake-value', metrics['fake-metric']['fake-time-stamp'])
+
+  @typing.no_type_check
+  @mock.patch('azure.mgmt.monitor.v2021_05_01.operations._metrics_operations.MetricsOperations.list')
+  def testGetMetricsForResources(self, mock_list_metrics_operations):
+    """Test that metrics are retrieved in columns for several resources."""
+    metric = mock.Mock(timeseries=[mock.Mock(data=[
+        mock.Mock(time_stamp='fake-time-stamp-1', average=1),
+        mock.Mock(time_stamp='fake-time-stamp-2', average=3),
+        mock.Mock(time_stamp='fake-time-stamp-3', average=None)])])
+    metric.name = mock.Mock(value='fake-metric')
+    mock_list_metrics_operations.return_value = mock.Mock(value=[metric])
+    metrics = azure_mocks.FAKE_MONITORING.GetMetricsForResources(
+        ['fake-resource-id-1', 'fake-resource-id-2'], 'fake-metric',
+        aggregation='Average')
+    self.assertEqual(2, mock_list_metrics_operations.call_count)
+    self.assertEqual(
+        {'timestamps': ['fake-time-stamp-1', 'fake-time-stamp-2'],
+         'values': [1.0, 3.0]},
+        metrics['fake-resource-id-1']['fake-metric'])
+    self.assertIn('fake-resource-id-2', metrics)
+
+    aggregated = monitoring.AggregateMetrics(metrics, function='max')
+    self.assertEqual(3.0, aggregated['fake-resource-id-2']['fake-metric'])
+    with self.assertRaises(ValueError):
+      monitoring.AggregateMetrics(metrics, function='fake-function')
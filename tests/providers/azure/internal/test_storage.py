@@ -14,11 +14,16 @@
 # limitations under the License.
 """Tests for the azure module - storage.py"""
 
+import hashlib
+import json
+import os
+import tempfile
 import typing
 import unittest
 import mock
 
 from libcloudforensics import errors
+from libcloudforensics.providers.azure.internal import storage
 from tests.providers.azure import azure_mocks
 
 
@@ -45,3 +50,69 @@ class AZStorageTest(unittest.TestCase):
     # pylint: enable=protected-access
     self.assertEqual('Storage account name fake-non-conform-name does not '
                      'comply with ^[a-z0-9]{1,24}$', str(error.exception))
+
+  @mock.patch('azure.storage.blob.BlobClient.from_blob_url')
+  @typing.no_type_check
+  def testDownloadPageBlob(self, mock_blob_client):
+    """Test that page blobs are downloaded, skipping unallocated pages."""
+    image = bytearray(8192)
+    image[1024:2048] = b'a' * 1024
+    image[4096:4608] = b'b' * 512
+    blob_client = mock_blob_client.return_value
+    blob_client.get_blob_properties.return_value = mock.Mock(
+        size=len(image), etag='"0x1"')
+    blob_client.list_page_ranges.return_value = [
+        mock.Mock(start=1024, end=2047, cleared=False),
+        mock.Mock(start=2048, end=4095, cleared=True),
+        mock.Mock(start=4096, end=4607, cleared=False)]
+    blob_client.download_blob.side_effect = (
+        lambda offset, length: mock.Mock(
+            readall=mock.Mock(return_value=bytes(
+                image[offset:offset + length]))))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      output_path = os.path.join(tmp_dir, 'image.raw')
+      hashes = storage.DownloadPageBlob(
+          'fake-sas-uri', output_path, chunk_size=512, max_workers=2)
+      with open(output_path, 'rb') as output_file:
+        self.assertEqual(bytes(image), output_file.read())
+      self.assertFalse(os.path.exists(output_path + '.progress'))
+      self.assertEqual(hashlib.md5(image).hexdigest(), hashes['md5'])
+      self.assertEqual(hashlib.sha256(image).hexdigest(), hashes['sha256'])
+      # 2 chunks for the first range, 1 chunk for the last one
+      self.assertEqual(3, blob_client.download_blob.call_count)
+
+      # Resume a download for which the first range was already fetched
+      source = {'url': 'https://fake/blob', 'etag': '"0x1"',
+                'size': len(image), 'chunk_size': 512}
+      blob_client.download_blob.reset_mock()
+      with open(output_path + '.progress', 'w', encoding='utf-8') as progress:
+        json.dump({'source': source, 'completed': 2048}, progress)
+      hashes = storage.DownloadPageBlob(
+          'https://fake/blob?sig=new-token', output_path, chunk_size=512,
+          max_workers=2)
+      blob_client.download_blob.assert_called_once_with(
+          offset=4096, length=512)
+      self.assertEqual(hashlib.sha256(image).hexdigest(), hashes['sha256'])
+
+      # The progress of another version of the blob is not resumed
+      blob_client.download_blob.reset_mock()
+      with open(output_path + '.progress', 'w', encoding='utf-8') as progress:
+        json.dump({'source': dict(source, etag='"0x0"'), 'completed': 2048},
+                  progress)
+      storage.DownloadPageBlob(
+          'https://fake/blob', output_path, chunk_size=512, max_workers=2)
+      self.assertEqual(3, blob_client.download_blob.call_count)
+
+      # An unreadable progress file restarts the download
+      blob_client.download_blob.reset_mock()
+      with open(output_path + '.progress', 'w', encoding='utf-8') as progress:
+        progress.write('{"source": ')
+      hashes = storage.DownloadPageBlob(
+          'https://fake/blob', output_path, chunk_size=512, max_workers=2)
+      self.assertEqual(3, blob_client.download_blob.call_count)
+      self.assertEqual(hashlib.md5(image).hexdigest(), hashes['md5'])
+      self.assertFalse(os.path.exists(output_path + '.progress'))
+
+    with self.assertRaises(ValueError):
+      storage.DownloadPageBlob('fake-sas-uri', output_path, chunk_size=1000)
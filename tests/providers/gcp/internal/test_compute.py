@@ -24,6 +24,7 @@ from googleapiclient.errors import HttpError
 from libcloudforensics import errors
 from libcloudforensics.scripts import utils
 from libcloudforensics.providers.gcp.internal import compute
+from libcloudforensics.providers.utils import instance_type_utils
 from tests.providers.gcp import gcp_mocks
 
 
@@ -117,6 +118,9 @@ class GoogleCloudComputeTest(unittest.TestCase):
     self.assertEqual(gcp_mocks.FAKE_SOURCE_PROJECT.project_id, found_instance.project_id)
     self.assertEqual('fake-instance', found_instance.name)
     self.assertEqual('us-central1-a', found_instance.zone)
+    _, instance_info = gcp_mocks.FAKE_SOURCE_PROJECT.compute.GetInstanceWithInfo(
+        gcp_mocks.FAKE_INSTANCE.name)
+    self.assertEqual(instance_data, instance_info)
 
     mock_get_resource.return_value = None
     with self.assertRaises(errors.ResourceNotFoundError):
@@ -281,12 +285,35 @@ class GoogleCloudComputeTest(unittest.TestCase):
   @mock.patch('libcloudforensics.providers.gcp.internal.common.GoogleCloudComputeClient.GceApi')
   def testGetMachineTypes(self, mock_gce_api):
     """Test getting the Machine Type API object."""
+    instance_type_utils.ClearInstanceTypeCatalogs()
     machine_types_mock = mock_gce_api.return_value.machineTypes.return_value
+    machine_types_mock.list.return_value.execute.return_value = {
+        'items': [gcp_mocks.MOCK_MACHINE_TYPES]}
     machine_types_mock.get.return_value.execute.return_value = gcp_mocks.MOCK_MACHINE_TYPES
     machine_type_name = 'c2-standard-30'
+    # The machine type is fetched on its own while the catalog is cold
+    machine_type = gcp_mocks.FAKE_ANALYSIS_PROJECT.compute.GetMachineTypes(
+        machine_type_name, 'us-central1-a')
+    self.assertEqual(machine_type_name, machine_type.get('name'))
+    machine_types_mock.list.assert_not_called()
+    machine_types_mock.get.assert_called_once()
+
+    catalog = gcp_mocks.FAKE_ANALYSIS_PROJECT.compute.GetMachineTypesCatalog(
+        'us-central1-a')
+    self.assertEqual(
+        machine_type_name, catalog.FindInstanceTypes(30, 122880)[0]['Name'])
+    machine_types_mock.list.assert_called_once()
+
+    # Machine types are then looked up in the cached catalog
     machine_type = gcp_mocks.FAKE_ANALYSIS_PROJECT.compute.GetMachineTypes(
         machine_type_name, 'us-central1-a')
     self.assertEqual(machine_type_name, machine_type.get('name'))
+    machine_types_mock.list.assert_called_once()
+    machine_types_mock.get.assert_called_once()
+
+    # Machine types missing from the catalog are fetched from the API
+    gcp_mocks.FAKE_ANALYSIS_PROJECT.compute.GetMachineTypes(
+        'fake-machine-type', 'us-central1-a')
     machine_types_mock.get.assert_called()
 
   @typing.no_type_check
@@ -479,6 +506,27 @@ class GoogleCloudComputeTest(unittest.TestCase):
       instance_names = []
     self.assertEqual(0, len(instance_names))
 
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.common.GoogleCloudComputeClient.GceApi')
+  def testListInstanceByLabelsWithInfo(self, mock_gce_api):
+    """Test that listed instances are returned with their API resources."""
+    resource = {'name': 'fake-instance', 'id': '123', 'labels': {'id': '123'}}
+    instances_api = mock_gce_api.return_value.instances.return_value
+    instances_api.aggregatedList.return_value.execute.return_value = {
+        'items': {
+            'zones/us-central1-a': {'instances': [resource]},
+            'zones/us-central1-b': {'warning': {'code': 'NO_RESULTS_ON_PAGE'}},
+        }
+    }
+    instances_api.aggregatedList_next.return_value = None
+    instances = gcp_mocks.FAKE_ANALYSIS_PROJECT.compute.ListInstanceByLabelsWithInfo(
+        labels_filter={'id': '123'})
+    self.assertEqual(['fake-instance'], list(instances))
+    instance, instance_info = instances['fake-instance']
+    self.assertIsInstance(instance, compute.GoogleComputeInstance)
+    self.assertEqual('us-central1-a', instance.zone)
+    self.assertEqual(resource, instance_info)
+
   @typing.no_type_check
   @mock.patch('libcloudforensics.providers.gcp.internal.compute.GoogleCloudCompute.ListDiskByLabels')
   @mock.patch('libcloudforensics.providers.gcp.internal.common.GoogleCloudComputeClient.GceApi')
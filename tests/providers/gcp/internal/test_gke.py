@@ -14,6 +14,7 @@
 # limitations under the License.
 """Tests for the gcp module - gke.py"""
 
+import datetime
 import typing
 import unittest
 import mock
@@ -22,6 +23,8 @@ from googleapiclient.errors import HttpError
 
 from libcloudforensics import errors
 from libcloudforensics.providers.gcp.internal import gke
+from libcloudforensics.providers.gcp.internal import log as gcp_log
+from libcloudforensics.providers.kubernetes import base
 import libcloudforensics.providers.kubernetes.cluster as k8s
 
 
@@ -52,3 +55,113 @@ class GoogleKubernetesEngineTest(unittest.TestCase):
         resp=mock.Mock(status=404), content=b'Cluster not found')
     with self.assertRaises(errors.ResourceNotFoundError):
       cluster.GetOperation()
+
+  @typing.no_type_check
+  @mock.patch.object(gke.GoogleKubernetesEngine, 'GkeApi')
+  def testListClusters(self, mock_gke_api):
+    """Test that clusters are listed in all locations of a project."""
+    clusters_api = mock_gke_api().projects().locations().clusters()
+    clusters_api.list.return_value.execute.return_value = {
+        'clusters': [{'name': 'cluster-a', 'location': 'fake-zone'}],
+        'missingZones': ['other-zone']
+    }
+
+    clusters = gke.GoogleKubernetesEngine().ListClusters('fake-project-id')
+
+    clusters_api.list.assert_called_once_with(
+        parent='projects/fake-project-id/locations/-')
+    self.assertEqual([{'name': 'cluster-a', 'location': 'fake-zone'}], clusters)
+
+    clusters_api.list.return_value.execute.side_effect = HttpError(
+        resp=mock.Mock(status=403), content=b'Permission denied')
+    with self.assertRaises(errors.ResourceNotFoundError):
+      gke.GoogleKubernetesEngine().ListClusters('fake-project-id')
+
+  @typing.no_type_check
+  @mock.patch.object(gcp_log.GoogleCloudLog, 'ExecuteQueryInWindows')
+  @mock.patch.object(k8s.K8sCluster, '_AuthorizationCheck', mock.Mock)
+  @mock.patch.object(gke.GkeCluster, '_GetK8sApiClient', mock.Mock)
+  def testCollectWorkloadLogs(self, mock_query):
+    """Test that workload logs are queried at once and grouped by pod."""
+    cluster = gke.GkeCluster('fake-project-id', 'fake-zone', 'fake-cluster-id')
+    pods = [
+        base.K8sPod(mock.Mock(), 'pod-a', 'default'),
+        base.K8sPod(mock.Mock(), 'pod-b', 'default'),
+    ]
+
+    def ContainerEntry(pod, container, message):
+      return {'resource': {'labels': {
+          'namespace_name': 'default', 'pod_name': pod,
+          'container_name': container}}, 'textPayload': message}
+
+    audit_entry = {'protoPayload': {
+        'resourceName': 'core/v1/namespaces/default/pods/pod-a'}}
+    mock_query.return_value = iter([
+        [ContainerEntry('pod-a', 'app', '1'), audit_entry,
+         ContainerEntry('pod-a', 'app', '2')],
+        [ContainerEntry('pod-b', 'sidecar', '3')],
+    ])
+
+    groups = list(cluster.CollectWorkloadLogs(
+        pods, datetime.datetime(2026, 1, 1), datetime.datetime(2026, 1, 2)))
+
+    self.assertEqual([
+        ('default/pod-a', 'app', ['1', '2']),
+        ('core/v1/namespaces/default/pods/pod-a', None, [None]),
+        ('default/pod-b', 'sidecar', ['3']),
+    ], [(source, container, [entry.get('textPayload') for entry in entries])
+        for source, container, entries in groups])
+    qfilter = mock_query.call_args[0][0]
+    self.assertEqual(1, mock_query.call_count)
+    self.assertIn('resource.type="k8s_cluster"', qfilter)
+    self.assertIn('resource.type="k8s_container"', qfilter)
+    self.assertIn(
+        '(resource.labels.namespace_name="default" '
+        'resource.labels.pod_name="pod-a") OR '
+        '(resource.labels.namespace_name="default" '
+        'resource.labels.pod_name="pod-b")', qfilter)
+
+  @typing.no_type_check
+  @mock.patch.object(k8s.K8sCluster, '_AuthorizationCheck', mock.Mock)
+  @mock.patch.object(gke.GkeCluster, '_BuildK8sApiClient')
+  def testK8sApiClientCached(self, mock_build_api_client):
+    """Test that the Kubernetes API client of a cluster is reused."""
+    gke.ClearK8sApiClients()
+    mock_build_api_client.side_effect = mock.Mock
+    cluster = gke.GkeCluster('fake-project-id', 'fake-zone', 'fake-cluster-id')
+    same_cluster = gke.GkeCluster(
+        'fake-project-id', 'fake-zone', 'fake-cluster-id')
+    other_cluster = gke.GkeCluster(
+        'fake-project-id', 'fake-zone', 'other-cluster-id')
+
+    self.assertEqual(2, mock_build_api_client.call_count)
+    # pylint: disable=protected-access
+    self.assertIs(cluster._api_client, same_cluster._api_client)
+    self.assertIsNot(cluster._api_client, other_cluster._api_client)
+    gke.ClearK8sApiClients()
+    # Clients still held by clusters are left open
+    cluster._api_client.close.assert_not_called()
+    self.assertIsNot(
+        cluster._api_client,
+        gke.GkeCluster(
+            'fake-project-id', 'fake-zone', 'fake-cluster-id')._api_client)
+    gke.ClearK8sApiClients()
+
+  @typing.no_type_check
+  @mock.patch('google.auth.default')
+  def testGetGoogleCredentials(self, mock_default):
+    """Test that shared credentials are refreshed ahead of their expiry."""
+    credentials = mock.Mock(token='token')
+    mock_default.return_value = (credentials, 'fake-project-id')
+    # pylint: disable=protected-access
+    with mock.patch.object(gke, '_GOOGLE_CREDENTIALS', None):
+      credentials.expiry = datetime.datetime.utcnow() + datetime.timedelta(
+          hours=1)
+      self.assertIs(credentials, gke._GetGoogleCredentials())
+      credentials.refresh.assert_not_called()
+
+      credentials.expiry = datetime.datetime.utcnow() + datetime.timedelta(
+          minutes=1)
+      self.assertIs(credentials, gke._GetGoogleCredentials())
+      credentials.refresh.assert_called_once()
+      mock_default.assert_called_once()
@@ -14,10 +14,12 @@
 # limitations under the License.
 """Tests for the gcp module - log.py"""
 
+import datetime
 import typing
 import unittest
 import mock
 
+from libcloudforensics.providers.gcp.internal import log as gcp_log
 from tests.providers.gcp import gcp_mocks
 
 
@@ -45,3 +47,36 @@ class GoogleCloudLogTest(unittest.TestCase):
     query_logs = gcp_mocks.FAKE_LOGS.ExecuteQuery(qfilter)
     self.assertEqual(2, len(query_logs))
     self.assertEqual(gcp_mocks.FAKE_LOG_ENTRIES[0], query_logs[0])
+
+  @typing.no_type_check
+  @mock.patch.object(gcp_log, 'LOG_REQUEST_INTERVAL', 0)
+  @mock.patch('libcloudforensics.providers.gcp.internal.log.GoogleCloudLog.GclApi')
+  def testExecuteQueryInWindows(self, mock_gcl_api):
+    """Test that time windows are queried and returned in order."""
+    query = mock_gcl_api.return_value.entries.return_value.list
+
+    def List(body):
+      # Return the window bounds as entries, over two pages
+      start, end = body['filter'].split('\n')[1:]
+      page = 'pageToken' in body
+      return mock.Mock(execute=mock.Mock(return_value={
+          'entries': [end] if page else [start],
+          'nextPageToken': None if page else 'token'}))
+    query.side_effect = List
+
+    windows = list(gcp_mocks.FAKE_LOGS.ExecuteQueryInWindows(
+        'resource.type="k8s_container"',
+        datetime.datetime(2026, 1, 1),
+        datetime.datetime(2026, 1, 1, 4),
+        windows=4, max_workers=2))
+
+    self.assertEqual(8, query.call_count)
+    self.assertEqual([
+        ['timestamp>="2026-01-01T00:00:00Z"', 'timestamp<"2026-01-01T01:00:00Z"'],
+        ['timestamp>="2026-01-01T01:00:00Z"', 'timestamp<"2026-01-01T02:00:00Z"'],
+        ['timestamp>="2026-01-01T02:00:00Z"', 'timestamp<"2026-01-01T03:00:00Z"'],
+        ['timestamp>="2026-01-01T03:00:00Z"', 'timestamp<"2026-01-01T04:00:00Z"'],
+    ], windows)
+    body = query.call_args[1]['body']
+    self.assertEqual('timestamp asc', body['orderBy'])
+    self.assertEqual(['projects/fake-target-project'], body['resourceNames'])
@@ -13,11 +13,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Tests for the gcp module - monitoring.py"""
+import re
 import typing
 import unittest
 
 import mock
 
+from libcloudforensics.providers.gcp.internal import monitoring
 from tests.providers.gcp import gcp_mocks
 
 
@@ -67,14 +69,130 @@ class GoogleCloudMonitoringTest(unittest.TestCase):
           }
         ])
 
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.monitoring.GoogleCloudMonitoring.GcmApi')
+  def testNetworkUsageOfEachInstance(self, mock_gcm_api):
+    """Validates that each series is named after its own instance."""
+    instance_b = dict(gcp_mocks.MOCK_GM_NETWORK_DATA['timeSeries'][0],
+                      metadata={'systemLabels': {'name': 'instance-b'}})
+    services = mock_gcm_api.return_value.projects.return_value.timeSeries.return_value.list
+    services.return_value.execute.return_value = {
+        'timeSeries': gcp_mocks.MOCK_GM_NETWORK_DATA['timeSeries'] + [instance_b]}
+    network_usage = gcp_mocks.FAKE_MONITORING.GetNetworkData()
+    self.assertEqual(
+        ['instance-a', 'instance-b'],
+        [usage['instance_name'] for usage in network_usage])
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.monitoring.GoogleCloudMonitoring.GcmApi')
+  def testQueryTimeSeriesInChunks(self, mock_gcm_api):
+    """Validates that chunks of label values are queried and merged."""
+    def List(**kwargs):
+      instance_ids = re.findall(r'instance_id = "(\w+)"', kwargs['filter'])
+      return mock.Mock(execute=mock.Mock(return_value={'timeSeries': [{
+          'resource': {'labels': {'instance_id': instance_id}},
+          'points': [{'interval': {'startTime': 't1'}, 'value': {'int64Value': '2'}},
+                     {'interval': {'startTime': 't0'}, 'value': {'int64Value': '1'}}]
+      } for instance_id in instance_ids]}))
+    services = mock_gcm_api.return_value.projects.return_value.timeSeries.return_value.list
+    services.side_effect = List
+
+    time_series = gcp_mocks.FAKE_MONITORING.QueryTimeSeries(
+        'compute.googleapis.com/instance/cpu/utilization',
+        resource_type='gce_instance',
+        resource_filters={'instance_id': ['a', 'b', 'c']},
+        aggregation=monitoring.Aggregation(60, 'ALIGN_MEAN'),
+        chunk_size=2)
+
+    self.assertEqual(2, services.call_count)
+    self.assertIn(
+        'metric.type = "compute.googleapis.com/instance/cpu/utilization" AND '
+        'resource.type = "gce_instance" AND (resource.label.instance_id = "c")',
+        [call[1]['filter'] for call in services.call_args_list])
+    self.assertEqual('60s', services.call_args[1]['aggregation_alignmentPeriod'])
+    self.assertEqual(
+        ['a', 'b', 'c'], [ts.resource_labels['instance_id'] for ts in time_series])
+    self.assertEqual(['t1', 't0'], time_series[0].timestamps)
+    self.assertEqual([2, 1], time_series[0].values)
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.monitoring.GoogleCloudMonitoring.GcmApi')
+  def testGetCpuUsageOfFleet(self, mock_gcm_api):
+    """Validates that long lists of instance IDs are split in bounded filters."""
+    instance_ids = ['{0:019d}'.format(i) for i in range(1000)]
+    filters = []
+    def List(**kwargs):
+      filters.append(kwargs['filter'])
+      return mock.Mock(execute=mock.Mock(return_value={'timeSeries': [{
+          'metric': {'labels': {'instance_name': 'instance-' + instance_id}},
+          'resource': {'labels': {'instance_id': instance_id}},
+          'points': []
+      } for instance_id in re.findall(r'instance_id = "(\w+)"', kwargs['filter'])]}))
+    services = mock_gcm_api.return_value.projects.return_value.timeSeries.return_value.list
+    services.side_effect = List
+
+    cpu_usage = gcp_mocks.FAKE_MONITORING.GetCpuUsage(instance_ids=instance_ids)
+
+    self.assertGreater(len(filters), 1)
+    self.assertLessEqual(max(len(qfilter) for qfilter in filters), monitoring.MAX_FILTER_LENGTH)
+    self.assertEqual(instance_ids, [usage['instance_id'] for usage in cpu_usage])
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.monitoring.GoogleCloudMonitoring.GcmApi')
+  def testGetInstanceAnomalies(self, mock_gcm_api):
+    """Validates that instances are ranked by their anomaly score."""
+    def Series(instance_id, values, **metric_labels):
+      # Points are returned most recent first
+      return {
+          'metric': {'labels': metric_labels},
+          'resource': {'labels': {'instance_id': instance_id}},
+          'points': [{'interval': {'startTime': 't{0:d}'.format(i)},
+                      'value': {'doubleValue': value}}
+                     for i, value in reversed(list(enumerate(values)))]}
+    baseline = [0.5 + 0.01 * (-1) ** i for i in range(100)]
+    def List(**kwargs):
+      time_series = []
+      if 'cpu/utilization' in kwargs['filter']:
+        time_series = [Series('1', baseline), Series('2', baseline + [0.9])]
+      elif 'gpu/utilization' in kwargs['filter']:
+        # GPU utilization is a percentage
+        time_series = [Series('1', [value * 100 for value in baseline[:50]] + [90.0] * 50,
+                              gpu_number='0')]
+      return mock.Mock(execute=mock.Mock(return_value={'timeSeries': time_series}))
+    services = mock_gcm_api.return_value.projects.return_value.timeSeries.return_value.list
+    services.side_effect = List
+
+    anomalies = gcp_mocks.FAKE_MONITORING.GetInstanceAnomalies(instance_ids=['1', '2'])
+
+    self.assertEqual(['2', '1'], [instance['instance_id'] for instance in anomalies])
+    self.assertTrue(anomalies[0]['flagged'])
+    self.assertEqual('t100', anomalies[0]['metrics']['cpu_usage']['max_z_timestamp'])
+    self.assertEqual(['cpu_usage', 'gpu_usage (0)'], sorted(anomalies[1]['metrics']))
+    self.assertEqual(['t50'], anomalies[1]['metrics']['gpu_usage (0)']['change_points'])
+    self.assertEqual(
+        ['2'], [instance['instance_id'] for instance in
+                gcp_mocks.FAKE_MONITORING.GetInstanceAnomalies(top=1)])
+
+    # Series already queried are reused, and a small egress after an idle
+    # period is not anomalous.
+    services.reset_mock()
+    idle = monitoring.TimeSeries(
+        {}, {'instance_id': '1'}, {}, ['t{0:d}'.format(i) for i in range(101)],
+        [100.0] + [0.0] * 100)
+    anomalies = gcp_mocks.FAKE_MONITORING.GetInstanceAnomalies(
+        time_series={'network_egress': [idle]})
+    services.assert_not_called()
+    self.assertFalse(anomalies[0]['flagged'])
+
 
   @typing.no_type_check
   def testBuildCpuUsageFilter(self):
     """Validates the query filter builder functionality"""
     # pylint: disable=protected-access
-    instances_filter = gcp_mocks.FAKE_MONITORING._BuildUsageFilter(
+    instances_filter = gcp_mocks.FAKE_MONITORING._BuildFilter(
         'compute.googleapis.com/instance/cpu/utilization',
-        ['0000000000000000001', '0000000000000000002'])
+        resource_filters={
+            'instance_id': ['0000000000000000001', '0000000000000000002']})
     self.assertEqual(
         instances_filter, ('metric.type = "compute.googleapis.com/instance/'
         'cpu/utilization" AND (resource.label.instance_id = '
@@ -157,7 +275,7 @@ class GoogleCloudMonitoringTest(unittest.TestCase):
               [
                 {
                   'timestamp': '2021-01-01T00:00:00.000000Z',
-                  'gpu_usage': 1
+                  'gpu_usage': '1'
                 }
               ] * 24 * 7
           }
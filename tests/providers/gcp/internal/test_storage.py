@@ -14,11 +14,18 @@
 # limitations under the License.
 """Tests for the gcp module - storage.py"""
 
+import base64
+import hashlib
+import json
+import os
+import tempfile
 import typing
 import unittest
 import mock
 
 from tests.providers.gcp import gcp_mocks
+from libcloudforensics import errors
+from libcloudforensics.providers.gcp.internal import storage as gcp_storage
 from libcloudforensics.providers.utils.storage_utils import SplitStoragePath
 
 
@@ -90,6 +97,118 @@ class GoogleCloudStorageTest(unittest.TestCase):
     self.assertEqual(1, len(size_results))
     self.assertEqual(60, size_results['test_bucket_1'])
 
+  @typing.no_type_check
+  @mock.patch.object(gcp_storage, 'DELETE_BATCH_SIZE', 2)
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.StreamBucketObjects')
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GcsApi')
+  def testDeleteObjects(self, mock_gcs_api, mock_stream_objects):
+    """Test that objects are deleted in batches, reporting failures."""
+    mock_stream_objects.side_effect = lambda *args, **kwargs: iter([
+        {'name': 'exports/{0:d}'.format(i), 'generation': str(i)} for i in range(5)])
+    batches = []
+
+    def NewBatch(callback):
+      calls = []
+      batch = mock.Mock()
+      batch.add.side_effect = lambda request, request_id: calls.append((request, request_id))
+      def Execute():
+        batches.append(calls)
+        for request, request_id in calls:
+          if request['object'] == 'exports/3':
+            callback(request_id, None, Exception('Precondition failed'))
+          else:
+            callback(request_id, {}, None)
+      batch.execute.side_effect = Execute
+      return batch
+    gcs_api = mock_gcs_api.return_value
+    gcs_api.new_batch_http_request.side_effect = NewBatch
+    gcs_api.objects.return_value.delete.side_effect = lambda **kwargs: kwargs
+
+    deleted, failures = gcp_mocks.FAKE_GCS.DeleteObjects(
+        prefix='gs://fake-bucket/exports/', dry_run=True)
+    self.assertEqual(['gs://fake-bucket/exports/{0:d}'.format(i) for i in range(5)], deleted)
+    self.assertEqual({}, failures)
+    gcs_api.objects.return_value.delete.assert_not_called()
+
+    deleted, failures = gcp_mocks.FAKE_GCS.DeleteObjects(
+        prefix='gs://fake-bucket/exports/', max_workers=2)
+    mock_stream_objects.assert_called_with(
+        'fake-bucket', prefix='exports/', fields=['name', 'generation'])
+    self.assertEqual([2, 2, 1], sorted((len(batch) for batch in batches), reverse=True))
+    self.assertIn(({'bucket': 'fake-bucket', 'object': 'exports/4', 'generation': '4'}, '0'),
+                  [call for batch in batches for call in batch])
+    self.assertEqual(
+        ['gs://fake-bucket/exports/{0:d}'.format(i) for i in (0, 1, 2, 4)], sorted(deleted))
+    self.assertEqual({'gs://fake-bucket/exports/3': 'Precondition failed'}, failures)
+
+    deleted, failures = gcp_mocks.FAKE_GCS.DeleteObjects(
+        gcs_paths=['gs://fake-bucket/a', 'other-bucket/b'])
+    self.assertEqual({'bucket': 'other-bucket', 'object': 'b'}, batches[-1][1][0])
+    self.assertEqual(['gs://fake-bucket/a', 'gs://other-bucket/b'], sorted(deleted))
+
+    # A batch failing with any error fails all of its objects
+    def FailingBatch(**unused_kwargs):
+      batch = mock.Mock()
+      batch.execute.side_effect = ConnectionError('Connection reset')
+      return batch
+    gcs_api.new_batch_http_request.side_effect = FailingBatch
+    deleted, failures = gcp_mocks.FAKE_GCS.DeleteObjects(
+        gcs_paths=['gs://fake-bucket/a', 'gs://fake-bucket/b'])
+    self.assertEqual([], deleted)
+    self.assertEqual(
+        {'gs://fake-bucket/a': 'Connection reset',
+         'gs://fake-bucket/b': 'Connection reset'}, failures)
+
+    with self.assertRaises(ValueError):
+      gcp_mocks.FAKE_GCS.DeleteObjects()
+
+    # A prefix selecting a whole bucket must be explicitly allowed
+    with self.assertRaises(ValueError):
+      gcp_mocks.FAKE_GCS.DeleteObjects(prefix='gs://fake-bucket/')
+    deleted, _ = gcp_mocks.FAKE_GCS.DeleteObjects(
+        prefix='gs://fake-bucket', dry_run=True, allow_whole_bucket=True)
+    self.assertEqual(5, len(deleted))
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.monitoring.GoogleCloudMonitoring.GcmApi')
+  def testGetBucketsUsage(self, mock_gcm_api):
+    """Test that the usage of all buckets is reported and cached."""
+    def Point(end_time, **value):
+      return {'interval': {'endTime': end_time}, 'value': value}
+
+    def List(**kwargs):
+      if 'total_bytes' in kwargs['filter']:
+        time_series = [
+            {'resource': {'labels': {'bucket_name': 'bucket-a'}},
+             'points': [Point('2026-10-03T00:00:00Z', doubleValue=400.0),
+                        Point('2026-10-01T00:00:00.123456789Z', doubleValue=100.0)]},
+            {'resource': {'labels': {'bucket_name': 'bucket-b'}},
+             'points': [Point('2026-10-03T00:00:00Z', doubleValue=50.0)]},
+        ]
+      else:
+        time_series = [
+            {'resource': {'labels': {'bucket_name': 'bucket-a'}},
+             'points': [Point('2026-10-03T00:00:00Z', int64Value='3')]},
+        ]
+      return mock.Mock(execute=mock.Mock(return_value={'timeSeries': time_series}))
+    services = mock_gcm_api.return_value.projects.return_value.timeSeries.return_value.list
+    services.side_effect = List
+
+    gcs = gcp_storage.GoogleCloudStorage('fake-project')
+    for _ in range(2):
+      usage = gcs.GetBucketsUsage(timeframe=3)
+    self.assertEqual(2, services.call_count)
+    self.assertEqual('resource.label.bucket_name', services.call_args[1]['aggregation_groupByFields'])
+    self.assertEqual('REDUCE_SUM', services.call_args[1]['aggregation_crossSeriesReducer'])
+    self.assertEqual({'bucket-a', 'bucket-b'}, set(usage))
+    self.assertEqual(400, usage['bucket-a']['size'])
+    self.assertEqual(3, usage['bucket-a']['objects'])
+    self.assertAlmostEqual(150.0, usage['bucket-a']['growth'], places=3)
+    self.assertEqual({'size': 50, 'objects': None, 'growth': None}, usage['bucket-b'])
+
+    gcs.GetBucketsUsage(timeframe=3, refresh=True)
+    self.assertEqual(4, services.call_count)
+
   @typing.no_type_check
   @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GcsApi')
   def testCreateBucket(self, mock_gcs_api):
@@ -107,3 +226,205 @@ class GoogleCloudStorageTest(unittest.TestCase):
         })
     self.assertEqual('fake-bucket', create_result['name'])
     self.assertEqual('123456789', create_result['projectNumber'])
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GetObjectMetadata')
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GcsApi')
+  def testGetObject(self, mock_gcs_api, mock_get_metadata):
+    """Test that objects are downloaded in ranges, resumed and verified."""
+    content = bytes(range(256)) * 40
+    mock_get_metadata.return_value = {
+        'name': 'foo/fake.img', 'size': str(len(content)), 'generation': '7',
+        'md5Hash': base64.b64encode(hashlib.md5(content).digest()).decode()}
+    ranges = []
+
+    def GetMedia(bucket, object, generation):  # pylint: disable=redefined-builtin
+      self.assertEqual(('fake-bucket', 'foo/fake.img', '7'),
+                       (bucket, object, generation))
+      request = mock.Mock(headers={})
+
+      def Execute():
+        start, end = request.headers['Range'][len('bytes='):].split('-')
+        ranges.append(int(start))
+        return content[int(start):int(end) + 1]
+      request.execute.side_effect = Execute
+      return request
+    mock_gcs_api.return_value.objects.return_value.get_media.side_effect = GetMedia
+
+    with tempfile.TemporaryDirectory() as output_dir:
+      out_file = os.path.join(output_dir, 'fake.img')
+      # A previous download stopped after the first two chunks
+      with open(out_file, 'wb') as output_file:
+        output_file.write(content[:2048])
+      with open(out_file + '.progress', 'w', encoding='utf-8') as progress:
+        json.dump({'source': {'path': 'gs://fake-bucket/foo/fake.img',
+                              'generation': '7', 'size': len(content),
+                              'chunk_size': 1024},
+                   'completed': 2048}, progress)
+
+      result = gcp_mocks.FAKE_GCS.GetObject(
+          'gs://fake-bucket/foo/fake.img', out_file=out_file, chunk_size=1024,
+          max_workers=3)
+
+      self.assertEqual(out_file, result)
+      self.assertEqual(list(range(2048, len(content), 1024)), sorted(ranges))
+      with open(out_file, 'rb') as output_file:
+        self.assertEqual(content, output_file.read())
+      self.assertFalse(os.path.exists(out_file + '.progress'))
+
+      mock_get_metadata.return_value['md5Hash'] = base64.b64encode(
+          hashlib.md5(b'other').digest()).decode()
+      with self.assertRaises(errors.ResourceCreationError):
+        gcp_mocks.FAKE_GCS.GetObject(
+            'gs://fake-bucket/foo/fake.img', out_file=out_file, chunk_size=1024)
+
+  @typing.no_type_check
+  @mock.patch('googleapiclient.http.MediaIoBaseDownload')
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GetObjectMetadata')
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GcsApi')
+  def testGetObjectUnknownSize(
+      self, mock_gcs_api, mock_get_metadata, mock_downloader):
+    """Test that objects without a size are downloaded in a single stream."""
+    content = b'fake-content'
+    mock_get_metadata.return_value = {
+        'name': 'foo/fake.img',
+        'md5Hash': base64.b64encode(hashlib.md5(content).digest()).decode()}
+
+    def Downloader(output_file, request, chunksize):  # pylint: disable=unused-argument
+      output_file.write(content)
+      status = mock.Mock(total_size=len(content))
+      status.progress.return_value = 1.0
+      return mock.Mock(next_chunk=mock.Mock(return_value=(status, True)))
+    mock_downloader.side_effect = Downloader
+
+    with tempfile.TemporaryDirectory() as output_dir:
+      out_file = os.path.join(output_dir, 'fake.img')
+      with self.assertLogs(gcp_storage.logger, level='WARNING'):
+        gcp_mocks.FAKE_GCS.GetObject(
+            'gs://fake-bucket/foo/fake.img', out_file=out_file)
+      with open(out_file, 'rb') as output_file:
+        self.assertEqual(content, output_file.read())
+    mock_gcs_api.return_value.objects.return_value.get_media.assert_called_once()
+
+  @typing.no_type_check
+  def _FakeObjectsList(self, names, page_size, calls):
+    """Returns a fake objects.list, over the given object names."""
+
+    def List(**kwargs):
+      self.assertEqual('fake-bucket', kwargs['bucket'])
+      self.assertEqual(
+          'items(size,name),prefixes,nextPageToken', kwargs['fields'])
+      calls.append(kwargs)
+      prefix = kwargs.get('prefix', '')
+      start_offset = kwargs.get('startOffset')
+      end_offset = kwargs.get('endOffset')
+      # Objects in subdirectories are grouped by prefix, as in GCS
+      entries = set()
+      for name in names:
+        if not name.startswith(prefix):
+          continue
+        if start_offset is not None and name < start_offset:
+          continue
+        if end_offset is not None and name >= end_offset:
+          continue
+        rest = name[len(prefix):]
+        if '/' in rest:
+          entries.add(('prefix', prefix + rest[:rest.index('/') + 1]))
+        else:
+          entries.add(('item', name))
+      entries = sorted(entries, key=lambda entry: entry[1])
+      start = int(kwargs.get('pageToken', 0))
+      page = entries[start:start + page_size]
+      response = {
+          'items': [{'name': name} for kind, name in page if kind == 'item'],
+          'prefixes': [name for kind, name in page if kind == 'prefix']}
+      if start + page_size < len(entries):
+        response['nextPageToken'] = str(start + page_size)
+      return mock.Mock(execute=mock.Mock(return_value=response))
+    return List
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GcsApi')
+  def testStreamBucketObjectsParallel(self, mock_gcs_api):
+    """Test that shards cover the keyspace under the prefix exactly once."""
+    names = ['logs/' + name for name in (
+        '!first', '-dash', '0001', '0002', 'A', 'Zz', '_under', 'a/b', 'a/c',
+        'zzz', '~last')] + ['other/file']
+    calls = []
+    mock_gcs_api.return_value.objects.return_value.list.side_effect = (
+        self._FakeObjectsList(names, 1, calls))
+
+    objects = list(gcp_mocks.FAKE_GCS.StreamBucketObjectsParallel(
+        'gs://fake-bucket', prefix='logs/', fields=['size'], max_workers=4))
+
+    self.assertEqual(
+        sorted(names[:-1]), sorted(obj['name'] for obj in objects))
+    # The directory had more than one page, so it was split
+    self.assertIn(
+        ('logs/A', 'logs/B'),
+        [(call.get('startOffset'), call.get('endOffset')) for call in calls])
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.GcsApi')
+  def testStreamBucketObjectsParallelDirectories(self, mock_gcs_api):
+    """Test that directories sharing a long prefix are listed as shards."""
+    names = ['logs/2026-10-{0:02d}/{1:03d}.json'.format(day, index)
+             for day in range(1, 4) for index in range(50)]
+    calls = []
+    mock_gcs_api.return_value.objects.return_value.list.side_effect = (
+        self._FakeObjectsList(names, 5, calls))
+
+    objects = list(gcp_mocks.FAKE_GCS.StreamBucketObjectsParallel(
+        'gs://fake-bucket', prefix='logs/', fields=['size'], max_workers=4))
+
+    self.assertEqual(sorted(names), sorted(obj['name'] for obj in objects))
+    listed_directories = {
+        call['prefix'] for call in calls if 'startOffset' not in call}
+    self.assertEqual(
+        {'logs/', 'logs/2026-10-01/', 'logs/2026-10-02/', 'logs/2026-10-03/'},
+        listed_directories)
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.storage.GoogleCloudStorage.StreamBucketObjects')
+  def testWriteBucketManifest(self, mock_stream_objects):
+    """Test that a manifest is written and compared to the previous one."""
+    mock_stream_objects.side_effect = [
+        iter([
+            {'name': 'evidence/a', 'size': '1', 'generation': '1', 'md5Hash': 'aaa', 'crc32c': 'AAA'},
+            {'name': 'evidence/b', 'size': '2', 'generation': '1', 'md5Hash': 'bbb', 'crc32c': 'BBB'},
+        ]),
+        iter([
+            {'name': 'evidence/a', 'size': '1', 'generation': '1', 'md5Hash': 'aaa', 'crc32c': 'AAA'},
+            {'name': 'evidence/c', 'size': '3', 'generation': '5', 'crc32c': 'CCC'},
+        ]),
+        iter([
+            {'name': 'evidence/a', 'size': '4', 'generation': '2', 'md5Hash': 'ddd', 'crc32c': 'DDD'},
+            {'name': 'evidence/c', 'size': '3', 'generation': '5', 'crc32c': 'CCC'},
+        ]),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+      manifest = os.path.join(temp_dir, 'manifest.csv')
+      self.assertEqual(
+          {'objects': 2},
+          gcp_mocks.FAKE_GCS.WriteBucketManifest('gs://fake-bucket/evidence/', manifest))
+      mock_stream_objects.assert_called_with(
+          'fake-bucket', prefix='evidence/',
+          fields=['name', 'size', 'generation', 'md5Hash', 'crc32c'])
+
+      # Refresh the manifest in place
+      self.assertEqual(
+          {'objects': 2, 'added': 1, 'changed': 0, 'unchanged': 1, 'removed': 1},
+          gcp_mocks.FAKE_GCS.WriteBucketManifest(
+              'gs://fake-bucket/evidence/', manifest, previous_manifest=manifest))
+      with open(manifest, encoding='utf-8') as csv_file:
+        self.assertEqual(
+            ['name,size,generation,md5Hash,crc32c',
+             'evidence/a,1,1,aaa,AAA',
+             'evidence/c,3,5,,CCC'],
+            csv_file.read().splitlines())
+
+      self.assertEqual(
+          {'objects': 2, 'added': 0, 'changed': 1, 'unchanged': 1, 'removed': 0},
+          gcp_mocks.FAKE_GCS.WriteBucketManifest(
+              'gs://fake-bucket/evidence/', manifest, previous_manifest=manifest))
+      self.assertEqual(['manifest.csv'], os.listdir(temp_dir))
@@ -14,6 +14,7 @@
 # limitations under the License.
 """Tests for the gcp module - forensics.py"""
 
+import threading
 import typing
 import unittest
 import mock
@@ -21,6 +22,7 @@ import mock
 from libcloudforensics import errors
 from libcloudforensics.providers.gcp import forensics
 from libcloudforensics.providers.gcp.internal import compute
+from libcloudforensics.providers.gcp.internal import monitoring
 
 from tests.providers.gcp import gcp_mocks
 
@@ -161,6 +163,152 @@ class GCPForensicsTest(unittest.TestCase):
     self.assertListEqual(
         ssh_auth, ['publickey', 'password', 'keyboard-interactive'])
 
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.gke.GkeCluster')
+  def testQuarantineGKEWorkloadNotFound(self, mock_cluster):
+    """Test that the cluster cache is released when quarantining fails."""
+    mock_cluster.return_value.FindWorkload.return_value = None
+    with self.assertRaises(errors.ResourceNotFoundError):
+      forensics.QuarantineGKEWorkload(
+          'fake-project', 'fake-zone', 'fake-cluster', 'default',
+          'fake-workload')
+    mock_cluster.return_value.EnableCache.assert_called_once()
+    mock_cluster.return_value.DisableCache.assert_called_once()
+
+    mock_cluster.reset_mock()
+    mock_cluster.return_value.FindWorkload.side_effect = RuntimeError
+    with self.assertRaises(RuntimeError):
+      forensics.QuarantineGKEWorkload(
+          'fake-project', 'fake-zone', 'fake-cluster', 'default',
+          'fake-workload')
+    mock_cluster.return_value.DisableCache.assert_called_once()
+
+  @typing.no_type_check
+  @mock.patch.object(forensics, '_CheckSSHAuth')
+  @mock.patch('libcloudforensics.providers.gcp.internal.project.GoogleCloudProject')
+  def testTriageInstance(self, mock_project, mock_check_ssh_auth):
+    """Test that triage collectors run concurrently and may fail."""
+    mock_instance = mock_project.return_value.compute.GetInstance.return_value
+    mock_instance.GetOperation.return_value = {
+        'name': 'fake-instance', 'id': '123',
+        'zone': 'https://www.googleapis.com/compute/v1/projects/fake-project/zones/us-central1-a',
+        'creationTimestamp': '2026-01-01T00:00:00Z',
+        'lastStartTimestamp': '2026-01-02T00:00:00Z',
+        'serviceAccounts': [],
+    }
+    mock_instance.GetNatIps.return_value = ['0.0.0.0']
+    mock_instance.GetNormalisedFirewalls.return_value = []
+    mock_monitoring = mock_project.return_value.monitoring
+    mock_monitoring.ActiveServices.return_value = {'compute.googleapis.com': 1}
+    mock_monitoring.QueryInstanceMetrics.side_effect = errors.ResourceNotFoundError(
+        'Permission denied', __name__)
+    mock_monitoring.GetNodeAccelUsage.return_value = []
+    mock_project.return_value.cloudresourcemanager.ProjectAncestry.return_value = [
+        {'displayName': 'fake-project', 'name': 'projects/123'}]
+    # Block the SSH collector until the triage timed out
+    release = threading.Event()
+    mock_check_ssh_auth.side_effect = lambda *args: release.wait(5)
+
+    triage = forensics.TriageInstance('fake-project', 'fake-instance', timeout=1)
+    release.set()
+
+    self.assertEqual('fake-project (projects/123)', triage['instance_info']['ancestry'])
+    mock_instance.GetNormalisedFirewalls.assert_called_once_with(
+        mock_instance.GetOperation.return_value)
+    values = {data['data_type']: data['values'] for data in triage['triage_data']}
+    self.assertEqual([{'service': 'compute.googleapis.com', 'count': 1}], values['active_services'])
+    self.assertIsNone(values['gce_gpu_usage'])
+    self.assertIsNone(values['ssh_auth'])
+    collectors = triage['collectors']
+    self.assertEqual('ok', collectors['ancestry']['status'])
+    # The metrics are collected together
+    self.assertEqual('error', collectors['gce_gpu_usage']['status'])
+    self.assertIn('Permission denied', collectors['gce_gpu_usage']['error'])
+    self.assertEqual('error', collectors['cpu_usage']['status'])
+    self.assertNotIn('metrics', collectors)
+    self.assertEqual('timeout', collectors['ssh_auth']['status'])
+    self.assertAlmostEqual(1.0, collectors['ssh_auth']['seconds'], delta=0.5)
+
+  @typing.no_type_check
+  @mock.patch.object(forensics, '_CheckSSHAuth')
+  @mock.patch('libcloudforensics.providers.gcp.internal.project.GoogleCloudProject')
+  def testTriageInstances(self, mock_project, mock_check_ssh_auth):
+    """Test that project-level data and metrics are collected once."""
+    instances = {}
+    for name, instance_id in (('instance-a', '1'), ('instance-b', '2')):
+      instance = mock.Mock()
+      instance_info = {
+          'name': name, 'id': instance_id,
+          'zone': 'https://www.googleapis.com/compute/v1/projects/fake-project/zones/us-central1-a',
+          'creationTimestamp': '2026-01-01T00:00:00Z',
+          'lastStartTimestamp': '2026-01-02T00:00:00Z',
+          'serviceAccounts': [],
+      }
+      instance.GetNatIps.return_value = []
+      instance.GetNormalisedFirewalls.return_value = [{'interface_name': name}]
+      instances[name] = (instance, instance_info)
+    compute_api = mock_project.return_value.compute
+    compute_api.ListInstanceByLabelsWithInfo.return_value = instances
+    mock_monitoring = mock_project.return_value.monitoring
+    mock_monitoring.ActiveServices.return_value = {'compute.googleapis.com': 1}
+    time_series = {
+        'cpu_usage': [monitoring.TimeSeries(
+            {'instance_name': 'instance-b'}, {'instance_id': '2'}, {}, ['t0'], [0.5])],
+        'network_egress': [],
+        'gpu_usage': [],
+    }
+    mock_monitoring.QueryInstanceMetrics.return_value = time_series
+    mock_monitoring.GetNodeAccelUsage.return_value = []
+    mock_monitoring.GetInstanceAnomalies.return_value = [
+        {'instance_id': '2', 'score': 10.0, 'flagged': True, 'metrics': {'cpu_usage': {'score': 10.0}}},
+        {'instance_id': '1', 'score': 1.0, 'flagged': False, 'metrics': {'cpu_usage': {'score': 1.0}}}]
+    mock_project.return_value.cloudresourcemanager.ProjectAncestry.return_value = [
+        {'displayName': 'fake-project', 'name': 'projects/123'}]
+    mock_check_ssh_auth.return_value = None
+
+    report = forensics.TriageInstances('fake-project', labels={'env': 'prod'})
+
+    compute_api.ListInstanceByLabelsWithInfo.assert_called_once_with({'env': 'prod'}, filter_union=False)
+    # The listed resources are used, instead of fetching each instance again
+    for instance, _ in instances.values():
+      instance.GetOperation.assert_not_called()
+    mock_monitoring.ActiveServices.assert_called_once()
+    # The series are queried once, for both the usage and the anomalies
+    mock_monitoring.QueryInstanceMetrics.assert_called_once_with(instance_ids=['1', '2'], aggregation_minutes=1)
+    mock_monitoring.GetInstanceAnomalies.assert_called_once_with(
+        instance_ids=['1', '2'], aggregation_minutes=1, time_series=time_series)
+    self.assertEqual(
+        ['instance-b', 'instance-a'],
+        [instance['instance_name'] for instance in report['anomaly_ranking']])
+    self.assertEqual({}, report['errors'])
+    reports = {instance['instance_info']['instance_name']: instance for instance in report['instances']}
+    self.assertEqual('fake-project (projects/123)', reports['instance-a']['instance_info']['ancestry'])
+    values = {data['data_type']: data['values'] for data in reports['instance-b']['triage_data']}
+    self.assertEqual([{'timestamp': 't0', 'cpu_usage': 0.5}], values['cpu_usage'])
+    self.assertEqual([{'interface_name': 'instance-b'}], values['firewalls'])
+    self.assertEqual([{'score': 10.0, 'metric': 'cpu_usage'}], values['anomalies'])
+    self.assertEqual('ok', reports['instance-b']['collectors']['cpu_usage']['status'])
+
+    with self.assertRaises(ValueError):
+      forensics.TriageInstances('fake-project')
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.gcp.internal.project.GoogleCloudProject')
+  def testTriageInstancesNotFound(self, mock_project):
+    """Test that the project is not triaged when no instance is found."""
+    compute_api = mock_project.return_value.compute
+    compute_api.GetInstanceWithInfo.side_effect = errors.ResourceNotFoundError(
+        'Instance not found', __name__)
+
+    report = forensics.TriageInstances(
+        'fake-project', instance_names=['instance-a', 'instance-b', 'instance-a'])
+
+    self.assertEqual(['instance-a', 'instance-b'], sorted(report['errors']))
+    self.assertEqual([], report['instances'])
+    self.assertEqual(2, compute_api.GetInstanceWithInfo.call_count)
+    # Metrics queried without instance IDs would cover the whole project
+    mock_project.return_value.monitoring.QueryInstanceMetrics.assert_not_called()
+
   @mock.patch('libcloudforensics.providers.gcp.internal.project.GoogleCloudProject')
   def testCopyDisksToGCS(self, mock_project: mock.MagicMock) -> None:
     """Tests copying a disk to GCS storage."""
@@ -84,7 +84,9 @@ def V1Node(name: str) -> client.V1Node:
 
   https://github.com/kubernetes-client/python/blob/master/kubernetes/docs/V1Node.md
   """
-  return client.V1Node(metadata=V1ObjectMeta(name=name))
+  return client.V1Node(
+      metadata=V1ObjectMeta(name=name),
+      status=client.V1NodeStatus(addresses=[]))
 
 
 def V1Pod(
@@ -14,6 +14,7 @@
 # limitations under the License.
 """Test on base Kubernetes objects."""
 
+import json
 import typing
 import unittest
 
@@ -22,6 +23,7 @@ from kubernetes import client
 
 import libcloudforensics.providers.kubernetes.cluster as k8s_cluster
 from libcloudforensics.providers.kubernetes import base
+from libcloudforensics.providers.kubernetes import snapshot
 from tests.providers.kubernetes import k8s_mocks
 
 
@@ -90,7 +92,8 @@ class K8sClusterTest(unittest.TestCase):
 
     # Assert API and corresponding function was called appropriately
     mock_k8s_api.assert_called_with(k8s_mocks.MOCK_API_CLIENT)
-    mock_k8s_api_func.assert_called_with(mock_namespace)
+    mock_k8s_api_func.assert_called_with(
+        mock_namespace, limit=base.DEFAULT_LIST_CHUNK_SIZE, _continue=None)
     # Assert returned pods correspond to provided response
     self.assertEqual(
         set(pod.name for pod in pods),
@@ -111,7 +114,9 @@ class K8sClusterTest(unittest.TestCase):
       {(np.name, np.namespace)
        for np in cluster.ListNetworkPolicies('namespace-bpvnxfvs')})
 
-    mock_list_network_policy.assert_called_once_with('namespace-bpvnxfvs')
+    mock_list_network_policy.assert_called_once_with(
+        'namespace-bpvnxfvs', limit=base.DEFAULT_LIST_CHUNK_SIZE,
+        _continue=None)
 
   @typing.no_type_check
   @mock.patch.object(
@@ -129,7 +134,64 @@ class K8sClusterTest(unittest.TestCase):
       {(np.name, np.namespace)
        for np in cluster.ListNetworkPolicies()})
 
-    mock_list_network_policy.assert_called_once_with()
+    mock_list_network_policy.assert_called_once_with(
+        limit=base.DEFAULT_LIST_CHUNK_SIZE, _continue=None)
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testClusterListPodsInChunks(self, mock_k8s_api):
+    """Test that pods are listed in chunks, following continue tokens."""
+    first_page = k8s_mocks.V1PodList(2)
+    first_page.metadata = client.V1ListMeta(_continue='token')
+    second_page = k8s_mocks.V1PodList(1)
+    second_page.items[0].metadata.name = 'pod-2'
+    mock_k8s_api_func = mock_k8s_api.return_value.list_pod_for_all_namespaces
+    mock_k8s_api_func.side_effect = [first_page, second_page]
+
+    pods = k8s_cluster.K8sCluster(
+        api_client=k8s_mocks.MOCK_API_CLIENT).ListPods()
+
+    self.assertEqual(['pod-0', 'pod-1', 'pod-2'], [pod.name for pod in pods])
+    self.assertEqual(
+        [mock.call(limit=base.DEFAULT_LIST_CHUNK_SIZE, _continue=None),
+         mock.call(limit=base.DEFAULT_LIST_CHUNK_SIZE, _continue='token')],
+        mock_k8s_api_func.call_args_list)
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testClusterListRecords(self, mock_k8s_api):
+    """Test that raw list responses are parsed into records."""
+    mock_k8s_api_func = mock_k8s_api.return_value.list_namespaced_pod
+    mock_k8s_api_func.side_effect = [
+        mock.Mock(data=json.dumps({
+            'metadata': {'continue': 'token'},
+            'items': [{
+                'metadata': {
+                    'name': 'pod-0', 'namespace': 'default',
+                    'labels': {'app': 'web'}},
+                'spec': {'nodeName': 'node-0'},
+                'status': {'phase': 'Running'},
+            }]}).encode()),
+        mock.Mock(data=json.dumps({
+            'metadata': {},
+            'items': [{'metadata': {'name': 'pod-1', 'namespace': 'default'}}]
+        }).encode()),
+    ]
+
+    records = list(k8s_cluster.K8sCluster(
+        api_client=k8s_mocks.MOCK_API_CLIENT).ListRecords(
+            snapshot.PODS, namespace='default',
+            field_selector='status.phase=Running'))
+
+    self.assertEqual([
+        base.K8sObjectRecord('pod-0', 'default', {'app': 'web'}, 'node-0',
+                             'Running'),
+        base.K8sObjectRecord('pod-1', 'default', {}, None, None),
+    ], records)
+    self.assertEqual(2, mock_k8s_api_func.call_count)
+    mock_k8s_api_func.assert_called_with(
+        'default', limit=base.DEFAULT_LIST_CHUNK_SIZE, _continue='token',
+        _preload_content=False, field_selector='status.phase=Running')
 
 
 class K8sNodeTest(unittest.TestCase):
@@ -158,6 +220,106 @@ class K8sNodeTest(unittest.TestCase):
         set(pod.name for pod in pods),
         set(pod.metadata.name for pod in mock_pods.items))
 
+  @typing.no_type_check
+  @mock.patch.object(base, 'EVICTION_RETRY_INTERVAL', 0)
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testNodeDrain(self, mock_k8s_api):
+    """Test that a node's pods are evicted and results are reported."""
+    mock_k8s_api.return_value.list_pod_for_all_namespaces.return_value = (
+        client.V1PodList(items=[
+            k8s_mocks.V1Pod('pod-{0:d}'.format(i), 'default')
+            for i in range(4)
+        ]))
+    mock_evict = mock_k8s_api.return_value.create_namespaced_pod_eviction
+
+    def Evict(name, namespace, body):
+      self.assertEqual(name, body.metadata.name)
+      if name == 'pod-1':
+        raise client.ApiException(status=429)
+      if name == 'pod-2':
+        raise client.ApiException(status=500)
+      return namespace
+
+    mock_evict.side_effect = Evict
+    node = base.K8sNode(k8s_mocks.MOCK_API_CLIENT, 'fake-node-name')
+    results = node.Drain(
+        lambda pod: pod.name != 'pod-3', evict=True, eviction_timeout=0)
+
+    self.assertEqual({
+        'default/pod-0': base.POD_EVICTED,
+        'default/pod-1': base.POD_EVICTION_BLOCKED,
+        'default/pod-2': base.POD_REMOVAL_FAILED,
+    }, results)
+    self.assertEqual(3, mock_evict.call_count)
+    mock_k8s_api.return_value.delete_namespaced_pod.assert_not_called()
+
+    # Pods are deleted by default
+    mock_evict.reset_mock()
+    results = node.Drain(lambda pod: pod.name == 'pod-3')
+    self.assertEqual({'default/pod-3': base.POD_DELETED}, results)
+    mock_evict.assert_not_called()
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testDrainPodsUnexpectedError(self, mock_k8s_api):
+    """Test that a pod failing outside of the API is reported, not raised."""
+
+    def Delete(name, namespace):
+      if name == 'pod-1':
+        raise ConnectionError('connection reset')
+      return namespace
+
+    mock_k8s_api.return_value.delete_namespaced_pod.side_effect = Delete
+    pods = [
+        base.K8sPod(k8s_mocks.MOCK_API_CLIENT, 'pod-{0:d}'.format(i), 'default')
+        for i in range(3)
+    ]
+
+    results = base.DrainPods(pods, evict=False)
+
+    self.assertEqual({
+        'default/pod-0': base.POD_DELETED,
+        'default/pod-1': base.POD_REMOVAL_FAILED,
+        'default/pod-2': base.POD_DELETED,
+    }, results)
+
+
+class LabelPodsTest(unittest.TestCase):
+  """Test concurrent pod labelling."""
+
+  @typing.no_type_check
+  @mock.patch.object(base, 'LABEL_RETRY_INTERVAL', 0)
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testLabelPods(self, mock_k8s_api):
+    """Test that conflicts are retried and unlabelled pods are reported."""
+    conflicts = []
+
+    def Patch(name, namespace, body):
+      if name == 'pod-1' and not conflicts:
+        conflicts.append(name)
+        raise client.ApiException(status=409)
+      if name == 'pod-2':
+        raise client.ApiException(status=404)
+      if name == 'pod-3':
+        raise client.ApiException(status=403)
+      if name == 'pod-5':
+        raise ConnectionError('connection reset')
+      labels = body['metadata']['labels'] if name != 'pod-4' else {}
+      return k8s_mocks.V1Pod(name, namespace, labels=labels)
+
+    mock_patch = mock_k8s_api.return_value.patch_namespaced_pod
+    mock_patch.side_effect = Patch
+    pods = [
+        base.K8sPod(k8s_mocks.MOCK_API_CLIENT, 'pod-{0:d}'.format(i), 'default')
+        for i in range(6)
+    ]
+
+    unlabelled = base.LabelPods(pods, {'quarantine': 'true'})
+
+    self.assertEqual(['pod-3', 'pod-4', 'pod-5'],
+                     sorted(pod.name for pod in unlabelled))
+    self.assertEqual(7, mock_patch.call_count)
+
 
 class K8sPodTest(unittest.TestCase):
   """Test K8sPod functionality, mainly checking API calls."""
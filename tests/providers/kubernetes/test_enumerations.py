@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test on Kubernetes enumerations."""
+
+import io
+import json
+import threading
+import typing
+import unittest
+from typing import Any, Dict, Iterable, Optional
+
+import mock
+
+from libcloudforensics import errors
+from libcloudforensics.providers.gcp.internal import gke
+from libcloudforensics.providers.kubernetes.enumerations import base
+from libcloudforensics.providers.kubernetes.enumerations import gcp
+
+
+class FakeEnumeration(base.Enumeration[str]):
+  """Enumeration of a fake tree, in which each object has `width` children."""
+
+  def __init__(self, name: str, depth: int, width: int = 3) -> None:
+    super().__init__(name)
+    self._depth = depth
+    self._width = width
+
+  @property
+  def keyword(self) -> str:
+    """Override of abstract property."""
+    return 'Level{0:d}'.format(self._depth)
+
+  def _Children(
+      self, namespace: Optional[str] = None) -> Iterable[base.Enumeration[Any]]:
+    """Method override."""
+    if self._depth == 0:
+      return []
+    return [
+        FakeEnumeration(
+            '{0:s}.{1:d}'.format(self._object, i), self._depth - 1, self._width)
+        for i in range(self._width)
+    ]
+
+  def _Populate(self, info: Dict[str, Any], warnings: Dict[str, Any]) -> None:
+    """Method override."""
+    info['Name'] = self._object
+    warnings['Namespace'] = None
+
+
+class EnumerationTest(unittest.TestCase):
+  """Test Enumeration functionality."""
+
+  @typing.no_type_check
+  def testStream(self):
+    """Test that each object is streamed once, with its parent's id."""
+    records = list(FakeEnumeration('root', 2).Stream(max_workers=4))
+
+    # 1 root, 3 children and 9 grandchildren
+    self.assertEqual(13, len(records))
+    self.assertEqual(
+        {'Id': 0, 'ParentId': None, 'Kind': 'Level2', 'Name': 'root',
+         'Namespace': None},
+        records[0])
+    names_by_id = {record['Id']: record['Name'] for record in records}
+    self.assertEqual(13, len(names_by_id))
+    for record in records[1:]:
+      self.assertEqual(
+          names_by_id[record['ParentId']], record['Name'].rsplit('.', 1)[0])
+
+  @typing.no_type_check
+  def testWriteNdjson(self):
+    """Test that records are written as newline-delimited JSON."""
+    output = io.StringIO()
+    count = FakeEnumeration('root', 1).WriteNdjson(output)
+
+    lines = output.getvalue().splitlines()
+    self.assertEqual(4, count)
+    self.assertEqual(4, len(lines))
+    names = [json.loads(line)['Name'] for line in lines]
+    # Siblings are evaluated concurrently, in any order
+    self.assertEqual('root', names[0])
+    self.assertEqual(['root.0', 'root.1', 'root.2'], sorted(names[1:]))
+
+
+class GkeFleetEnumerationTest(unittest.TestCase):
+  """Test GkeFleetEnumeration functionality."""
+
+  @typing.no_type_check
+  @mock.patch.object(gcp.GkeClusterEnumeration, 'Stream')
+  @mock.patch.object(gke, 'GkeCluster')
+  @mock.patch.object(gke.GoogleKubernetesEngine, 'ListClusters')
+  def testSearch(self, mock_list_clusters, mock_gke_cluster, mock_stream):
+    """Test that the records of all clusters are merged and searchable."""
+    mock_list_clusters.side_effect = [
+        [{'name': 'cluster-a', 'location': 'zone-a'},
+         {'name': 'cluster-b', 'location': 'zone-b'}],
+        errors.ResourceNotFoundError('Permission denied', __name__),
+        [{'name': 'cluster-c', 'location': 'zone-c'}],
+    ]
+
+    def GkeCluster(project_id, location, cluster_id):
+      if cluster_id == 'cluster-c':
+        raise errors.ResourceNotFoundError('Cluster not found', __name__)
+      return mock.Mock(project_id=project_id, location=location)
+    mock_gke_cluster.side_effect = GkeCluster
+    mock_stream.side_effect = lambda namespace: iter([
+        {'Id': 0, 'ParentId': None, 'Kind': 'GkeCluster', 'Name': 'cluster'},
+        {'Id': 1, 'ParentId': 0, 'Kind': 'Pod', 'Name': 'pod-a'},
+        {'Id': 2, 'ParentId': 0, 'Kind': 'Pod', 'Name': 'pod-b'},
+    ])
+
+    fleet = gcp.GkeFleetEnumeration(['project-1', 'project-2', 'project-3'])
+    records = sorted(fleet.Search(kind='Pod', name='pod-a'),
+                     key=lambda record: record['Cluster'])
+
+    self.assertEqual(3, mock_list_clusters.call_count)
+    self.assertEqual(
+        [('cluster-a', 'zone-a', 'Pod'), ('cluster-b', 'zone-b', 'Pod'),
+         ('cluster-c', 'zone-c', 'Error')],
+        [(record['Cluster'], record['Location'], record['Kind'])
+         for record in records])
+    self.assertEqual('project-1', records[0]['Project'])
+    self.assertEqual('project-3', records[2]['Project'])
+    self.assertIn('Cluster not found', records[2]['Error'])
+
+  @typing.no_type_check
+  @mock.patch.object(gcp, 'FLEET_POLL_INTERVAL', 0.05)
+  @mock.patch.object(gcp.GkeClusterEnumeration, 'Stream')
+  @mock.patch.object(gke, 'GkeCluster')
+  @mock.patch.object(gke.GoogleKubernetesEngine, 'ListClusters')
+  def testStreamHungCluster(
+      self, mock_list_clusters, mock_gke_cluster, mock_stream):
+    """Test that a hung cluster is abandoned without blocking the fleet."""
+    mock_list_clusters.return_value = [
+        {'name': 'cluster-a', 'location': 'zone-a'},
+        {'name': 'cluster-b', 'location': 'zone-b'}]
+    mock_gke_cluster.side_effect = (
+        lambda project_id, location, cluster_id: cluster_id)
+    release = threading.Event()
+
+    def Stream(namespace):  # pylint: disable=unused-argument
+      yield {'Id': 0, 'ParentId': None, 'Kind': 'GkeCluster', 'Name': 'gke'}
+      # Blocks like an API call that never returns
+      release.wait()
+
+    mock_stream.side_effect = Stream
+    fleet = gcp.GkeFleetEnumeration(['project-1'], cluster_timeout=1)
+    try:
+      records = list(fleet.Stream())
+    finally:
+      release.set()
+
+    self.assertEqual(
+        [('cluster-a', 'Error'), ('cluster-a', 'GkeCluster'),
+         ('cluster-b', 'Error'), ('cluster-b', 'GkeCluster')],
+        sorted((record['Cluster'], record['Kind']) for record in records))
+    self.assertIn('timed out', records[-1]['Error'])
+
+
+if __name__ == '__main__':
+  unittest.main()
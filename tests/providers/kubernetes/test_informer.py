@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test on the Kubernetes informer cache."""
+
+import typing
+import unittest
+
+import mock
+from kubernetes import client
+
+import libcloudforensics.providers.kubernetes.cluster as k8s_cluster
+from libcloudforensics.providers.kubernetes import informer
+from libcloudforensics.providers.kubernetes import snapshot
+from tests.providers.kubernetes import k8s_mocks
+
+
+def _PodList(*pods: client.V1Pod) -> client.V1PodList:
+  """Makes a pod list response with a resource version."""
+  return client.V1PodList(
+      items=list(pods), metadata=client.V1ListMeta(resource_version='10'))
+
+
+@typing.no_type_check
+def _MockEmptyLists(mock_core_api, mock_apps_api, mock_networking_api):
+  """Makes the mocked APIs return empty lists of objects."""
+  core_api = mock_core_api.return_value
+  core_api.list_node.return_value = client.V1NodeList(items=[])
+  core_api.list_service_for_all_namespaces.return_value = (
+      client.V1ServiceList(items=[]))
+  apps_api = mock_apps_api.return_value
+  apps_api.list_deployment_for_all_namespaces.return_value = (
+      client.V1DeploymentList(items=[]))
+  apps_api.list_replica_set_for_all_namespaces.return_value = (
+      client.V1ReplicaSetList(items=[]))
+  mock_networking_api.return_value.list_network_policy_for_all_namespaces.return_value = (  # pylint: disable=line-too-long
+      client.V1NetworkPolicyList(items=[]))
+
+
+class K8sClusterInformerTest(unittest.TestCase):
+  """Test K8sClusterInformer functionality."""
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.NetworkingV1Api')
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testApplyEvent(self, mock_core_api, mock_apps_api, mock_networking_api):
+    """Test that watch events update the cache and its indexes."""
+    # pylint: disable=protected-access
+    _MockEmptyLists(mock_core_api, mock_apps_api, mock_networking_api)
+    core_api = mock_core_api.return_value
+    core_api.list_pod_for_all_namespaces.return_value = _PodList(
+        k8s_mocks.V1Pod('pod-a', 'default', 'node-0', {'app': 'web'}))
+    cache = informer.K8sClusterInformer(k8s_mocks.MOCK_API_CLIENT)
+
+    new_pod = k8s_mocks.V1Pod('pod-b', 'default', 'node-0', {'app': 'web'})
+    new_pod.metadata.resource_version = '11'
+    cache._ApplyEvent(snapshot.PODS, {'type': 'ADDED', 'object': new_pod})
+    self.assertEqual(
+        ['pod-a', 'pod-b'],
+        [pod.name for pod in cache.ListPods(labels={'app': 'web'})])
+
+    moved_pod = k8s_mocks.V1Pod('pod-a', 'default', 'node-1', {'app': 'db'})
+    moved_pod.metadata.resource_version = '12'
+    cache._ApplyEvent(
+        snapshot.PODS, {'type': 'MODIFIED', 'object': moved_pod})
+    self.assertEqual(
+        ['pod-b'], [pod.name for pod in cache.ListPods(node_name='node-0')])
+    self.assertEqual(
+        'node-1', cache.ListPods(labels={'app': 'db'})[0].GetNode().name)
+
+    cache._ApplyEvent(snapshot.PODS, {'type': 'DELETED', 'object': new_pod})
+    cache._ApplyEvent(snapshot.PODS, {
+        'type': 'BOOKMARK',
+        'raw_object': {'metadata': {'resourceVersion': '20'}}
+    })
+    self.assertEqual(['pod-a'], [pod.name for pod in cache.ListPods()])
+    self.assertEqual('20', cache._resource_versions[snapshot.PODS])
+    core_api.read_namespaced_pod.assert_not_called()
+
+  @typing.no_type_check
+  @mock.patch('libcloudforensics.providers.kubernetes.informer.watch.Watch')
+  @mock.patch('kubernetes.client.NetworkingV1Api')
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testWatchExpiredResourceVersion(
+      self, mock_core_api, mock_apps_api, mock_networking_api, mock_watch):
+    """Test that objects are listed again when the watch expired."""
+    # pylint: disable=protected-access
+    _MockEmptyLists(mock_core_api, mock_apps_api, mock_networking_api)
+    core_api = mock_core_api.return_value
+    core_api.list_pod_for_all_namespaces.return_value = _PodList()
+    cache = informer.K8sClusterInformer(k8s_mocks.MOCK_API_CLIENT)
+    core_api.list_pod_for_all_namespaces.return_value = _PodList(
+        k8s_mocks.V1Pod('pod-a', 'default', 'node-0'))
+
+    def Stream(*unused_args, **unused_kwargs):
+      # Stop the informer after the first watch request
+      cache._stop_event.set()
+      raise client.ApiException(status=informer.HTTP_STATUS_GONE)
+    mock_watch.return_value.stream.side_effect = Stream
+
+    cache._Watch(snapshot.PODS, core_api.list_pod_for_all_namespaces)
+
+    self.assertEqual(
+        '10', mock_watch.return_value.stream.call_args[1]['resource_version'])
+    self.assertEqual(['pod-a'], [pod.name for pod in cache.ListPods()])
+
+  @typing.no_type_check
+  @mock.patch.object(informer.threading, 'Thread')
+  @mock.patch('kubernetes.client.NetworkingV1Api')
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testRestart(
+      self, mock_core_api, mock_apps_api, mock_networking_api, mock_thread):
+    """Test that the watches of a previous start stay stopped."""
+    _MockEmptyLists(mock_core_api, mock_apps_api, mock_networking_api)
+    mock_core_api.return_value.list_pod_for_all_namespaces.return_value = (
+        _PodList())
+    cache = informer.K8sClusterInformer(k8s_mocks.MOCK_API_CLIENT)
+
+    cache.Start()
+    first_events = {
+        call[1]['args'][2] for call in mock_thread.call_args_list}
+    cache.Stop()
+    mock_thread.reset_mock()
+    cache.Start()
+    second_events = {
+        call[1]['args'][2] for call in mock_thread.call_args_list}
+
+    self.assertEqual(1, len(first_events))
+    self.assertTrue(first_events.pop().is_set())
+    self.assertFalse(second_events.pop().is_set())
+
+
+# Make K8sCluster instantiable
+@mock.patch.object(k8s_cluster.K8sCluster, '__abstractmethods__', ())
+class K8sClusterCacheTest(unittest.TestCase):
+  """Test the informer cache of K8sCluster."""
+
+  # pylint: disable=abstract-class-instantiated
+
+  @typing.no_type_check
+  @mock.patch.object(informer.K8sClusterInformer, 'Start')
+  @mock.patch('kubernetes.client.NetworkingV1Api')
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testClusterCache(
+      self, mock_core_api, mock_apps_api, mock_networking_api, mock_start):
+    """Test that the cluster reads from the cache once enabled."""
+    _MockEmptyLists(mock_core_api, mock_apps_api, mock_networking_api)
+    core_api = mock_core_api.return_value
+    core_api.list_pod_for_all_namespaces.return_value = _PodList(
+        k8s_mocks.V1Pod('pod-a', 'default', 'node-0', {'app': 'web'}))
+    cluster = k8s_cluster.K8sCluster(api_client=k8s_mocks.MOCK_API_CLIENT)
+
+    cluster.EnableCache()
+    mock_start.assert_called_once()
+    for _ in range(3):
+      pods = cluster.ListPods(namespace='default')
+      self.assertEqual({'app': 'web'}, pods[0].GetLabels())
+    self.assertEqual(
+        'node-0', cluster.GetPod('pod-a', 'default').GetNode().name)
+    self.assertIsNotNone(cluster.FindWorkload('pod-a', 'default'))
+
+    core_api.list_pod_for_all_namespaces.assert_called_once()
+    core_api.list_namespaced_pod.assert_not_called()
+    core_api.read_namespaced_pod.assert_not_called()
+
+
+if __name__ == '__main__':
+  unittest.main()
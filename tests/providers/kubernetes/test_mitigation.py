@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test on Kubernetes mitigation functions."""
+
+import typing
+import unittest
+
+import mock
+from kubernetes import client
+
+from libcloudforensics.providers.kubernetes import base
+from libcloudforensics.providers.kubernetes import mitigation
+from libcloudforensics.providers.kubernetes import workloads
+from tests.providers.kubernetes import k8s_mocks
+
+
+class DrainWorkloadNodesTest(unittest.TestCase):
+  """Test draining the nodes of a workload."""
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testDrainWorkloadNodesFromOtherPods(self, mock_core_api, mock_apps_api):
+    """Test that only the pods outside of the workload are removed."""
+    replica_set = k8s_mocks.V1ReplicaSet('fake-rs', 'default')
+    replica_set.spec.selector = client.V1LabelSelector(
+        match_labels={'app': 'fake'})
+    mock_apps_api.return_value.read_namespaced_replica_set.return_value = (
+        replica_set)
+    core_api = mock_core_api.return_value
+    core_api.list_namespaced_pod.return_value = client.V1PodList(items=[
+        k8s_mocks.V1Pod('fake-rs-1', 'default', 'node-0', {'app': 'fake'})])
+    core_api.list_pod_for_all_namespaces.return_value = client.V1PodList(
+        items=[
+            k8s_mocks.V1Pod('fake-rs-1', 'default', 'node-0', {'app': 'fake'}),
+            # Created by the workload after its pods were listed
+            k8s_mocks.V1Pod('fake-rs-2', 'default', 'node-0', {'app': 'fake'}),
+            k8s_mocks.V1Pod('other', 'default', 'node-0', {'app': 'other'}),
+            k8s_mocks.V1Pod('system', 'kube-system', 'node-0', {'app': 'fake'}),
+        ])
+
+    workload = workloads.K8sReplicaSet(
+        k8s_mocks.MOCK_API_CLIENT, 'fake-rs', 'default')
+    results = mitigation.DrainWorkloadNodesFromOtherPods(workload)
+
+    self.assertEqual({
+        'default/other': base.POD_EVICTED,
+        'kube-system/system': base.POD_EVICTED,
+    }, results)
+    core_api.patch_node.assert_called_once_with(
+        'node-0', {'spec': {'unschedulable': True}})
+    # The pods on the node are not read one by one
+    core_api.read_namespaced_pod.assert_not_called()
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testDrainPodNodeFromOtherPods(self, mock_core_api):
+    """Test draining the node of a pod, reporting the pods not removed."""
+    core_api = mock_core_api.return_value
+    core_api.read_namespaced_pod.return_value = k8s_mocks.V1Pod(
+        'fake-pod', 'default', 'node-0')
+    core_api.list_pod_for_all_namespaces.return_value = client.V1PodList(
+        items=[
+            k8s_mocks.V1Pod('fake-pod', 'default', 'node-0'),
+            k8s_mocks.V1Pod('other-1', 'default', 'node-0'),
+            k8s_mocks.V1Pod('other-2', 'default', 'node-0'),
+        ])
+
+    def Delete(name, namespace):
+      if name == 'other-2':
+        raise ConnectionError('connection reset')
+      return namespace
+
+    core_api.delete_namespaced_pod.side_effect = Delete
+    workload = base.K8sPod(k8s_mocks.MOCK_API_CLIENT, 'fake-pod', 'default')
+    with self.assertLogs(mitigation.logger, level='WARNING') as logs:
+      results = mitigation.DrainWorkloadNodesFromOtherPods(
+          workload, cordon=False, evict=False)
+
+    self.assertEqual({
+        'default/other-1': base.POD_DELETED,
+        'default/other-2': base.POD_REMOVAL_FAILED,
+    }, results)
+    self.assertIn('default/other-2', logs.output[-1])
+    core_api.patch_node.assert_not_called()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test on Kubernetes label selectors and label index."""
+
+import typing
+import unittest
+
+from kubernetes import client
+
+from libcloudforensics.providers.kubernetes import selector
+
+LABEL_SELECTOR = client.V1LabelSelector(
+    match_labels={'app': 'web'},
+    match_expressions=[
+        client.V1LabelSelectorRequirement(
+            key='tier', operator='In', values=['frontend', 'backend']),
+        client.V1LabelSelectorRequirement(
+            key='track', operator='NotIn', values=['canary']),
+        client.V1LabelSelectorRequirement(key='team', operator='Exists'),
+        client.V1LabelSelectorRequirement(
+            key='quarantineId', operator='DoesNotExist'),
+    ])
+
+PODS_LABELS = {
+    'matching': {'app': 'web', 'tier': 'frontend', 'team': 'a'},
+    'matching-stable': {
+        'app': 'web', 'tier': 'backend', 'team': 'b', 'track': 'stable'},
+    'canary': {
+        'app': 'web', 'tier': 'frontend', 'team': 'a', 'track': 'canary'},
+    'other-tier': {'app': 'web', 'tier': 'db', 'team': 'a'},
+    'no-team': {'app': 'web', 'tier': 'frontend'},
+    'quarantined': {
+        'app': 'web', 'tier': 'frontend', 'team': 'a', 'quarantineId': 'x'},
+    'other-app': {'app': 'db', 'tier': 'frontend', 'team': 'a'},
+}
+
+
+class K8sSelectorTest(unittest.TestCase):
+  """Test label selector matching."""
+
+  @typing.no_type_check
+  def testFromLabelSelector(self):
+    """Test that label selectors are converted to API keywords."""
+    self.assertEqual(
+        {
+            'label_selector':
+                'app=web,tier in (frontend,backend),track notin (canary),'
+                'team,!quarantineId'
+        },
+        selector.K8sSelector.FromLabelSelector(LABEL_SELECTOR).ToKeywords())
+
+  @typing.no_type_check
+  def testMatchesLabelSelector(self):
+    """Test that labels are matched against matchLabels and expressions."""
+    matching = {
+        name for name, labels in PODS_LABELS.items()
+        if selector.MatchesLabelSelector(LABEL_SELECTOR, labels)}
+    self.assertEqual({'matching', 'matching-stable'}, matching)
+
+  @typing.no_type_check
+  def testLabelIndex(self):
+    """Test that the label index resolves selectors like the matcher."""
+    index = selector.LabelIndex()
+    for name, labels in PODS_LABELS.items():
+      index.Add(name, labels)
+    self.assertEqual(
+        {'matching', 'matching-stable'}, index.Select(LABEL_SELECTOR))
+    self.assertEqual(
+        {'matching'},
+        index.Select(LABEL_SELECTOR, candidates={'matching', 'canary'}))
+
+    index.Remove('matching', PODS_LABELS['matching'])
+    self.assertEqual({'matching-stable'}, index.Select(LABEL_SELECTOR))
+    self.assertEqual(
+        set(PODS_LABELS) - {'matching', 'other-app'},
+        index.Select(client.V1LabelSelector(match_labels={'app': 'web'})))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Test on Kubernetes cluster snapshots."""
+
+import typing
+import unittest
+
+import mock
+from kubernetes import client
+
+from libcloudforensics.providers.kubernetes import snapshot
+from libcloudforensics.providers.kubernetes.enumerations import base as enumerations  # pylint: disable=line-too-long
+from tests.providers.kubernetes import k8s_mocks
+
+
+class K8sClusterSnapshotTest(unittest.TestCase):
+  """Test K8sClusterSnapshot functionality."""
+
+  @typing.no_type_check
+  def _MockApis(self, mock_core_api, mock_apps_api, mock_networking_api):
+    """Sets up the list responses of the mocked APIs."""
+    core_api = mock_core_api.return_value
+    core_api.list_node.return_value = client.V1NodeList(
+        items=[k8s_mocks.V1Node('node-0'), k8s_mocks.V1Node('node-1')])
+    core_api.list_pod_for_all_namespaces.return_value = client.V1PodList(
+        items=[
+            k8s_mocks.V1Pod('pod-a', 'default', 'node-0', {'app': 'web'}),
+            k8s_mocks.V1Pod('pod-b', 'default', 'node-1', {'app': 'web'}),
+            k8s_mocks.V1Pod('pod-c', 'default', 'node-0', {'app': 'db'}),
+            k8s_mocks.V1Pod('pod-d', 'other', 'node-0', {'app': 'web'}),
+        ])
+    core_api.list_service_for_all_namespaces.return_value = (
+        client.V1ServiceList(items=[]))
+    apps_api = mock_apps_api.return_value
+    apps_api.list_deployment_for_all_namespaces.return_value = (
+        client.V1DeploymentList(items=[]))
+    apps_api.list_replica_set_for_all_namespaces.return_value = (
+        client.V1ReplicaSetList(items=[k8s_mocks.V1ReplicaSet(
+            'rs', 'default', {'app': 'web'})]))
+    apps_api.list_replica_set_for_all_namespaces.return_value.items[
+        0].spec.selector = client.V1LabelSelector(match_labels={'app': 'web'})
+    mock_networking_api.return_value.list_network_policy_for_all_namespaces.return_value = k8s_mocks.V1NetworkPolicyList(  # pylint: disable=line-too-long
+        2, 'default')
+    return core_api
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.NetworkingV1Api')
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testSnapshotIndexes(
+      self, mock_core_api, mock_apps_api, mock_networking_api):
+    """Test that pods are resolved from the snapshot's indexes."""
+    self._MockApis(mock_core_api, mock_apps_api, mock_networking_api)
+    cluster_snapshot = snapshot.K8sClusterSnapshot(k8s_mocks.MOCK_API_CLIENT)
+
+    node = cluster_snapshot.FindNode('node-0')
+    self.assertEqual(
+        ['pod-a', 'pod-c', 'pod-d'], [pod.name for pod in node.ListPods()])
+    self.assertEqual(
+        ['pod-a', 'pod-c'],
+        [pod.name for pod in node.ListPods(namespace='default')])
+    self.assertIsNone(cluster_snapshot.FindNode('node-2'))
+
+    replica_set = cluster_snapshot.FindWorkload('rs', 'default')
+    self.assertEqual(
+        ['pod-a', 'pod-b'],
+        [pod.name for pod in replica_set.GetCoveredPods()])
+    self.assertEqual(
+        {'node-0', 'node-1'},
+        {node.name for node in replica_set.GetCoveredNodes()})
+    self.assertEqual(2, len(cluster_snapshot.ListNetworkPolicies('default')))
+
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.NetworkingV1Api')
+  @mock.patch('kubernetes.client.AppsV1Api')
+  @mock.patch('kubernetes.client.CoreV1Api')
+  def testClusterEnumerationUsesSnapshot(
+      self, mock_core_api, mock_apps_api, mock_networking_api):
+    """Test that enumerating a cluster does not read objects one by one."""
+    core_api = self._MockApis(
+        mock_core_api, mock_apps_api, mock_networking_api)
+    owned_replica_set = k8s_mocks.V1ReplicaSet('web-1234', 'default')
+    owned_replica_set.metadata.owner_references = [client.V1OwnerReference(
+        api_version='apps/v1', kind='Deployment', name='web', uid='1')]
+    mock_apps_api.return_value.list_replica_set_for_all_namespaces.return_value.items.append(  # pylint: disable=line-too-long
+        owned_replica_set)
+    mock_cluster = mock.Mock()
+    mock_cluster.Snapshot.return_value = snapshot.K8sClusterSnapshot(
+        k8s_mocks.MOCK_API_CLIENT)
+
+    result = enumerations.ClusterEnumeration(mock_cluster).ToJson()
+
+    self.assertEqual(2, len(result['Node']))
+    self.assertEqual(3, len(result['Node'][0]['Pod']))
+    self.assertEqual('node-0', result['Node'][0]['Pod'][0]['NodeName'])
+    # Workloads only name their pods, which are enumerated under the nodes
+    self.assertEqual(
+        [{'Name': 'rs', 'Namespace': 'default', 'Pods': ['pod-a', 'pod-b']}],
+        result['Workload'])
+    mock_cluster.Snapshot.assert_called_once()
+    core_api.read_node.assert_not_called()
+    core_api.read_namespaced_pod.assert_not_called()
+    core_api.list_pod_for_all_namespaces.assert_called_once()
+
+
+if __name__ == '__main__':
+  unittest.main()
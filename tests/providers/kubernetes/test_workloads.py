@@ -77,6 +77,26 @@ class K8sWorkloadTest(unittest.TestCase):
       mock_pod_read.return_value = mock_pod_response
       self.assertFalse(workload.IsCoveringPod(mock_pod))
 
+  @typing.no_type_check
+  def testIsCoveringListedPods(self, workload_pod_match_labels):
+    """Test that listed pods are matched without reading them."""
+    workload_pod_match_labels.return_value = self.mock_match_labels
+    workload = workloads.K8sControlledWorkload(
+        k8s_mocks.MOCK_API_CLIENT, 'name', 'namespace')
+    pods = [
+        base.K8sPod(k8s_mocks.MOCK_API_CLIENT, 'pod-a', 'namespace',
+                    labels=self.mock_match_labels),
+        base.K8sPod(k8s_mocks.MOCK_API_CLIENT, 'pod-b', 'namespace',
+                    labels={}),
+    ]
+
+    with mock.patch.object(base.K8sPod, 'Read') as mock_pod_read:
+      self.assertEqual(
+          [True, False], [workload.IsCoveringPod(pod) for pod in pods])
+      mock_pod_read.assert_not_called()
+    # The label selector of the workload is only resolved once
+    workload_pod_match_labels.assert_called_once()
+
   @typing.no_type_check
   @mock.patch('kubernetes.client.CoreV1Api.list_namespaced_pod')
   def testListPodWithCorrectArgs(
@@ -91,6 +111,27 @@ class K8sWorkloadTest(unittest.TestCase):
     mock_list_pod.assert_called_with(
         'namespace-xdwvkhrj', label_selector='app=nginx-klzkdoho')
 
+  @typing.no_type_check
+  @mock.patch('kubernetes.client.CoreV1Api.read_namespaced_pod')
+  @mock.patch('kubernetes.client.CoreV1Api.list_namespaced_pod')
+  def testGetCoveredNodes(
+      self, mock_list_pod, mock_read_pod, workload_pod_match_labels):
+    """Test that covered nodes are read from a single pod listing."""
+    workload_pod_match_labels.return_value = self.mock_match_labels
+    workload = workloads.K8sControlledWorkload(
+        k8s_mocks.MOCK_API_CLIENT, 'name', 'namespace')
+    mock_list_pod.return_value.items = [
+        k8s_mocks.V1Pod('pod-0', 'namespace', 'node-0'),
+        k8s_mocks.V1Pod('pod-1', 'namespace', 'node-1'),
+        k8s_mocks.V1Pod('pod-2', 'namespace', 'node-0'),
+    ]
+
+    nodes = workload.GetCoveredNodes()
+
+    self.assertEqual(['node-0', 'node-1'], [node.name for node in nodes])
+    mock_list_pod.assert_called_once()
+    mock_read_pod.assert_not_called()
+
 
 class K8sDeploymentTest(unittest.TestCase):
   """Test K8sDeployment API calls and necessary supporting functions."""
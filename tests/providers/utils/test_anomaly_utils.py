@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the utils module - anomaly_utils.py"""
+
+import statistics
+import typing
+import unittest
+
+from libcloudforensics.providers.utils import anomaly_utils
+
+# Alternating values, with a mean of 50 and a standard deviation of 1
+FAKE_BASELINE = [50.0 + (-1) ** i for i in range(100)]
+
+
+class AnomalyUtilsTest(unittest.TestCase):
+  """Test the anomaly detection functions."""
+
+  @typing.no_type_check
+  def testRollingZScores(self):
+    """Test that points are scored against the preceding window."""
+    values = FAKE_BASELINE + [60.0]
+    z_scores = anomaly_utils.RollingZScores(values, window=10)
+
+    self.assertEqual([None] * 10, z_scores[:10])
+    self.assertAlmostEqual(1.0, abs(z_scores[50]), places=3)
+    window = values[-11:-1]
+    self.assertAlmostEqual(
+        (values[-1] - statistics.mean(window)) / statistics.pstdev(window),
+        z_scores[-1], places=3)
+
+    # A spike after a flat baseline gets the maximum score
+    self.assertEqual(
+        anomaly_utils.MAX_Z_SCORE,
+        anomaly_utils.RollingZScores([0.0] * 10 + [1.0], window=10)[-1])
+    # Unless the baseline has a minimum standard deviation
+    self.assertAlmostEqual(10.0, anomaly_utils.RollingZScores(
+        [0.0] * 10 + [1.0], window=10, min_stddev=0.1)[-1])
+
+  @typing.no_type_check
+  def testChangePoints(self):
+    """Test that shifts of the mean are found."""
+    values = FAKE_BASELINE + [value + 20 for value in FAKE_BASELINE] + [
+        value - 20 for value in FAKE_BASELINE]
+    self.assertEqual([100, 200], anomaly_utils.ChangePoints(values))
+    self.assertEqual([], anomaly_utils.ChangePoints(FAKE_BASELINE))
+    self.assertEqual([], anomaly_utils.ChangePoints(
+        [0.0] * 50 + [0.1] * 50, min_stddev=1.0))
+
+  @typing.no_type_check
+  def testAnalyzeSeries(self):
+    """Test that a series with a spike is flagged."""
+    values = FAKE_BASELINE + [70.0] + FAKE_BASELINE
+    timestamps = ['t{0:d}'.format(i) for i in range(len(values))]
+    analysis = anomaly_utils.AnalyzeSeries(timestamps, values)
+
+    self.assertTrue(analysis['flagged'])
+    self.assertEqual(1, analysis['anomalous_points'])
+    self.assertEqual('t100', analysis['max_z_timestamp'])
+    self.assertEqual([], analysis['change_points'])
+    self.assertFalse(
+        anomaly_utils.AnalyzeSeries(timestamps[:100], FAKE_BASELINE)['flagged'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the utils module - download_utils.py"""
+
+import hashlib
+import os
+import tempfile
+import typing
+import unittest
+
+import mock
+
+from libcloudforensics import errors
+from libcloudforensics.providers.utils import download_utils
+
+
+class DownloadRangesTest(unittest.TestCase):
+  """Test the DownloadRanges function."""
+
+  @typing.no_type_check
+  def testDownloadRanges(self):
+    """Test that ranges are written in place and hashed with the holes."""
+    content = bytearray(4096)
+    content[1024:2048] = b'a' * 1024
+    content[3072:] = b'b' * 1024
+    ranges = [(1024, 512), (1536, 512), (3072, 1024)]
+    hasher = hashlib.sha256()
+    source = {'path': 'fake-path', 'size': len(content)}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      output_path = os.path.join(tmp_dir, 'fake.img')
+      download_utils.DownloadRanges(
+          output_path, len(content), ranges,
+          lambda offset, length: bytes(content[offset:offset + length]),
+          source, max_workers=2, update_hash=hasher.update)
+
+      with open(output_path, 'rb') as output_file:
+        self.assertEqual(bytes(content), output_file.read())
+      self.assertEqual(hashlib.sha256(content).hexdigest(), hasher.hexdigest())
+      self.assertFalse(os.path.exists(
+          output_path + download_utils.PROGRESS_SUFFIX))
+
+      # The progress of the same source is resumed
+      download_utils.WriteProgress(output_path, source, 2048)
+      self.assertEqual(2048, download_utils.ReadProgress(output_path, source))
+      self.assertEqual(0, download_utils.ReadProgress(
+          output_path, dict(source, size=0)))
+
+      # Short reads are fetched again, and fail the download if they persist
+      fetch = mock.Mock(side_effect=[b'a' * 512, b'a' * 1024])
+      download_utils.DownloadRanges(
+          output_path, 4096, [(1024, 1024)], fetch, {'path': 'short-path'},
+          max_workers=2)
+      self.assertEqual(2, fetch.call_count)
+      with self.assertRaises(errors.ResourceCreationError):
+        download_utils.DownloadRanges(
+            output_path, 4096, [(1024, 1024)], lambda *args: b'a' * 512,
+            {'path': 'short-path'}, max_workers=2)
+      self.assertEqual(0, download_utils.ReadProgress(
+          output_path, {'path': 'short-path'}))
+
+      with mock.patch('shutil.disk_usage') as mock_disk_usage:
+        mock_disk_usage.return_value.free = 512
+        with self.assertRaises(errors.ResourceCreationError):
+          download_utils.DownloadRanges(
+              output_path, len(content), [(0, 4096)], mock.Mock(),
+              {'path': 'other-path'}, max_workers=2)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Copyright 2026 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for the utils module - instance_type_utils.py"""
+
+import os
+import tempfile
+import typing
+import unittest
+import mock
+
+from libcloudforensics.providers.utils import instance_type_utils
+
+FAKE_INSTANCE_TYPES = [
+    {'Name': 'fake-large', 'CPU': 4, 'Memory': 16384},
+    {'Name': 'fake-small', 'CPU': 2, 'Memory': 4096},
+    {'Name': 'fake-medium', 'CPU': 4, 'Memory': 8192},
+    {'Name': 'fake-medium-2', 'CPU': 4, 'Memory': 8192}
+]
+
+
+class InstanceTypeCatalogTest(unittest.TestCase):
+  """Test the InstanceTypeCatalog class."""
+
+  @typing.no_type_check
+  def testFindInstanceTypes(self):
+    """Test that instance types are found by CPU cores and memory."""
+    list_function = mock.Mock(return_value=FAKE_INSTANCE_TYPES)
+    catalog = instance_type_utils.InstanceTypeCatalog(
+        'fake-provider', 'fake-scope', 'fake-region', list_function)
+    self.assertEqual(
+        ['fake-medium', 'fake-medium-2'],
+        [t['Name'] for t in catalog.FindInstanceTypes(4, 8192)])
+    self.assertEqual(
+        ['fake-medium', 'fake-medium-2', 'fake-large'],
+        [t['Name'] for t in catalog.FindInstanceTypes(4)])
+    self.assertEqual([], catalog.FindInstanceTypes(8))
+    self.assertEqual(4096, catalog.GetInstanceType('fake-small')['Memory'])
+    self.assertIsNone(catalog.GetInstanceType('fake-huge'))
+    list_function.assert_called_once()
+
+  @typing.no_type_check
+  def testPersistentCatalog(self):
+    """Test that catalogs are persisted and refreshed after their TTL."""
+    list_function = mock.Mock(return_value=FAKE_INSTANCE_TYPES)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      with mock.patch.dict(
+          os.environ, {instance_type_utils.CACHE_DIR_ENV_VAR: tmp_dir}):
+        catalog = instance_type_utils.InstanceTypeCatalog(
+            'fake-provider', 'fake-scope', 'fake-region', list_function)
+        catalog.ListInstanceTypes()
+        self.assertTrue(os.path.exists(catalog.cache_path))
+
+        # A new catalog is loaded from the cache file
+        catalog = instance_type_utils.InstanceTypeCatalog(
+            'fake-provider', 'fake-scope', 'fake-region', list_function)
+        self.assertTrue(catalog.IsCached())
+        self.assertEqual(4, len(catalog.ListInstanceTypes()))
+        list_function.assert_called_once()
+
+        # Expired catalogs are fetched again
+        catalog = instance_type_utils.InstanceTypeCatalog(
+            'fake-provider', 'fake-scope', 'fake-region', list_function,
+            ttl=-1)
+        self.assertFalse(catalog.IsCached())
+        catalog.ListInstanceTypes()
+        self.assertEqual(2, list_function.call_count)
@@ -50,15 +50,19 @@ PROVIDER_TO_FUNC = {
     },
     'gcp': {
         'bucketacls': gcp_cli.GetBucketACLs,
+        'bucketmanifest': gcp_cli.WriteBucketManifest,
         'bucketsize': gcp_cli.GetBucketSize,
+        'bucketusage': gcp_cli.GetBucketsUsage,
         'copydisk': gcp_cli.CreateDiskCopy,
         'copydisktogcs': gcp_cli.CopyDiskToGCS,
         'creatediskgcs': gcp_cli.CreateDiskFromGCSImage,
         'deleteinstance': gcp_cli.DeleteInstance,
         'deleteobject': gcp_cli.DeleteObject,
+        'deleteobjects': gcp_cli.DeleteObjects,
         'createbucket': gcp_cli.CreateBucket,
         'gkequarantine': gcp_cli.GKEWorkloadQuarantine,
         'gkeenumerate': gcp_cli.GKEEnumerate,
+        'gkefleetenumerate': gcp_cli.GKEFleetEnumerate,
         'listbigqueryjobs': gcp_cli.ListBigQueryJobs,
         'listbuckets': gcp_cli.ListBuckets,
         'listcloudsqlinstances': gcp_cli.ListCloudSqlInstances,
@@ -71,6 +75,7 @@ PROVIDER_TO_FUNC = {
         'quarantinevm': gcp_cli.InstanceNetworkQuarantine,
         'querylogs': gcp_cli.QueryLogs,
         'startvm': gcp_cli.StartAnalysisVm,
+        'triageinstances': gcp_cli.TriageInstances,
         'S3ToGCS': gcp_cli.S3ToGCS,
         'vmremoveserviceaccount': gcp_cli.VMRemoveServiceAccount
     }
@@ -454,11 +459,32 @@ def Main() -> None:
             args=[
                 ('path', 'Path to bucket.', None),
             ])
+  AddParser('gcp', gcp_subparsers, 'bucketmanifest',
+            'Write a CSV manifest of the hashes of the objects in a GCS '
+            'bucket.',
+            args=[
+                ('path', 'Path to bucket, optionally followed by a prefix of '
+                    'the objects to include, e.g. gs://bucket/evidence/.',
+                    None),
+                ('output', 'Path to the CSV file to write.', None),
+                ('--previous', 'Path to a previous manifest of the bucket, '
+                    'to report the objects that changed since then. Can be '
+                    'the output file itself.', None),
+                ('--parallel', 'List shards of the bucket concurrently. '
+                    'Objects are not listed in order.', False),
+            ])
   AddParser('gcp', gcp_subparsers, 'bucketsize',
             'Get the size of a GCS bucket.',
             args=[
                 ('path', 'Path to bucket.', None)
             ])
+  AddParser('gcp', gcp_subparsers, 'bucketusage',
+            'Report the size, object count and growth of all GCS buckets in '
+            'a project.',
+            args=[
+                ('--timeframe', 'The number of days over which to measure '
+                    'the growth of buckets.', 7)
+            ])
   AddParser('gcp', gcp_subparsers, 'objectmetadata', 'List the details of an '
                                                      'object in a GCS bucket.',
             args=[
@@ -467,7 +493,10 @@ def Main() -> None:
   AddParser('gcp', gcp_subparsers, 'listobjects', 'List the objects in a '
                                                   'GCS bucket.',
             args=[
-                ('path', 'Path to bucket.', None),
+                ('path', 'Path to bucket, optionally followed by a prefix of '
+                    'the objects to list, e.g. gs://bucket/logs/.', None),
+                ('--parallel', 'List shards of the bucket concurrently. '
+                    'Objects are not listed in order.', False),
             ])
   AddParser('gcp', gcp_subparsers, 'listcloudsqlinstances',
             'List CloudSQL instances for a project.')
@@ -475,6 +504,18 @@ def Main() -> None:
             args=[
                 ('path', 'Path to GCS object.', None),
             ])
+  AddParser('gcp', gcp_subparsers, 'deleteobjects',
+            'Deletes GCS objects in bulk, given a list or a prefix.',
+            args=[
+                ('--paths', 'Comma separated list of paths to GCS objects.',
+                    None),
+                ('--prefix', 'Path to a bucket followed by the prefix of the '
+                    'objects to delete, e.g. gs://bucket/exports/.', None),
+                ('--dry_run', 'Only list the objects that would be deleted.',
+                    False),
+                ('--allow_whole_bucket', 'Allow a --prefix selecting all the '
+                    'objects of a bucket, e.g. gs://bucket/.', False),
+            ])
   AddParser('gcp', gcp_subparsers, 'quarantinevm', 'Put a VM in '
                                                    'network quarantine.',
             args=[
@@ -520,7 +561,37 @@ def Main() -> None:
                 ('--node', 'The name of the node to enumerate.', None),
                 ('--namespace', 'The namespace of the object to enumerate.',
                     None),
-                ('--as_json', 'Output in JSON format.', False)
+                ('--as_json', 'Output in JSON format.', False),
+                ('--as_ndjson', 'Stream the output as newline-delimited '
+                    'JSON, one record per object.', False)
+            ])
+  AddParser('gcp', gcp_subparsers, 'gkefleetenumerate',
+            'Enumerate all the GKE clusters of one or more projects, as '
+            'newline-delimited JSON.',
+            args=[
+                ('--projects', 'Comma separated list of projects in which to '
+                    'enumerate clusters. Default is the --project.', None),
+                ('--location', 'The region/zone in which to enumerate '
+                    'clusters. Default is all locations.', '-'),
+                ('--namespace', 'The namespace in which to enumerate.', None),
+                ('--kind', 'Only output objects of this kind, e.g. Pod or '
+                    'Workload.', None),
+                ('--name', 'Only output objects with this name.', None),
+                ('--timeout', 'Time (in seconds) after which the enumeration '
+                    'of a cluster is abandoned.', 600)
+            ])
+  AddParser('gcp', gcp_subparsers, 'triageinstances',
+            'Triage many instances of a project, as a single JSON report.',
+            args=[
+                ('--instances', 'Comma separated list of the names of the '
+                    'instances to triage.', None),
+                ('--labels', 'Comma separated list of labels, e.g. '
+                    'env=prod,team=web. Instances with all these labels are '
+                    'triaged.', None),
+                ('--output', 'Path to the JSON file to write. Default is to '
+                    'write to stdout.', None),
+                ('--timeout', 'Time (in seconds) after which a collector is '
+                    'abandoned.', 300)
             ])
   AddParser('gcp', gcp_subparsers, 'listbigqueryjobs',
             'List BigQuery jobs for a project.')
@@ -31,6 +31,7 @@ from libcloudforensics.providers.gcp.internal import project as gcp_project
 from libcloudforensics.providers.gcp.internal import storage as gcp_storage
 from libcloudforensics.providers.gcp.internal import storagetransfer as gcp_st
 from libcloudforensics.providers.gcp.internal import cloudsql as gcp_cloudsql
+from libcloudforensics.providers.utils.storage_utils import SplitStoragePath
 from libcloudforensics.providers.gcp import forensics
 from libcloudforensics import logging_utils
 # pylint: enable=line-too-long
@@ -397,13 +398,41 @@ def ListBucketObjects(args: 'argparse.Namespace') -> None:
   AssignProjectID(args)
 
   gcs = gcp_storage.GoogleCloudStorage(args.project)
-  results = gcs.ListBucketObjects(args.path)
+  path = args.path if args.path.startswith('gs://') else 'gs://' + args.path
+  bucket, prefix = SplitStoragePath(path)
+  fields = ['id', 'size', 'contentType']
+  if args.parallel:
+    results = gcs.StreamBucketObjectsParallel(
+        bucket, prefix=prefix, fields=fields)
+  else:
+    results = gcs.StreamBucketObjects(bucket, prefix=prefix, fields=fields)
   for obj in results:
     logger.info('{0:s} {1:s}b [{2:s}]'.format(
         obj.get('id', 'ID not found'), obj.get('size', 'Unknown size'),
         obj.get('contentType', 'Unknown Content-Type')))
 
 
+def WriteBucketManifest(args: 'argparse.Namespace') -> None:
+  """Write a CSV manifest of the hashes of the objects in a GCS bucket.
+
+  Args:
+    args (argparse.Namespace): Arguments from ArgumentParser.
+
+  Raises:
+    AttributeError: If no project_id was provided and none was inferred
+        from the gcloud environment.
+  """
+
+  AssignProjectID(args)
+
+  gcs = gcp_storage.GoogleCloudStorage(args.project)
+  summary = gcs.WriteBucketManifest(
+      args.path, args.output, previous_manifest=args.previous,
+      parallel=args.parallel)
+  for key, value in summary.items():
+    logger.info('{0:s}: {1:d}'.format(key, value))
+
+
 def GetBucketSize(args: 'argparse.Namespace') -> None:
   """Get the size of a GCS bucket.
 
@@ -423,6 +452,28 @@ def GetBucketSize(args: 'argparse.Namespace') -> None:
     logger.info('{0:s}: {1:d}b'.format(bucket_name, bucket_size))
 
 
+def GetBucketsUsage(args: 'argparse.Namespace') -> None:
+  """Report the size, object count and growth of all GCS buckets in a project.
+
+  Args:
+    args (argparse.Namespace): Arguments from ArgumentParser.
+
+  Raises:
+    AttributeError: If no project_id was provided and none was inferred
+        from the gcloud environment.
+  """
+
+  AssignProjectID(args)
+
+  gcs = gcp_storage.GoogleCloudStorage(args.project)
+  results = gcs.GetBucketsUsage(timeframe=int(args.timeframe))
+  for bucket_name, usage in sorted(results.items()):
+    growth = usage['growth']
+    logger.info('{0:s}: {1!s}b, {2!s} objects, {3:s}'.format(
+        bucket_name, usage['size'], usage['objects'],
+        'unknown growth' if growth is None else '{0:+.0f}b/day'.format(growth)))
+
+
 def ListCloudSqlInstances(args: 'argparse.Namespace') -> None:
   """List the CloudSQL instances of a Project.
 
@@ -464,6 +515,31 @@ def DeleteObject(args: 'argparse.Namespace') -> None:
   print('Object deleted.')
 
 
+def DeleteObjects(args: 'argparse.Namespace') -> None:
+  """Deletes objects in GCS, given a list or a prefix.
+
+  Args:
+    args (argparse.Namespace): Arguments from ArgumentParser.
+
+  Raises:
+    AttributeError: If no project_id was provided and none was inferred
+        from the gcloud environment.
+  """
+
+  AssignProjectID(args)
+
+  gcs = gcp_storage.GoogleCloudStorage(args.project)
+  gcs_paths = args.paths.split(',') if args.paths else None
+  deleted, failures = gcs.DeleteObjects(
+      gcs_paths=gcs_paths, prefix=args.prefix, dry_run=args.dry_run,
+      allow_whole_bucket=args.allow_whole_bucket)
+  if args.dry_run:
+    for path in deleted:
+      logger.info('Would delete {0:s}'.format(path))
+  logger.info('{0:d} objects {1:s}deleted, {2:d} failures.'.format(
+      len(deleted), 'would be ' if args.dry_run else '', len(failures)))
+
+
 def InstanceNetworkQuarantine(args: 'argparse.Namespace') -> None:
   """Put a Google Cloud instance in network quarantine.
 
@@ -574,29 +650,34 @@ def GKEEnumerate(args: 'argparse.Namespace') -> None:
 
   enumerations = []  # type: List[k8s_enumerations.base.Enumeration[Any]]
 
-  if args.workload:
-    if not args.namespace:
-      raise AttributeError(
-          'Namespace must be provided for workload enumeration.')
-    workload = cluster.FindWorkload(args.workload, args.namespace)
-    if not workload:
-      raise errors.ResourceNotFoundError('Workload not found.', __name__)
-    enumerations.append(k8s_enumerations.base.WorkloadEnumeration(workload))
-
-  if args.node:
-    node = cluster.FindNode(args.node)
-    if not node:
-      raise errors.ResourceNotFoundError('Node not found.', __name__)
-    enumerations.append(k8s_enumerations.base.NodeEnumeration(node))
-
-  if args.service:
-    if not args.namespace:
-      raise AttributeError(
-          'Namespace must be provided for service enumeration.')
-    service = cluster.FindService(args.service, args.namespace)
-    if not service:
-      raise errors.ResourceNotFoundError('Service not found.', __name__)
-    enumerations.append(k8s_enumerations.base.ServiceEnumeration(service))
+  # Workloads, nodes and services are looked up in a snapshot of the cluster,
+  # so that enumerating them resolves against it instead of the API server.
+  if args.workload or args.node or args.service:
+    snapshot = cluster.Snapshot()
+
+    if args.workload:
+      if not args.namespace:
+        raise AttributeError(
+            'Namespace must be provided for workload enumeration.')
+      workload = snapshot.FindWorkload(args.workload, args.namespace)
+      if not workload:
+        raise errors.ResourceNotFoundError('Workload not found.', __name__)
+      enumerations.append(k8s_enumerations.base.WorkloadEnumeration(workload))
+
+    if args.node:
+      node = snapshot.FindNode(args.node)
+      if not node:
+        raise errors.ResourceNotFoundError('Node not found.', __name__)
+      enumerations.append(k8s_enumerations.base.NodeEnumeration(node))
+
+    if args.service:
+      if not args.namespace:
+        raise AttributeError(
+            'Namespace must be provided for service enumeration.')
+      service = snapshot.FindService(args.service, args.namespace)
+      if not service:
+        raise errors.ResourceNotFoundError('Service not found.', __name__)
+      enumerations.append(k8s_enumerations.base.ServiceEnumeration(service))
 
   if len(enumerations) == 1:
     enumeration = enumerations[0]
@@ -605,13 +686,74 @@ def GKEEnumerate(args: 'argparse.Namespace') -> None:
   else:
     raise AttributeError('At most one enumeration point can be specified.')
 
-  if args.as_json:
+  if args.as_ndjson:
+    enumeration.WriteNdjson(sys.stdout, namespace=args.namespace)
+  elif args.as_json:
     json.dump(
         enumeration.ToJson(namespace=args.namespace), sys.stdout, indent=2)
   else:
     enumeration.Enumerate(namespace=args.namespace)
 
 
+def GKEFleetEnumerate(args: 'argparse.Namespace') -> None:
+  """Enumerate the GKE clusters of one or more projects.
+
+  Args:
+    args (argparse.Namespace): Arguments from ArgumentParser.
+  """
+  if args.projects:
+    project_ids = args.projects.split(',')
+  else:
+    AssignProjectID(args)
+    project_ids = [args.project]
+
+  fleet = k8s_enumerations.gcp.GkeFleetEnumeration(
+      project_ids, location=args.location, cluster_timeout=int(args.timeout))
+  for record in fleet.Search(
+      kind=args.kind, name=args.name, namespace=args.namespace):
+    sys.stdout.write(json.dumps(record, default=str) + '\n')
+    sys.stdout.flush()
+
+
+def TriageInstances(args: 'argparse.Namespace') -> None:
+  """Triage many instances of a project, writing a JSON report.
+
+  Args:
+    args (argparse.Namespace): Arguments from ArgumentParser.
+
+  Raises:
+    AttributeError: If no project_id was provided and none was inferred
+        from the gcloud environment, if not exactly one of instances and
+        labels was provided, or if a label is not given as key=value.
+  """
+  AssignProjectID(args)
+
+  if bool(args.instances) == bool(args.labels):
+    raise AttributeError(
+        'Exactly one of --instances and --labels must be provided.')
+  instance_names = args.instances.split(',') if args.instances else None
+  labels = None
+  if args.labels:
+    labels = {}
+    for label in args.labels.split(','):
+      if '=' not in label:
+        raise AttributeError(
+            'Labels must be given as key=value, got {0:s}.'.format(label))
+      key, value = label.split('=', 1)
+      labels[key] = value
+
+  report = forensics.TriageInstances(
+      args.project, instance_names=instance_names, labels=labels,
+      timeout=int(args.timeout))
+  if args.output:
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+      json.dump(report, output_file, indent=2, default=str)
+    logger.info('Triage report of {0:d} instances written to {1:s}'.format(
+        len(report['instances']), args.output))
+  else:
+    json.dump(report, sys.stdout, indent=2, default=str)
+
+
 def ListBigQueryJobs(args: 'argparse.Namespace') -> None:
   """List the BigQuery jobs of a Project.
 